@@ -1,10 +1,15 @@
 """
 API utilities for common operations across API endpoints.
 """
-from fastapi import HTTPException
+from typing import AsyncIterator
+from fastapi import HTTPException, Request
+from starlette.responses import Response, StreamingResponse
+from app.business_logic.exceptions import ValidationError
 from app.db.topologies_simulations_db import TopologiesSimulationsDB
 from app.models.topolgy_simulation_models import TopologySimulation
 
+NDJSON_MEDIA_TYPE = "application/x-ndjson"
+
 async def get_simulation_or_raise(db, simulation_id: str, session=None) -> TopologySimulation:
     """
     Get a simulation by ID or raise a 404 HTTP exception if not found.
@@ -24,4 +29,54 @@ async def get_simulation_or_raise(db, simulation_id: str, session=None) -> Topol
     simulation = await topologies_simulations_db.get_topology_simulation(simulation_id, session=session)
     if simulation is None:
         raise HTTPException(status_code=404, detail=f"Simulation with ID {simulation_id} not found")
-    return simulation 
\ No newline at end of file
+    return simulation
+
+
+def is_not_modified(request: Request, etag: str) -> bool:
+    """Whether the If-None-Match header of a request matches an ETag (weak comparison, as for GET)."""
+    header = request.headers.get("if-none-match")
+    if not header:
+        return False
+    tags = {tag.strip().removeprefix("W/") for tag in header.split(",")}
+    return "*" in tags or etag in tags
+
+
+def not_modified_response(etag: str) -> Response:
+    return Response(status_code=304, headers={"ETag": etag})
+
+
+async def iter_ndjson_lines(request: Request, max_line_bytes: int) -> AsyncIterator[bytes]:
+    """
+    Yield the non-empty lines of an NDJSON request body as it is received, without buffering the body.
+
+    Raises:
+        ValidationError: If a line is longer than max_line_bytes
+    """
+    buffer = bytearray()
+    async for data in request.stream():
+        buffer.extend(data)
+        start = 0
+        while (end := buffer.find(b"\n", start)) >= 0:
+            line = bytes(buffer[start:end]).strip()
+            if line:
+                yield line
+            start = end + 1
+        del buffer[:start]
+        if len(buffer) > max_line_bytes:
+            raise ValidationError(f"NDJSON line longer than {max_line_bytes} bytes")
+    line = bytes(buffer).strip()
+    if line:
+        yield line
+
+
+class NDJSONStreamingResponse(StreamingResponse):
+    """
+    NDJSON response streamed while the request body is still being read. Unlike StreamingResponse, it does
+    not listen for the client disconnecting meanwhile, as that would consume the request body messages.
+    """
+    media_type = NDJSON_MEDIA_TYPE
+
+    async def __call__(self, scope, receive, send) -> None:
+        await self.stream_response(send)
+        if self.background is not None:
+            await self.background()
@@ -7,6 +7,7 @@ from fastapi import APIRouter, Depends
 from app.api.dependencies import get_mongo_manager, get_rabbitmq_client
 from app.models.topolgy_models import Link
 from app.api.api_error_handler import handle_api_exceptions
+from app.utils.cache import caches_stats
 
 logger = LoggerManager.get_logger('debug_api')
 simulation_creator_router = APIRouter()
@@ -44,4 +45,10 @@ async def send_link_message(
 async def ping():
     """Health check endpoint for debug API."""
     logger.info("/debug/ping endpoint called")
-    return {"message": "Debug API is alive"}
\ No newline at end of file
+    return {"message": "Debug API is alive"}
+
+@debug_router.get("/caches", summary="In-process cache metrics", tags=["debug"])
+@handle_api_exceptions
+async def get_caches_stats():
+    """Size, hit / miss, eviction and expiration counters of the in-process caches of this API instance."""
+    return caches_stats()
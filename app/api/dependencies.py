@@ -1,3 +1,4 @@
+from fastapi.requests import HTTPConnection
 from app.app_container import app_container
 from app.utils.logger import LoggerManager
 
@@ -64,6 +65,14 @@ async def get_mongo_read_manager():
     await _ensure_mongo_connected(mongo_manager)
     yield mongo_manager.db
 
+def get_events_broadcaster(connection: HTTPConnection):
+    """
+    Dependency for the EventsBroadcaster of this process (created by the application lifespan).
+    Usage:
+        broadcaster = Depends(get_events_broadcaster)
+    """
+    return connection.app.state.events_broadcaster
+
 async def get_rabbitmq_client():
     rabbitmq_client = app_container.rabbitmq_client()
     try:
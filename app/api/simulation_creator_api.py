@@ -1,11 +1,17 @@
-from fastapi import APIRouter, Depends
+import json
+from fastapi import APIRouter, Depends, Request
+from pydantic import ValidationError as PydanticValidationError
 from app.utils.logger import LoggerManager
 from app.models.requests_models import SimulationRequest
-from typing import List, Annotated, Tuple
-from app.api.dependencies import get_mongo_manager
+from typing import AsyncIterator, List, Annotated, Tuple
+from app.api.dependencies import get_mongo_manager, get_mongo_read_manager
+from app.api.api_utils import NDJSONStreamingResponse, NDJSON_MEDIA_TYPE, iter_ndjson_lines
+from app.app_container import app_container
+from app.business_logic.exceptions import ValidationError
 from app.business_logic.topologies_bl import TopologiesBL
 from functools import partial
 from app.api.api_error_handler import handle_api_exceptions
+from app.utils.error_handler import run_in_transaction
 from motor.motor_asyncio import AsyncIOMotorDatabase
 from pymongo.client_session import ClientSession
 
@@ -26,4 +32,77 @@ async def create_simulation(
 ) -> List[str]:
     db, session = db_session
     topologies_bl = TopologiesBL(db)
-    return await topologies_bl.trigger_simulation(requests, session=session)
\ No newline at end of file
+    return await topologies_bl.trigger_simulation(requests, session=session)
+
+@simulation_creator_router.post(
+    "/simulate/stream",
+    summary="Create simulations from an NDJSON stream",
+    tags=["Simulation"],
+    response_class=NDJSONStreamingResponse,
+    openapi_extra={"requestBody": {"content": {NDJSON_MEDIA_TYPE: {"schema": {"type": "string"}}}, "required": True}}
+)
+async def create_simulations_stream(request: Request, db=Depends(get_mongo_read_manager)) -> NDJSONStreamingResponse:
+    """
+    Create simulations from an NDJSON body, one SimulationRequest per line.
+    The body is parsed as it is received and committed every SIMULATION_STREAM_CHUNK_SIZE requests, each
+    chunk in its own transaction. The response streams one NDJSON line per created simulation ({"sim_id"}),
+    per invalid line ({"line", "error"}) and per failed chunk ({"lines": [first, last], "error"}), and
+    ends with a summary ({"created", "failed"}).
+    """
+    logger.info("Will create simulations from an NDJSON stream")
+    return NDJSONStreamingResponse(_create_simulations_stream(request, db))
+
+def _ndjson(obj: dict) -> bytes:
+    return json.dumps(obj).encode() + b"\n"
+
+async def _create_simulations_chunk(db, topologies_bl: TopologiesBL, chunk: List[SimulationRequest]) -> List[str]:
+    # run_in_transaction also retries the transient errors TopologiesBL raises wrapped in TopologiesBLException
+    return await run_in_transaction(
+        db.client,
+        lambda session: topologies_bl.trigger_simulation(chunk, session=session),
+        app_container.config().MONGODB_TRANSACTION_MAX_ATTEMPTS
+    )
+
+async def _create_simulations_stream(request: Request, db) -> AsyncIterator[bytes]:
+    config = app_container.config()
+    topologies_bl = TopologiesBL(db)
+    chunk: List[SimulationRequest] = []
+    first_line = line_number = created = failed = 0
+
+    async def flush():
+        nonlocal chunk, created, failed
+        requests, chunk = chunk, []
+        try:
+            sim_ids = await _create_simulations_chunk(db, topologies_bl, requests)
+        except Exception as e:
+            logger.error(f"Failed to create the simulations of lines {first_line}-{line_number}: {str(e)}")
+            failed += len(requests)
+            return [_ndjson({"lines": [first_line, line_number], "error": str(e)})]
+        created += len(sim_ids)
+        failed += len(requests) - len(sim_ids)
+        logger.info(f"Created {len(sim_ids)} simulations of lines {first_line}-{line_number}")
+        return [_ndjson({"sim_id": sim_id}) for sim_id in sim_ids]
+
+    try:
+        async for line in iter_ndjson_lines(request, config.SIMULATION_STREAM_MAX_LINE_BYTES):
+            line_number += 1
+            try:
+                simulation_request = SimulationRequest.model_validate_json(line)
+            except PydanticValidationError as e:
+                failed += 1
+                yield _ndjson({"line": line_number, "error": str(e)})
+                continue
+            if not chunk:
+                first_line = line_number
+            chunk.append(simulation_request)
+            if len(chunk) >= config.SIMULATION_STREAM_CHUNK_SIZE:
+                for output in await flush():
+                    yield output
+    except ValidationError as e:
+        failed += 1
+        yield _ndjson({"line": line_number + 1, "error": str(e)})
+    if chunk:
+        for output in await flush():
+            yield output
+    yield _ndjson({"created": created, "failed": failed})
+
@@ -1,12 +1,22 @@
+import asyncio
+from datetime import datetime
+from typing import AsyncIterator, List, Optional, Tuple, Union
 from app.utils.logger import LoggerManager
-from fastapi import APIRouter, Depends, Query, HTTPException
+from fastapi import APIRouter, Depends, Query, HTTPException, Request, Response, WebSocket
+from starlette.responses import StreamingResponse
+from app.app_container import app_container
+from app.business_logic.events_broadcaster import CLOSED, PUSHED_EVENT_TYPES, EventsBroadcaster, Subscription
+from app.business_logic.exceptions import ValidationError
+from app.business_logic.simulations_read_bl import SimulationsReadBusinessLogic, etag_of, version_of
 from app.db.topologies_simulations_db import TopologiesSimulationsDB
-from app.models.topolgy_simulation_models import TopologySimulation
+from app.messageBroker.codecs import JSON_CONTENT_TYPE, get_codec
+from app.models.requests_models import SimulationStatusesRequest
+from app.models.topolgy_simulation_models import TopologySimulation, SimulationStatus, SimulationSummary, STATUS_PROJECTION, SUMMARY_FIELDS
 from app.models.statuses_enums import TopologyStatusEnum
-from app.api.dependencies import get_mongo_read_manager
+from app.api.dependencies import get_events_broadcaster, get_mongo_read_manager
 from app.models.pageination_models import CursorPaginationRequest, CursorPaginationResponse
 from app.api.api_error_handler import handle_api_exceptions
-from app.api.api_utils import get_simulation_or_raise
+from app.api.api_utils import is_not_modified, not_modified_response
 
 logger = LoggerManager.get_logger("simulation_data")
 simulation_data_router = APIRouter()
@@ -14,39 +24,199 @@ simulation_data_router = APIRouter(prefix="/simulation-data", tags=["simulation_
 
 @simulation_data_router.get("/status/{simulation_id}", summary="Get a simulation status", tags=["simulation_data"])
 @handle_api_exceptions
-async def get_simulation_status(simulation_id: str, db=Depends(get_mongo_read_manager)) -> TopologyStatusEnum:
+async def get_simulation_status(simulation_id: str, request: Request, response: Response, db=Depends(get_mongo_read_manager)) -> TopologyStatusEnum:
     """
     Get the current status of a simulation by its ID.
-    Returns the status as a TopologyStatusEnum.
+    Returns the status as a TopologyStatusEnum, or 304 when it did not change since the If-None-Match ETag.
     """
     logger.info(f"Will get simulation {simulation_id} status")
-    simulation = await get_simulation_or_raise(db, simulation_id)
-    return simulation.status
+    docs = await TopologiesSimulationsDB(db).get_simulations_docs_by_ids([simulation_id], STATUS_PROJECTION)
+    if not docs:
+        raise HTTPException(status_code=404, detail=f"Simulation with ID {simulation_id} not found")
+    etag = etag_of({simulation_id: version_of(docs[0])})
+    if is_not_modified(request, etag):
+        return not_modified_response(etag)
+    response.headers["ETag"] = etag
+    return docs[0].get("status")
+
+@simulation_data_router.post("/statuses", summary="Get the status of many simulations", tags=["simulation_data"], response_model=List[SimulationStatus])
+@handle_api_exceptions
+async def get_simulations_statuses(request: SimulationStatusesRequest, db=Depends(get_mongo_read_manager)) -> Response:
+    """
+    Get the status, row_version and updated_at of up to SIMULATION_STATUSES_MAX_IDS simulations with one query.
+    The projected documents are returned as read, without model validation; unknown IDs are left out.
+    """
+    max_ids = app_container.config().SIMULATION_STATUSES_MAX_IDS
+    if len(request.sim_ids) > max_ids:
+        raise ValidationError(f"At most {max_ids} simulation IDs can be requested at once")
+    sim_ids = list(dict.fromkeys(request.sim_ids))
+    logger.info(f"Will get the status of {len(sim_ids)} simulations")
+    docs = await TopologiesSimulationsDB(db).get_simulations_docs_by_ids(sim_ids, STATUS_PROJECTION)
+    return Response(content=get_codec(JSON_CONTENT_TYPE).encode(docs), media_type=JSON_CONTENT_TYPE)
+
+def _subscription_filter(sim_ids: str, event_types: str) -> Tuple[List[str], List[str]]:
+    """
+    Parse the comma-separated sim_ids and event_types of an events subscription.
+
+    Raises:
+        ValidationError: If there are too many sim ids or an event type is not pushed
+    """
+    sim_ids = [sim_id for sim_id in dict.fromkeys(sim_ids.split(",")) if sim_id]
+    event_types = [event_type for event_type in dict.fromkeys(event_types.split(",")) if event_type]
+    max_ids = app_container.config().EVENTS_PUSH_MAX_SIM_IDS
+    if len(sim_ids) > max_ids:
+        raise ValidationError(f"At most {max_ids} simulation IDs can be subscribed to at once")
+    unknown = [event_type for event_type in event_types if event_type not in PUSHED_EVENT_TYPES]
+    if unknown:
+        raise ValidationError(f"Unsupported event types {unknown}, expected some of {PUSHED_EVENT_TYPES}")
+    return sim_ids, event_types
+
+async def _sse_events(broadcaster: EventsBroadcaster, sim_ids: List[str], event_types: List[str]) -> AsyncIterator[bytes]:
+    """Server-sent events of a subscription, with a keep-alive comment when idle."""
+    config = app_container.config()
+    codec = get_codec(JSON_CONTENT_TYPE)
+    async with broadcaster.subscription(sim_ids, event_types) as subscription:
+        while True:
+            try:
+                messages = await asyncio.wait_for(subscription.get_batch(config.EVENTS_PUSH_BATCH_SIZE), config.EVENTS_PUSH_HEARTBEAT_SEC)
+            except asyncio.TimeoutError:
+                yield b": keep-alive\n\n"
+                continue
+            chunk = bytearray()
+            dropped = subscription.take_dropped()
+            if dropped:
+                chunk += b"event: dropped\ndata: " + codec.encode({"dropped": dropped}) + b"\n\n"
+            for message in messages:
+                if message is CLOSED:
+                    yield bytes(chunk) + b"event: closed\ndata: {}\n\n"
+                    return
+                chunk += f"id: {message['event_id']}\nevent: {message['event_type']}\ndata: ".encode()
+                chunk += codec.encode(message) + b"\n\n"
+            yield bytes(chunk)
+
+@simulation_data_router.get("/events", summary="Stream simulation events (server-sent events)", tags=["simulation_data"])
+@handle_api_exceptions
+async def stream_simulation_events(
+    sim_ids: str = Query("", description="Comma-separated simulation IDs, all simulations when empty"),
+    event_types: str = Query("", description="Comma-separated event types, all status transitions when empty"),
+    broadcaster: EventsBroadcaster = Depends(get_events_broadcaster)
+) -> StreamingResponse:
+    """
+    Push the events of some simulations as they are stored, as server-sent events (one 'event_type' event
+    per simulation event). A 'dropped' event tells a client that did not keep up how many events it missed,
+    and 'closed' that the stream ended and the client should reconnect.
+    """
+    sim_ids, event_types = _subscription_filter(sim_ids, event_types)
+    logger.info(f"Will stream the events of {len(sim_ids) or 'all'} simulations")
+    return StreamingResponse(
+        _sse_events(broadcaster, sim_ids, event_types),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
+async def _push_events(websocket: WebSocket, subscription: Subscription) -> None:
+    codec = get_codec(JSON_CONTENT_TYPE)
+    batch_size = app_container.config().EVENTS_PUSH_BATCH_SIZE
+    while True:
+        messages = await subscription.get_batch(batch_size)
+        dropped = subscription.take_dropped()
+        if dropped:
+            await websocket.send_text(codec.encode({"event_type": "dropped", "dropped": dropped}).decode())
+        for message in messages:
+            if message is CLOSED:
+                await websocket.close(code=1012)
+                return
+            await websocket.send_text(codec.encode(message).decode())
+
+@simulation_data_router.websocket("/events/ws")
+async def simulation_events_websocket(
+    websocket: WebSocket,
+    sim_ids: str = Query(""),
+    event_types: str = Query(""),
+    broadcaster: EventsBroadcaster = Depends(get_events_broadcaster)
+):
+    """
+    Push the events of some simulations as they are stored, one JSON text message per event
+    (same filters and messages as GET /events). Messages sent by the client are ignored.
+    """
+    try:
+        sim_ids, event_types = _subscription_filter(sim_ids, event_types)
+    except ValidationError as e:
+        await websocket.close(code=1008, reason=str(e))
+        return
+    await websocket.accept()
+    logger.info(f"Will push the events of {len(sim_ids) or 'all'} simulations over a WebSocket")
+    async with broadcaster.subscription(sim_ids, event_types) as subscription:
+        pusher = asyncio.create_task(_push_events(websocket, subscription))
+        try:
+            # Read until the client disconnects (also after the pusher closed the WebSocket)
+            while (await websocket.receive())["type"] != "websocket.disconnect":
+                pass
+        finally:
+            pusher.cancel()
     
 
-@simulation_data_router.get("/get-simulation/{simulation_id}", summary="Get a simulation", tags=["simulation_data"])
+@simulation_data_router.get("/get-simulation/{simulation_id}", summary="Get a simulation", tags=["simulation_data"], response_model=TopologySimulation)
 @handle_api_exceptions
-async def get_simulation(simulation_id: str, db=Depends(get_mongo_read_manager)) -> TopologySimulation:
+async def get_simulation(simulation_id: str, request: Request, db=Depends(get_mongo_read_manager)) -> Response:
     """
     Retrieve the full simulation object by its ID.
-    Returns a Simulation model with all details.
+    Returns a Simulation model with all details, from the simulations cache while it is up to date,
+    or 304 when it did not change since the If-None-Match ETag.
     """
     logger.info(f"Will get simulation {simulation_id}")
-    return await get_simulation_or_raise(db, simulation_id)
+    simulations_read_bl = SimulationsReadBusinessLogic(db)
+    versions = await simulations_read_bl.get_versions([simulation_id])
+    if not versions:
+        raise HTTPException(status_code=404, detail=f"Simulation with ID {simulation_id} not found")
+    etag = etag_of(versions)
+    if is_not_modified(request, etag):
+        return not_modified_response(etag)
+    simulations = await simulations_read_bl.get_simulations(versions)
+    if not simulations:
+        raise HTTPException(status_code=404, detail=f"Simulation with ID {simulation_id} not found")
+    return Response(
+        content=simulations[0].body,
+        media_type=JSON_CONTENT_TYPE,
+        headers={"ETag": etag_of({simulation_id: simulations[0].version})}
+    )
 
-@simulation_data_router.get("/get-all-simulations-cursor", summary="Get all simulations (cursor-based)", response_model=CursorPaginationResponse)
+@simulation_data_router.get(
+    "/get-all-simulations-cursor",
+    summary="Get all simulations (cursor-based)",
+    response_model=Union[CursorPaginationResponse[TopologySimulation], CursorPaginationResponse[SimulationSummary]]
+)
 @handle_api_exceptions
 async def get_all_simulations_cursor(
+    request: Request,
     cursor: str = Query(None, description="MongoDB ObjectId to start after"),
     page_size: int = Query(10, ge=1, le=100),
     with_total: bool = Query(False, description="Whether to include total count"),
+    status: Optional[List[TopologyStatusEnum]] = Query(None, description="Only simulations with one of these statuses"),
+    created_after: Optional[datetime] = Query(None, description="Only simulations created after this time (UTC when naive)"),
+    fields: Optional[str] = Query(None, description=f"Comma-separated fields to return summaries with, instead of full simulations: {', '.join(SUMMARY_FIELDS)}"),
     db=Depends(get_mongo_read_manager)
-) -> CursorPaginationResponse:
+) -> Response:
     """
-    Get a cursor-paginated list of all simulations.
-    Returns a CursorPaginationResponse containing a list of Simulation objects, next_cursor, and pagination metadata.
+    Get a cursor-paginated list of all simulations, optionally filtered by status and creation time.
+    Returns a CursorPaginationResponse containing a list of Simulation objects, next_cursor, and pagination metadata,
+    or of SimulationSummary objects with only the _id and the requested 'fields' (projected by the database),
+    or 304 when the page did not change since the If-None-Match ETag.
     """
-    logger.info(f"Will get all simulations (cursor={cursor}, page_size={page_size}, with_total={with_total})")
-    topologies_simulations_db = TopologiesSimulationsDB(db)
+    logger.info(f"Will get all simulations (cursor={cursor}, page_size={page_size}, with_total={with_total}, "
+                f"status={status}, created_after={created_after}, fields={fields})")
+    simulations_read_bl = SimulationsReadBusinessLogic(db)
     req = CursorPaginationRequest(cursor=cursor, page_size=page_size, with_total=with_total)
-    return await topologies_simulations_db.list_all_simulations(req)
+    query = TopologiesSimulationsDB.simulations_filter(status, created_after)
+    if fields is not None:
+        etag, body = await simulations_read_bl.get_summaries_page_json(
+            req, [field.strip() for field in fields.split(",") if field.strip()], query
+        )
+        if is_not_modified(request, etag):
+            return not_modified_response(etag)
+        return Response(content=body, media_type=JSON_CONTENT_TYPE, headers={"ETag": etag})
+    page = await simulations_read_bl.get_page(req, query)
+    if is_not_modified(request, page.etag):
+        return not_modified_response(page.etag)
+    etag, body = await simulations_read_bl.get_page_json(page)
+    return Response(content=body, media_type=JSON_CONTENT_TYPE, headers={"ETag": etag})
@@ -6,6 +6,8 @@ from app.api.simulation_management_api import simulation_management_router
 from app.api.simulation_data_api import simulation_data_router
 from app.api.debug_api import debug_router
 from app.app_container import app_container
+from app.business_logic.events_broadcaster import EventsBroadcaster
+from app.db.topologies_simulations_db import TopologiesSimulationsDB
 from app.utils.logger import LoggerManager
 
 main_logger = LoggerManager.get_logger('Api ASGI')
@@ -21,12 +23,18 @@ class Application:
             main_logger.info("Starting application...")
             await self.mongo_manager.connect()
             await self.mongo_manager.ensure_indexes()
+            if self.config.MONGODB_VERIFY_QUERY_PLANS:
+                await self.mongo_manager.verify_indexes()
+            await TopologiesSimulationsDB(self.mongo_manager.db).backfill_link_counters()
             app.state.db = self.mongo_manager.db
+            app.state.events_broadcaster = EventsBroadcaster(self.mongo_manager.db)
             main_logger.info("MongoDB connected and repository initialized.")
             yield
         finally:
             try:
                 main_logger.info("Shutting down application...")
+                if getattr(app.state, "events_broadcaster", None) is not None:
+                    app.state.events_broadcaster.close()
                 await self.mongo_manager.close()
                 main_logger.info("MongoDB connection closed.")
             except Exception as e:
@@ -0,0 +1,218 @@
+"""
+Push of simulation events to API subscribers.
+
+One `EventsBroadcaster` per API process tails the events collection and fans every event out in
+memory to the subscriptions whose sim ids and event types match, so SSE / WebSocket clients add no
+database queries of their own. The reader runs only while there are subscribers:
+    - change stream on inserted events (EVENTS_PUSH_CHANGE_STREAM_ENABLED), projected server-side
+      to the fields of a push message
+    - polling by _id every EVENTS_PUSH_POLL_INTERVAL_SEC where change streams are unsupported
+A subscriber that does not keep up loses its oldest buffered events and is told how many, so it can
+resync from POST /simulation-data/statuses.
+"""
+import asyncio
+from collections import defaultdict
+from contextlib import asynccontextmanager
+from typing import AsyncIterator, Dict, Iterable, List, Optional, Set
+from bson.objectid import ObjectId
+from app.app_container import app_container
+from app.business_logic.exceptions import ChangeStreamUnavailableError
+from app.db.events_db import EventsDB
+from app.models.statuses_enums import EventType
+from app.utils.logger import LoggerManager
+
+# Status transitions pushed to subscribers (LINK_RUN events only schedule links)
+PUSHED_EVENT_TYPES = [event_type.value for event_type in EventType if event_type != EventType.LINK_RUN]
+
+# Fields of the event documents read by the reader
+PUSH_PROJECTION = {
+    "_id": 1,
+    "event_type": 1,
+    "sim_id": 1,
+    "row_version": 1,
+    "created_at": 1,
+    "after._id": 1,
+    "after.status": 1,
+    "after.execution_state.status": 1,
+}
+
+# Last message of a closed subscription
+CLOSED = None
+
+
+def to_push_message(doc: dict) -> dict:
+    """The message pushed for an event document (PUSH_PROJECTION fields)."""
+    after = doc.get("after") or {}
+    message = {
+        "event_id": doc.get("_id"),
+        "event_type": doc.get("event_type"),
+        "sim_id": doc.get("sim_id"),
+        "row_version": doc.get("row_version"),
+        "created_at": doc.get("created_at"),
+    }
+    if doc.get("event_type") == EventType.LINK_COMPLETED.value:
+        message["link_id"] = after.get("_id")
+        message["link_status"] = (after.get("execution_state") or {}).get("status")
+    else:
+        # Snapshot events carry the simulation status, delta events only their event type
+        message["sim_id"] = message["sim_id"] or after.get("_id")
+        message["status"] = after.get("status")
+    return message
+
+
+class Subscription:
+    """
+    The events of some simulations (all when sim_ids is empty) and event types (all pushed ones when
+    event_types is empty), buffered in a bounded queue.
+    """
+    def __init__(self, sim_ids: Iterable[str], event_types: Iterable[str], queue_size: int):
+        self.sim_ids = frozenset(sim_ids)
+        self.event_types = frozenset(event_types)
+        self.dropped = 0
+        self._queue: asyncio.Queue = asyncio.Queue(maxsize=queue_size)
+
+    def matches(self, message: dict) -> bool:
+        return not self.event_types or message["event_type"] in self.event_types
+
+    def put(self, message: Optional[dict]) -> None:
+        """Buffer a message, dropping the oldest one when the queue is full."""
+        if self._queue.full():
+            self._queue.get_nowait()
+            self.dropped += 1
+        self._queue.put_nowait(message)
+
+    def close(self) -> None:
+        self.put(CLOSED)
+
+    async def get_batch(self, max_size: int) -> List[Optional[dict]]:
+        """The buffered messages (waits for at least one, returns at most max_size), ending with CLOSED once closed."""
+        messages = [await self._queue.get()]
+        while len(messages) < max_size and not self._queue.empty() and messages[-1] is not CLOSED:
+            messages.append(self._queue.get_nowait())
+        return messages
+
+    def take_dropped(self) -> int:
+        """The number of messages dropped since the last call."""
+        dropped, self.dropped = self.dropped, 0
+        return dropped
+
+
+class EventsBroadcaster:
+    def __init__(self, db):
+        self.logger = LoggerManager.get_logger('events_broadcaster')
+        self.config = app_container.config()
+        self.events_db = EventsDB(db)
+        self._by_sim_id: Dict[str, Set[Subscription]] = defaultdict(set)
+        self._all_sims: Set[Subscription] = set()
+        self._reader: Optional[asyncio.Task] = None
+
+    @property
+    def subscribers_count(self) -> int:
+        return len(self._all_sims) + len({subscription for subscriptions in self._by_sim_id.values() for subscription in subscriptions})
+
+    def subscribe(self, sim_ids: Iterable[str] = (), event_types: Iterable[str] = ()) -> Subscription:
+        """Subscribe to the events of some simulations, starting the reader if it is not running."""
+        subscription = Subscription(sim_ids, event_types, self.config.EVENTS_PUSH_QUEUE_SIZE)
+        if subscription.sim_ids:
+            for sim_id in subscription.sim_ids:
+                self._by_sim_id[sim_id].add(subscription)
+        else:
+            self._all_sims.add(subscription)
+        if self._reader is None or self._reader.done():
+            self._reader = asyncio.create_task(self._run())
+        return subscription
+
+    def unsubscribe(self, subscription: Subscription) -> None:
+        """Remove a subscription, stopping the reader after the last one."""
+        self._all_sims.discard(subscription)
+        for sim_id in subscription.sim_ids:
+            subscriptions = self._by_sim_id.get(sim_id)
+            if subscriptions is not None:
+                subscriptions.discard(subscription)
+                if not subscriptions:
+                    del self._by_sim_id[sim_id]
+        if not self._all_sims and not self._by_sim_id and self._reader is not None:
+            self._reader.cancel()
+            self._reader = None
+
+    @asynccontextmanager
+    async def subscription(self, sim_ids: Iterable[str] = (), event_types: Iterable[str] = ()) -> AsyncIterator[Subscription]:
+        subscription = self.subscribe(sim_ids, event_types)
+        try:
+            yield subscription
+        finally:
+            self.unsubscribe(subscription)
+
+    def publish(self, docs: List[dict]) -> int:
+        """
+        Fan event documents out to the matching subscriptions.
+
+        Returns:
+            int: The number of messages buffered
+        """
+        delivered = 0
+        for doc in docs:
+            message = to_push_message(doc)
+            for subscriptions in (self._all_sims, self._by_sim_id.get(message["sim_id"], ())):
+                for subscription in subscriptions:
+                    if subscription.matches(message):
+                        subscription.put(message)
+                        delivered += 1
+        return delivered
+
+    async def _watch(self) -> None:
+        async for docs in self.events_db.watch_events(
+            {"event_type": {"$in": PUSHED_EVENT_TYPES}},
+            batch_size=self.config.EVENTS_PUSH_BATCH_SIZE,
+            max_await_time_ms=self.config.EVENTS_PUSH_MAX_AWAIT_MS,
+            projection=PUSH_PROJECTION
+        ):
+            if docs:
+                self.publish(docs)
+
+    async def _poll(self) -> None:
+        # Events are only pushed from now on, as with the change stream
+        last_id = str(ObjectId())
+        while True:
+            docs = await self.events_db.find_events_after_id(
+                last_id,
+                {"event_type": {"$in": PUSHED_EVENT_TYPES}},
+                projection=PUSH_PROJECTION,
+                limit=self.config.EVENTS_PUSH_BATCH_SIZE
+            )
+            if docs:
+                last_id = docs[-1]["_id"]
+                self.publish(docs)
+            if len(docs) < self.config.EVENTS_PUSH_BATCH_SIZE:
+                await asyncio.sleep(self.config.EVENTS_PUSH_POLL_INTERVAL_SEC)
+
+    async def _run(self) -> None:
+        """The reader: tail the events collection until cancelled, closing the subscriptions if it fails."""
+        self.logger.info("Started pushing simulation events to subscribers")
+        try:
+            if self.config.EVENTS_PUSH_CHANGE_STREAM_ENABLED:
+                try:
+                    await self._watch()
+                    return
+                except ChangeStreamUnavailableError as e:
+                    self.logger.warning(f"Falling back to polling the events to push: {e}")
+            await self._poll()
+        except asyncio.CancelledError:
+            self.logger.info("Stopped pushing simulation events, no subscribers left")
+            raise
+        except Exception as e:
+            self.logger.error(f"Error while reading the events to push, closing {self.subscribers_count} subscriptions: {e}")
+            self.close()
+
+    def close(self) -> None:
+        """Stop the reader and close all the subscriptions."""
+        subscriptions = set(self._all_sims)
+        for sim_subscriptions in self._by_sim_id.values():
+            subscriptions.update(sim_subscriptions)
+        self._all_sims.clear()
+        self._by_sim_id.clear()
+        for subscription in subscriptions:
+            subscription.close()
+        if self._reader is not None and self._reader is not asyncio.current_task():
+            self._reader.cancel()
+        self._reader = None
@@ -0,0 +1,119 @@
+"""
+Archival of old events.
+
+Handled and published events are only kept in the `events` collection while they can still be needed.
+The archiver copies the ones last updated more than EVENTS_ARCHIVE_AFTER_SEC ago to compressed files
+under EVENTS_ARCHIVE_DIR, then deletes them, so the collection (and its indexes) stay bounded to the
+recent events. The retention TTL index (EVENTS_TTL_SEC) removes whatever the archiver did not.
+
+Formats:
+    - ndjson:  gzip compressed, one MongoDB Extended JSON (relaxed) document per line
+    - parquet: zstd compressed, the event id, type, simulation and times as columns plus the
+               Extended JSON document; needs pyarrow
+"""
+import asyncio
+import gzip
+import os
+from datetime import UTC, datetime, timedelta
+from typing import List
+from bson import json_util
+from bson.json_util import RELAXED_JSON_OPTIONS
+from app.app_container import app_container
+from app.business_logic.exceptions import ConfigError
+from app.db.events_db import EventsDB
+from app.utils.logger import LoggerManager
+
+try:
+    import pyarrow
+    import pyarrow.parquet
+except ImportError:  # optional, only needed for the parquet format
+    pyarrow = None
+
+ARCHIVE_FORMATS = ("ndjson", "parquet")
+
+
+def _to_json(doc: dict) -> str:
+    return json_util.dumps(doc, json_options=RELAXED_JSON_OPTIONS)
+
+
+def write_ndjson(path: str, docs: List[dict]) -> None:
+    with gzip.open(path, "wt", encoding="utf-8") as file:
+        for doc in docs:
+            file.write(_to_json(doc))
+            file.write("\n")
+
+
+def write_parquet(path: str, docs: List[dict]) -> None:
+    table = pyarrow.table({
+        "_id": [str(doc.get("_id")) for doc in docs],
+        "event_type": [doc.get("event_type") for doc in docs],
+        "sim_id": [doc.get("sim_id") for doc in docs],
+        "created_at": [doc.get("created_at") for doc in docs],
+        "updated_at": [doc.get("updated_at") for doc in docs],
+        "document": [_to_json(doc) for doc in docs],
+    })
+    pyarrow.parquet.write_table(table, path, compression="zstd")
+
+
+WRITERS = {"ndjson": (write_ndjson, ".ndjson.gz"), "parquet": (write_parquet, ".parquet")}
+
+
+class EventsRetentionBusinessLogic:
+    def __init__(self, db):
+        self.logger = LoggerManager.get_logger('events_retention_bl')
+        self.config = app_container.config()
+        self.events_db = EventsDB(db)
+        self.archive_format = self.config.EVENTS_ARCHIVE_FORMAT
+        if self.archive_format not in ARCHIVE_FORMATS:
+            raise ConfigError(f"Unsupported events archive format: {self.archive_format}")
+        if self.archive_format == "parquet" and pyarrow is None:
+            raise ConfigError("pyarrow is required for the parquet events archive format")
+        if self.config.EVENTS_RETENTION_ENABLED and self.config.EVENTS_ARCHIVE_AFTER_SEC >= self.config.EVENTS_TTL_SEC:
+            self.logger.warning("EVENTS_ARCHIVE_AFTER_SEC is not lower than EVENTS_TTL_SEC, "
+                                "events may expire before they are archived")
+
+    def _archive_path(self, first: dict) -> str:
+        suffix = WRITERS[self.archive_format][1]
+        updated_at = first.get("updated_at") or datetime.now(UTC)
+        name = f"events-{updated_at:%Y%m%dT%H%M%S}-{first.get('_id')}{suffix}"
+        return os.path.join(self.config.EVENTS_ARCHIVE_DIR, name)
+
+    def _write(self, docs: List[dict]) -> str:
+        """Write an archive file atomically (temporary file, then rename) and return its path."""
+        os.makedirs(self.config.EVENTS_ARCHIVE_DIR, exist_ok=True)
+        path = self._archive_path(docs[0])
+        tmp_path = f"{path}.tmp"
+        WRITERS[self.archive_format][0](tmp_path, docs)
+        os.replace(tmp_path, path)
+        return path
+
+    async def archive_batch(self, older_than: datetime) -> int:
+        """
+        Archive and delete one batch of events last updated before 'older_than'.
+        Events are deleted only once their archive file is written.
+
+        Returns:
+            int: The number of archived events
+        """
+        docs = await self.events_db.find_archivable_events(older_than, self.config.EVENTS_ARCHIVE_BATCH_SIZE)
+        if not docs:
+            return 0
+        path = await asyncio.to_thread(self._write, docs)
+        deleted = await self.events_db.delete_events([doc["_id"] for doc in docs])
+        self.logger.info(f"Archived {len(docs)} events to {path}, deleted {deleted}")
+        return len(docs)
+
+    async def archive_old_events(self) -> int:
+        """
+        Archive all the handled and published events older than EVENTS_ARCHIVE_AFTER_SEC.
+
+        Returns:
+            int: The number of archived events
+        """
+        older_than = datetime.now(UTC) - timedelta(seconds=self.config.EVENTS_ARCHIVE_AFTER_SEC)
+        archived = 0
+        while True:
+            count = await self.archive_batch(older_than)
+            archived += count
+            if count < self.config.EVENTS_ARCHIVE_BATCH_SIZE:
+                return archived
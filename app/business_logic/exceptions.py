@@ -15,6 +15,10 @@ class DatabaseError(NetworkSimulationError):
     """Exception raised for database connection and operation errors."""
     pass
 
+class ChangeStreamUnavailableError(DatabaseError):
+    """Exception raised when the MongoDB deployment does not support change streams."""
+    pass
+
 class SimulationError(NetworkSimulationError):
     """Exception raised for errors during simulation execution."""
     pass
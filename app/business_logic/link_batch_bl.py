@@ -0,0 +1,210 @@
+"""
+Batch execution of LINK_RUN events.
+
+Runs the links of many simulations at once, with the same rules as `LinkBusinessLogic.run_link`:
+the simulations are read with one projected query, the pre- and post-link validations are evaluated as
+NumPy masks over the whole batch, the links share a single wait for their latencies, and the
+results are written with one bulk write.
+"""
+import asyncio
+import numpy as np
+from datetime import datetime, timedelta
+from typing import Callable, Dict, List, Optional, Sequence, Tuple
+from app.app_container import app_container
+from app.business_logic.link_bl import LinkBusinessLogic
+from app.db.topologies_simulations_db import TopologiesSimulationsDB
+from app.models.events_models import LinkEvent
+from app.models.statuses_enums import LinkStatusEnum, TopologyStatusEnum
+from app.models.topolgy_models import LinkExecutionState
+from app.utils.error_handler import run_in_transaction
+from app.utils.logger import LoggerManager
+
+# Upper bound of distinct encoded values per batch, used to pack (position, value) keys into an int64
+KEY_SPACE = 2 ** 32
+
+# Only the fields the validations need are read, as raw documents
+PRE_VALIDATION_PROJECTION = {
+    "status": 1,
+    "topology.nodes": 1,
+    "topology.config.duration_sec": 1,
+    "links_execution_state.not_processed_links._id": 1,
+}
+POST_VALIDATION_PROJECTION = {
+    "status": 1,
+    "topology.config.packet_loss_percent": 1,
+    "processed_count": 1,
+    "failed_count": 1,
+}
+
+
+class LinkBatchBusinessLogic:
+    def __init__(self, db):
+        self.logger = LoggerManager.get_logger('link_batch_bl')
+        self.config = app_container.config()
+        self.db = db
+        self.topologies_simulations_db = TopologiesSimulationsDB(db)
+        self.link_bl = LinkBusinessLogic(db)
+
+    @staticmethod
+    def _keys(sim_index: np.ndarray, values: Sequence[str], codes: Dict[str, int]) -> np.ndarray:
+        """
+        Build integer (simulation position, value) keys, so membership can be checked for all simulations at once.
+        Values are encoded through 'codes', which must be shared by the keys being compared.
+        """
+        value_codes = np.fromiter((codes.setdefault(value, len(codes)) for value in values), dtype=np.int64, count=len(values))
+        return sim_index.astype(np.int64) * KEY_SPACE + value_codes
+
+    @staticmethod
+    def pre_validation_mask(link_events: List[LinkEvent], simulations: List[dict], sim_index: np.ndarray) -> np.ndarray:
+        """
+        Vectorized LinksValidators.run_pre_link_validator.
+
+        Args:
+            link_events: The LINK_RUN events of the batch
+            simulations: The simulation documents of the batch (PRE_VALIDATION_PROJECTION)
+            sim_index: Position in 'simulations' of each event's simulation
+
+        Returns:
+            np.ndarray: Boolean mask of the links passing node existence, simulation state,
+                latency and not-processed checks
+        """
+        duration = np.array([simulation["topology"]["config"]["duration_sec"] for simulation in simulations], dtype=float)
+        valid_state = np.array([
+            simulation.get("status") in (TopologyStatusEnum.running, None) for simulation in simulations
+        ], dtype=bool)
+
+        codes: Dict[str, int] = {}
+        nodes = [simulation["topology"]["nodes"] for simulation in simulations]
+        node_keys = LinkBatchBusinessLogic._keys(
+            np.repeat(np.arange(len(simulations)), [len(simulation_nodes) for simulation_nodes in nodes]),
+            [node for simulation_nodes in nodes for node in simulation_nodes],
+            codes
+        )
+        not_processed = [simulation["links_execution_state"]["not_processed_links"] for simulation in simulations]
+        not_processed_keys = LinkBatchBusinessLogic._keys(
+            np.repeat(np.arange(len(simulations)), [len(links) for links in not_processed]),
+            [link["_id"] for links in not_processed for link in links],
+            codes
+        )
+
+        links = [event.after for event in link_events]
+        latency = np.array([link.latency for link in links], dtype=float)
+        from_exists = np.isin(LinkBatchBusinessLogic._keys(sim_index, [link.from_node for link in links], codes), node_keys)
+        to_exists = np.isin(LinkBatchBusinessLogic._keys(sim_index, [link.to_node for link in links], codes), node_keys)
+        link_not_processed = np.isin(LinkBatchBusinessLogic._keys(sim_index, [link.id for link in links], codes), not_processed_keys)
+
+        return from_exists & to_exists & valid_state[sim_index] & (latency <= duration[sim_index]) & link_not_processed
+
+    @staticmethod
+    def post_validation_mask(simulations: List[dict], sim_index: np.ndarray) -> np.ndarray:
+        """
+        Vectorized LinksValidators.run_post_simulation_Validator (packet loss threshold and running state).
+
+        Args:
+            simulations: The simulation documents of the batch (POST_VALIDATION_PROJECTION),
+                as read after the links latency
+            sim_index: Position in 'simulations' of each event's simulation
+
+        Returns:
+            np.ndarray: Boolean mask of the links whose simulation passes the post-link validation
+        """
+        threshold = np.array([simulation["topology"]["config"]["packet_loss_percent"] for simulation in simulations], dtype=float)
+        running = np.array([simulation.get("status") == TopologyStatusEnum.running for simulation in simulations], dtype=bool)
+
+        processed_counts = np.array([simulation.get("processed_count", 0) for simulation in simulations], dtype=int)
+        failed_counts = np.array([simulation.get("failed_count", 0) for simulation in simulations], dtype=int)
+        loss_ratio = np.divide(failed_counts, processed_counts, out=np.zeros(len(simulations)), where=processed_counts > 0)
+        packet_loss_valid = (failed_counts == 0) | (processed_counts == 0) | (loss_ratio <= threshold)
+
+        return (packet_loss_valid & running)[sim_index]
+
+    async def _get_simulations(self, sim_ids: List[str], projection: dict) -> Tuple[List[Optional[dict]], np.ndarray]:
+        """
+        Read the simulation documents of the batch with one query.
+
+        Returns:
+            tuple: The documents in 'sim_ids' order (None when not found) and a mask of the found ones
+        """
+        docs = await self.topologies_simulations_db.get_simulations_docs_by_ids(sim_ids, projection)
+        by_id = {doc["_id"]: doc for doc in docs}
+        simulations = [by_id.get(sim_id) for sim_id in sim_ids]
+        return simulations, np.array([simulation is not None for simulation in simulations], dtype=bool)
+
+    @staticmethod
+    def _masked(simulations: List[Optional[dict]], exists: np.ndarray, sim_index: np.ndarray, mask_fn: Callable) -> np.ndarray:
+        """Evaluate a mask over the found simulations only; links of missing simulations are False."""
+        if not exists.any():
+            return np.zeros(len(sim_index), dtype=bool)
+        found_position = np.cumsum(exists) - 1
+        link_exists = exists[sim_index]
+        mask = mask_fn([simulation for simulation in simulations if simulation is not None], found_position[sim_index])
+        return mask & link_exists
+
+    async def run_links(self, batch: List[Tuple[LinkEvent, bool]]) -> List[Optional[Exception]]:
+        """
+        Run a batch of links, given as (LINK_RUN event, is last retry) pairs.
+
+        Returns:
+            List[Optional[Exception]]: Per link, None when it was handled (or its simulation does not exist),
+                otherwise the error to raise for its message, like run_link raises it
+        """
+        link_events = [event for event, _ in batch]
+        is_last_retry = np.array([last_retry for _, last_retry in batch], dtype=bool)
+        start_time = datetime.now()
+
+        sim_ids = list(dict.fromkeys(event.sim_id for event in link_events))
+        sim_position = {sim_id: position for position, sim_id in enumerate(sim_ids)}
+        sim_index = np.array([sim_position[event.sim_id] for event in link_events], dtype=int)
+
+        simulations, exists = await self._get_simulations(sim_ids, PRE_VALIDATION_PROJECTION)
+        link_exists = exists[sim_index]
+        pre_valid = self._masked(simulations, exists, sim_index,
+                                 lambda sims, index: self.pre_validation_mask(link_events, sims, index))
+
+        # Links run concurrently, so the batch waits once for its slowest valid link
+        latency = np.array([event.after.latency for event in link_events], dtype=float)
+        await asyncio.sleep(float(np.max(latency, where=pre_valid, initial=0.0)))
+
+        simulations, exists = await self._get_simulations(sim_ids, POST_VALIDATION_PROJECTION)
+        post_valid = self._masked(simulations, exists, sim_index, self.post_validation_mask)
+
+        done = pre_valid & post_valid
+        completed = link_exists & (done | is_last_retry)
+        end_time = datetime.now()
+
+        handled_event_ids = []
+        completed_events = []
+        for position in np.flatnonzero(completed).tolist():
+            current_event = link_events[position]
+            completed_link = current_event.after.model_copy(update={"execution_state": LinkExecutionState(
+                status=LinkStatusEnum.done if done[position] else LinkStatusEnum.failed,
+                start_time=start_time,
+                end_time=start_time + timedelta(seconds=float(latency[position])) if done[position] else end_time,
+                retry_count=current_event.after.execution_state.retry_count + 1
+            )})
+            handled_event_ids.append(current_event.event_id)
+            completed_events.append(LinkBusinessLogic.build_link_completed_event(current_event, completed_link))
+
+        if completed_events:
+            # Retried as a whole on write conflicts, so one conflicting simulation does not fail the batch
+            await run_in_transaction(
+                self.db.client,
+                lambda session: self.link_bl.store_completed_links(handled_event_ids, completed_events, session=session),
+                self.config.MONGODB_TRANSACTION_MAX_ATTEMPTS
+            )
+
+        self.logger.info(
+            f"Ran batch of {len(link_events)} links from {int(exists.sum())} simulations: "
+            f"{int(done.sum())} done, {int((completed & ~done).sum())} failed, "
+            f"{int((link_exists & ~completed).sum())} to retry, {int((~link_exists).sum())} without simulation"
+        )
+
+        results: List[Optional[Exception]] = []
+        for position, event in enumerate(link_events):
+            if not link_exists[position] or done[position]:
+                results.append(None)
+            elif is_last_retry[position]:
+                results.append(ValueError(f"Link {event.after.id} failed validations"))
+            else:
+                results.append(Exception(f"Link {event.after.id} failed to process: failed validations"))
+        return results
@@ -9,38 +9,137 @@ from app.models.events_models import LinkEvent
 from app.db.topologies_simulations_db import TopologiesSimulationsDB
 from app.models.topolgy_models import LinkExecutionState
 from app.models.statuses_enums import EventType
+from app.models.mapper import SimulationMapper
+from app.models.events_models import BaseEvent, DELTA_SCHEMA_VERSION, SNAPSHOT_SCHEMA_VERSION
 from app.models.topolgy_models import Link
 from bson.objectid import ObjectId
+from app.app_container import app_container
+from app.utils.micro_batcher import MicroBatcher
+from app.utils.error_handler import run_in_transaction
+from typing import List, Tuple
 import copy
 import json
 class LinkBusinessLogic:
     def __init__(self, db):
         self.logger = LoggerManager.get_logger('links_bl')
+        self.config = app_container.config()
         self.events_db = EventsDB(db)
         self.topologies_simulations_db = TopologiesSimulationsDB(db)
         self.validator_bl = LinksValidators()
+        self.completion_batcher = None
+        if self.config.LINK_COMPLETION_BATCH_ENABLED:
+            self.completion_batcher = MicroBatcher(
+                self._write_completed_links,
+                max_size=self.config.LINK_COMPLETION_BATCH_MAX_SIZE,
+                window_ms=self.config.LINK_COMPLETION_BATCH_WINDOW_MS,
+                name='link_completion_batcher'
+            )
+
+    @staticmethod
+    def build_link_completed_event(current_event: LinkEvent, completed_link: Link) -> LinkEvent:
+        """
+        Build the LINK_COMPLETED event stored for a link that finished running.
+        With EVENT_DELTAS_ENABLED it only carries the completed link.
+        """
+        delta_events = app_container.config().EVENT_DELTAS_ENABLED
+        completed_link_event = LinkEvent(
+            event_type=EventType.LINK_COMPLETED,
+            schema_version=DELTA_SCHEMA_VERSION if delta_events else SNAPSHOT_SCHEMA_VERSION,
+            # Delta events do not repeat the link as it was before completing
+            before=None if delta_events else current_event.after,
+            after=completed_link,
+            sim_id=current_event.sim_id,
+            is_handled=True,
+            published=False,
+            published_at=datetime.now(),
+            retry_count=current_event.after.execution_state.retry_count
+        )
+        completed_link_event.event_id = str(ObjectId())
+        return completed_link_event
+
+    async def store_completed_links(self, handled_event_ids: List[str], completed_link_events: List[LinkEvent], session=None) -> int:
+        """
+        Mark LINK_RUN events as handled and store their LINK_COMPLETED events, with a single bulk write.
+
+        With INLINE_COMPLETION_DETECTION_ENABLED the completed links are also moved to processed on their
+        simulations, and a SIMULATION_COMPLETED event is stored for every simulation whose last link this
+        completes. The LINK_COMPLETED events are then stored as published, as SimulationCompletedProducer
+        has nothing left to do with them. Must be called within the caller's transaction.
+
+        Returns:
+            int: Number of simulations completed by these links
+        """
+        events: List[BaseEvent] = list(completed_link_events)
+        completed_simulations = []
+        if self.config.INLINE_COMPLETION_DETECTION_ENABLED:
+            links_by_simulation = {}
+            for completed_link_event in completed_link_events:
+                completed_link_event.published = True
+                links_by_simulation.setdefault(completed_link_event.sim_id, []).append(completed_link_event.after)
+
+            for sim_id, completed_links in links_by_simulation.items():
+                counters = await self.topologies_simulations_db.complete_links(sim_id, completed_links, session=session)
+                # None when the links were already moved, so a redelivered link does not complete the simulation twice
+                if counters is None or counters.get("processed_count", 0) < counters.get("total_links", 0):
+                    continue
+                if self.config.EVENT_DELTAS_ENABLED:
+                    # The links are already applied, so the completion delta is empty
+                    completed_simulations.append(sim_id)
+                    events.append(SimulationMapper.simulation_to_delta_event(
+                        sim_id, counters.get("row_version"), EventType.SIMULATION_COMPLETED, []
+                    ))
+                    continue
+                simulation = await self.topologies_simulations_db.get_topology_simulation(sim_id, session=session)
+                if simulation is not None:
+                    completed_simulations.append(sim_id)
+                    events += SimulationMapper.simulations_to_events([simulation], EventType.SIMULATION_COMPLETED)
+
+            if completed_simulations:
+                self.logger.info(f"Simulations {completed_simulations} completed")
+
+        await self.events_db.bulk_complete_link_events(handled_event_ids, events, session=session)
+        return len(completed_simulations)
+
+    async def _write_completed_links(self, completions: List[Tuple[str, LinkEvent]]) -> List[None]:
+        """
+        Write a batch of link completions in one transaction with a single bulk write.
+        Completions are (handled LINK_RUN event id, LINK_COMPLETED event) pairs.
+        """
+        await run_in_transaction(
+            self.events_db.db.client,
+            lambda session: self.store_completed_links(
+                [event_id for event_id, _ in completions],
+                [completed_link_event for _, completed_link_event in completions],
+                session=session
+            ),
+            self.config.MONGODB_TRANSACTION_MAX_ATTEMPTS
+        )
+        return [None] * len(completions)
 
     async def _link_completed_db_updates(self, current_event: LinkEvent, completed_link: Link):
         """
         Update the final state of the link execution in a transaction.
         This ensures that both the event and simulation updates are atomic.
+        With LINK_COMPLETION_BATCH_ENABLED, the completion joins the next micro-batch and this
+        returns once the batch is committed, so the message is only acked after its write.
         """
-        async with await self.events_db.db.client.start_session() as session:
-            async with session.start_transaction():
+        if self.completion_batcher:
+            completed_link_event = self.build_link_completed_event(current_event, completed_link)
+            await self.completion_batcher.submit((current_event.event_id, completed_link_event))
+            return
+
+        completed_link_event = self.build_link_completed_event(current_event, completed_link)
+
+        async def write(session):
+            if self.config.INLINE_COMPLETION_DETECTION_ENABLED:
+                await self.store_completed_links([current_event.event_id], [completed_link_event], session=session)
+            else:
                 await self.events_db.update_events_handled([current_event.event_id], session=session)
-                completed_link_event = LinkEvent(
-                    event_type=EventType.LINK_COMPLETED,
-                    before=current_event.after,
-                    after=completed_link,
-                    sim_id=current_event.sim_id,
-                    is_handled=True,
-                    published=False,
-                    published_at=datetime.now(),
-                    retry_count=current_event.after.execution_state.retry_count
-                )
-                completed_link_event.event_id = str(ObjectId())
                 await self.events_db.store_events([completed_link_event], session=session)
 
+        # Retried on write conflicts (concurrent links of the simulation), not by re-running the link
+        await run_in_transaction(self.events_db.db.client, write, self.config.MONGODB_TRANSACTION_MAX_ATTEMPTS)
+
     async def run_link(self, current_event: LinkEvent, is_last_retry: bool):
         if is_last_retry:
             self.logger.info(f"Running link {current_event.after.id} for simulation {current_event.sim_id} (last retry)")
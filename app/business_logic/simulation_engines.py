@@ -0,0 +1,171 @@
+"""
+Simulation engines, selected per simulation by `Config.engine`.
+
+- `real_time`: every link becomes a LINK_RUN event, executed by the links consumers in wall-clock time.
+- `virtual_clock`: the whole simulation runs in-process as a discrete-event simulation on an event heap,
+  so a simulation finishes in milliseconds regardless of its link latencies.
+"""
+import heapq
+from abc import ABC, abstractmethod
+from datetime import datetime, timedelta
+from typing import Dict, Type
+from app.db.events_db import EventsDB
+from app.db.topologies_simulations_db import TopologiesSimulationsDB
+from app.business_logic.validators.links_validators import LinksValidators
+from app.models.mapper import SimulationMapper
+from app.models.statuses_enums import EventType, LinkStatusEnum, TopologyStatusEnum
+from app.models.topolgy_models import LinkExecutionState
+from app.models.topolgy_simulation_models import TopologySimulation
+from app.utils.logger import LoggerManager
+
+
+class SimulationEngine(ABC):
+    """
+    Base class for simulation engines.
+    An engine starts a simulation that passed the pre-simulation validators.
+    """
+    def __init__(self, db):
+        self.logger = LoggerManager.get_logger(self.__class__.__name__)
+        self.topologies_simulations_db = TopologiesSimulationsDB(db)
+        self.events_db = EventsDB(db)
+
+    @abstractmethod
+    async def run(self, simulation: TopologySimulation, session=None) -> int:
+        """
+        Start the simulation and persist its state.
+
+        Args:
+            simulation: The simulation to run
+            session: MongoDB session for transaction support
+
+        Returns:
+            int: Number of events stored for the simulation
+        """
+        pass
+
+
+class RealTimeSimulationEngine(SimulationEngine):
+    """
+    Marks the simulation as running and stores a LINK_RUN event per link.
+    Links are executed by the links consumers, each one sleeping for its latency.
+    """
+    async def run(self, simulation: TopologySimulation, session=None) -> int:
+        simulation.status = TopologyStatusEnum.running
+        simulation.updated_at = datetime.now()
+        simulation.simulation_time.start_time = datetime.now()
+        await self.topologies_simulations_db.update_simulation_fields(
+            simulation.sim_id,
+            simulation.row_version,
+            {"status": simulation.status, "simulation_time.start_time": simulation.simulation_time.start_time},
+            session=session
+        )
+
+        events = SimulationMapper.simulation_to_links_event(simulation)
+        await self.events_db.store_events(events, session=session)
+        return len(events)
+
+
+class VirtualClockSimulationEngine(SimulationEngine):
+    """
+    Runs the whole simulation in-process on a virtual clock.
+
+    All links start at virtual time 0, like the links consumers start them concurrently, and complete
+    after their latency. Completions are processed in virtual time order from an event heap, applying
+    the same rules as the real-time link validators:
+        - a link whose nodes are not in the topology, or whose latency exceeds duration_sec, fails at once
+        - a link completing once the failed/processed ratio is above packet_loss_percent fails
+    The final state is written once, and a handled SIMULATION_COMPLETED event is stored for history.
+    Link and simulation times are virtual timestamps relative to the simulation start time.
+    """
+    def __init__(self, db):
+        super().__init__(db)
+        self.links_validator = LinksValidators()
+
+    def simulate(self, simulation: TopologySimulation) -> float:
+        """
+        Execute all not processed links of the simulation and move them to processed.
+
+        Args:
+            simulation: The simulation to execute, updated in place
+
+        Returns:
+            float: Virtual time in seconds at which the last link completed
+        """
+        config = simulation.topology.config
+        start_time = simulation.simulation_time.start_time
+        nodes = set(simulation.topology.nodes)
+        execution_state = simulation.links_execution_state
+
+        # (completion time, insertion order, link, passed pre-validation) - the order keeps the heap
+        # stable for equal times. Links failing pre-validation fail right away, at virtual time 0.
+        event_heap = []
+        for order, link in enumerate(execution_state.not_processed_links):
+            pre_valid = link.from_node in nodes and link.to_node in nodes and link.latency <= config.duration_sec
+            heapq.heappush(event_heap, (float(link.latency) if pre_valid else 0.0, order, link, pre_valid))
+
+        processed_count = len(execution_state.processed_links)
+        failed_count = self.links_validator.count_failed_links(simulation)
+        clock = 0.0
+        while event_heap:
+            clock, _, link, pre_valid = heapq.heappop(event_heap)
+            link_valid = pre_valid and (
+                failed_count == 0 or processed_count == 0 or failed_count / processed_count <= config.packet_loss_percent
+            )
+            retry_count = link.execution_state.retry_count + 1 if link.execution_state else 1
+            link.execution_state = LinkExecutionState(
+                status=LinkStatusEnum.done if link_valid else LinkStatusEnum.failed,
+                start_time=start_time,
+                end_time=start_time + timedelta(seconds=clock),
+                retry_count=retry_count
+            )
+            processed_count += 1
+            failed_count += 0 if link_valid else 1
+            execution_state.processed_links.append(link)
+
+        execution_state.not_processed_links = []
+        return clock
+
+    async def run(self, simulation: TopologySimulation, session=None) -> int:
+        simulation.simulation_time.start_time = datetime.now()
+        virtual_duration = self.simulate(simulation)
+
+        if self.links_validator.count_failed_links(simulation) > 0 and not self.links_validator.is_packet_loss_valid(simulation):
+            simulation.status = TopologyStatusEnum.failed
+        else:
+            simulation.status = TopologyStatusEnum.done
+        simulation.simulation_time.end_time = simulation.simulation_time.start_time + timedelta(seconds=virtual_duration)
+        simulation.simulation_time.total_execution_time = int(virtual_duration)
+        simulation.updated_at = datetime.now()
+        simulation.processed_count = len(simulation.links_execution_state.processed_links)
+        simulation.failed_count = self.links_validator.count_failed_links(simulation)
+        await self.topologies_simulations_db.update_simulation_fields(
+            simulation.sim_id,
+            simulation.row_version,
+            {
+                "status": simulation.status,
+                "processed_count": simulation.processed_count,
+                "failed_count": simulation.failed_count,
+                "simulation_time": simulation.simulation_time.model_dump(),
+                "links_execution_state": simulation.links_execution_state.model_dump(by_alias=True)
+            },
+            session=session
+        )
+
+        events = SimulationMapper.simulations_to_events([simulation], EventType.SIMULATION_COMPLETED)
+        for event in events:
+            event.is_handled = True
+            event.published = True
+            event.published_at = datetime.now()
+        await self.events_db.store_events(events, session=session)
+
+        self.logger.info(
+            f"Simulation {simulation.sim_id} ran {len(simulation.links_execution_state.processed_links)} links "
+            f"on a virtual clock ({virtual_duration}s simulated), status: {simulation.status}"
+        )
+        return len(events)
+
+
+SIMULATION_ENGINES: Dict[str, Type[SimulationEngine]] = {
+    "real_time": RealTimeSimulationEngine,
+    "virtual_clock": VirtualClockSimulationEngine,
+}
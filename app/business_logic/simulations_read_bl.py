@@ -0,0 +1,162 @@
+"""
+Reads of simulations for the data API, through an in-process read-through cache.
+
+The JSON of simulation snapshots is cached by sim id together with the version it was read at
+(row_version, updated_at); snapshots above SIMULATIONS_CACHE_MAX_ENTRY_BYTES are served but not cached. A read first gets the current versions with a projected query
+(VERSION_PROJECTION), then serves the cached snapshots whose version still matches and reads,
+validates and serializes only the others. The versions are also the ETag of a response, so a client
+polling with If-None-Match gets a 304 after the projected query alone.
+
+Summary pages (a 'fields' projection to SUMMARY_FIELDS) skip the cache: the projected documents are
+small and returned as read, and their ETag is the hash of the page.
+"""
+import hashlib
+from typing import Dict, List, NamedTuple, Optional
+from app.app_container import app_container
+from app.business_logic.exceptions import ValidationError
+from app.db.topologies_simulations_db import TopologiesSimulationsDB
+from app.messageBroker.codecs import JSON_CONTENT_TYPE, get_codec
+from app.models.adapters import TOPOLOGY_SIMULATION_ADAPTER, TOPOLOGY_SIMULATIONS_ADAPTER
+from app.models.pageination_models import CursorPaginationRequest
+from app.models.topolgy_simulation_models import SUMMARY_FIELDS, VERSION_PROJECTION
+from app.utils.cache import get_cache
+from app.utils.logger import LoggerManager
+
+
+def version_of(doc: dict) -> tuple:
+    """The version of a simulation document (VERSION_PROJECTION fields)."""
+    return doc.get("row_version"), doc.get("updated_at")
+
+
+def _etag(data: bytes) -> str:
+    return f'"{hashlib.blake2b(data, digest_size=16).hexdigest()}"'
+
+
+def etag_of(versions: Dict[str, tuple], *extra) -> str:
+    """A strong ETag of the given simulation versions (and of any other response fields in 'extra')."""
+    return _etag(repr((sorted(versions.items()), extra)).encode())
+
+
+def summary_projection(fields: List[str]) -> dict:
+    """
+    The projection of a summary page to 'fields' (sim_id is an alias of _id, always returned).
+
+    Raises:
+        ValidationError: If a field is not one of SUMMARY_FIELDS
+    """
+    unknown = [field for field in fields if field not in SUMMARY_FIELDS and field not in ("_id", "sim_id")]
+    if unknown:
+        raise ValidationError(f"Unsupported fields {unknown}, expected some of {SUMMARY_FIELDS}")
+    return {"_id": 1, **{field: 1 for field in fields if field in SUMMARY_FIELDS}}
+
+
+class CachedSimulation(NamedTuple):
+    sim_id: str
+    version: tuple
+    body: bytes
+
+
+class SimulationsPage(NamedTuple):
+    versions: Dict[str, tuple]
+    next_cursor: Optional[str]
+    page_size: int
+    total: Optional[int]
+
+    @property
+    def etag(self) -> str:
+        return etag_of(self.versions, self.next_cursor, self.total)
+
+
+class SimulationsReadBusinessLogic:
+    def __init__(self, db):
+        self.logger = LoggerManager.get_logger('simulations_read_bl')
+        self.config = app_container.config()
+        self.topologies_simulations_db = TopologiesSimulationsDB(db)
+        # Shared by the instances of the process
+        self.simulations_cache = get_cache("simulations_by_id", self.config.SIMULATIONS_CACHE_MAX_SIZE,
+                                           self.config.SIMULATIONS_CACHE_TTL_SEC)
+
+    async def get_versions(self, simulation_ids: List[str]) -> Dict[str, tuple]:
+        """The current versions of the given simulations (missing ones are left out), with one projected query."""
+        docs = await self.topologies_simulations_db.get_simulations_docs_by_ids(simulation_ids, VERSION_PROJECTION)
+        return {doc["_id"]: version_of(doc) for doc in docs}
+
+    async def get_simulations(self, versions: Dict[str, tuple]) -> List[CachedSimulation]:
+        """
+        The simulations of 'versions', in its order: from the cache when the cached version matches,
+        read with one query otherwise (at their current version, which may be newer).
+
+        Raises:
+            DatabaseError: If a database operation fails
+            ValidationError: If a stored simulation is invalid
+        """
+        simulations = {}
+        missing_ids = []
+        for sim_id, version in versions.items():
+            cached = self.simulations_cache.get(sim_id)
+            if cached is not None and cached.version == version:
+                simulations[sim_id] = cached
+            else:
+                missing_ids.append(sim_id)
+        if missing_ids:
+            docs = await self.topologies_simulations_db.get_simulations_docs_by_ids(missing_ids)
+            try:
+                read_simulations = TOPOLOGY_SIMULATIONS_ADAPTER.validate_python(docs)
+            except Exception as e:
+                raise ValidationError(f"Invalid simulation data: {str(e)}") from e
+            for doc, simulation in zip(docs, read_simulations):
+                cached = CachedSimulation(
+                    simulation.sim_id, version_of(doc), TOPOLOGY_SIMULATION_ADAPTER.dump_json(simulation, by_alias=True)
+                )
+                # The cache is bounded by count, so the size of its entries is bounded too
+                if len(cached.body) <= self.config.SIMULATIONS_CACHE_MAX_ENTRY_BYTES:
+                    self.simulations_cache.set(cached.sim_id, cached)
+                simulations[cached.sim_id] = cached
+        return [simulations[sim_id] for sim_id in versions if sim_id in simulations]
+
+    async def get_page(self, cursor_pagination_request: CursorPaginationRequest, query: Optional[dict] = None) -> SimulationsPage:
+        """The versions of a page of the simulations matching 'query' (all by default), with one projected query."""
+        docs, next_cursor, total = await self.topologies_simulations_db.list_simulations_docs(
+            cursor_pagination_request, VERSION_PROJECTION, query
+        )
+        return SimulationsPage({doc["_id"]: version_of(doc) for doc in docs}, next_cursor,
+                               cursor_pagination_request.page_size, total)
+
+    async def get_page_json(self, page: SimulationsPage) -> tuple:
+        """
+        The JSON of a page (as CursorPaginationResponse), built from the JSON of its simulations.
+
+        Returns:
+            tuple: The ETag of the returned simulation versions, and the JSON
+        """
+        simulations = await self.get_simulations(page.versions)
+        versions = {cached.sim_id: cached.version for cached in simulations}
+        meta = get_codec(JSON_CONTENT_TYPE).encode(
+            {"next_cursor": page.next_cursor, "page_size": page.page_size, "total": page.total}
+        )
+        body = b'{"items":[' + b",".join(cached.body for cached in simulations) + b"]," + meta[1:]
+        return etag_of(versions, page.next_cursor, page.total), body
+
+    async def get_summaries_page_json(self, cursor_pagination_request: CursorPaginationRequest, fields: List[str],
+                                      query: Optional[dict] = None) -> tuple:
+        """
+        The JSON of a page of SimulationSummary (as CursorPaginationResponse) with only _id and 'fields',
+        projected by the database and returned without model validation.
+
+        Returns:
+            tuple: The ETag of the page, and the JSON
+
+        Raises:
+            ValidationError: If a field is not one of SUMMARY_FIELDS
+        """
+        projection = summary_projection(fields)
+        docs, next_cursor, total = await self.topologies_simulations_db.list_simulations_docs(
+            cursor_pagination_request, projection, query
+        )
+        body = get_codec(JSON_CONTENT_TYPE).encode({
+            "items": docs,
+            "next_cursor": next_cursor,
+            "page_size": cursor_pagination_request.page_size,
+            "total": total
+        })
+        return _etag(body), body
@@ -1,5 +1,6 @@
 from app.db.topologies_simulations_db import TopologiesSimulationsDB
 from app.db.events_db import EventsDB
+from app.db.topologies_db import TopologiesDB
 from app.models.statuses_enums import TopologyStatusEnum
 from app.models.statuses_enums import EventType
 from app.models.topolgy_simulation_models import TopologySimulation
@@ -13,6 +14,7 @@ class SimulationActionsBL:
         self.db = db
         self.topologies_simulations_db = TopologiesSimulationsDB(db)
         self.events_db = EventsDB(db)
+        self.topologies_db = TopologiesDB(db)
 
     async def pause_simulation(self, simulation: TopologySimulation, session=None) -> str:
         """
@@ -32,9 +34,16 @@ class SimulationActionsBL:
             #update status
             simulation.status = TopologyStatusEnum.paused
             simulation.updated_at = datetime.now()
-            simulation.simulation_time.pauses.append(PauseTime(start_time=datetime.now()))
+            pause = PauseTime(start_time=datetime.now())
+            simulation.simulation_time.pauses.append(pause)
             
-            await self.topologies_simulations_db.update_simulation(simulation.sim_id, simulation, session=session)
+            await self.topologies_simulations_db.update_simulation_fields(
+                simulation.sim_id,
+                simulation.row_version,
+                {"status": simulation.status},
+                push={"simulation_time.pauses": pause.model_dump()},
+                session=session
+            )
             self.logger.info(f"Successfully paused simulation {simulation.sim_id}.")
             return "Simulation paused successfully"
         except Exception as e:
@@ -58,8 +67,14 @@ class SimulationActionsBL:
             simulation.simulation_time.pauses = []
 
             #reset links execution state
+            links = simulation.topology.links
+            if simulation.topology.links_storage == "chunked":
+                links = await self.topologies_db.get_topology_links(simulation.topology.id, session=session)
             simulation.links_execution_state.processed_links = []
-            simulation.links_execution_state.not_processed_links = SimulationMapper.map_links_to_link_execution_state(simulation.topology.links)
+            simulation.links_execution_state.not_processed_links = SimulationMapper.map_links_to_link_execution_state(links)
+            simulation.total_links = len(links)
+            simulation.processed_count = 0
+            simulation.failed_count = 0
 
             await self.topologies_simulations_db.update_simulation(simulation.sim_id, simulation, session=session)
 
@@ -102,8 +117,18 @@ class SimulationActionsBL:
             simulation.updated_at = datetime.now()
             last_pause.end_time = datetime.now()
             last_pause.duration = (last_pause.end_time - last_pause.start_time).total_seconds()
+            pause_index = simulation.simulation_time.pauses.index(last_pause)
             
-            await self.topologies_simulations_db.update_simulation(simulation.sim_id, simulation, session=session)
+            await self.topologies_simulations_db.update_simulation_fields(
+                simulation.sim_id,
+                simulation.row_version,
+                {
+                    "status": simulation.status,
+                    f"simulation_time.pauses.{pause_index}.end_time": last_pause.end_time,
+                    f"simulation_time.pauses.{pause_index}.duration": last_pause.duration
+                },
+                session=session
+            )
             self.logger.info(f"Successfully resumed simulation {simulation.sim_id}.")
             return "Simulation resumed successfully"
         except Exception as e:
@@ -6,10 +6,17 @@ from app.models.topolgy_simulation_models import TopologySimulation
 from app.business_logic.topologies_simulation_bl import TopologiesSimulationsBusinessLogic
 from app.models.requests_models import SimulationRequest
 from app.models.mapper import SimulationMapper
+from app.models.topolgy_models import Config, Topology
+from app.utils.object_utils import get_fingerprint
+from app.utils.cache import get_cache
+from app.app_container import app_container
 from bson import ObjectId
-import asyncio
 from app.business_logic.exceptions import TopologiesBLException
 from copy import deepcopy
+import hashlib
+
+# The topology fields of a fingerprint (see get_fingerprint)
+FINGERPRINT_FIELDS = {"nodes": True, "links": {"__all__": {"from_node", "to_node", "latency"}}, "config": True}
 
 class TopologiesBL:
     def __init__(self, db):
@@ -18,6 +25,9 @@ class TopologiesBL:
         self.topologies_db = TopologiesDB(db)
         self.topologies_simulations_bl = TopologiesSimulationsBusinessLogic(db)
         self.topologies_validators = TopologiesValidators()
+        config = app_container.config()
+        self.fingerprints_cache = get_cache("fingerprints_by_topology", config.FINGERPRINTS_CACHE_MAX_SIZE,
+                                            config.TOPOLOGIES_CACHE_TTL_SEC)
         
     async def trigger_simulation(self, simulations_requests: List[SimulationRequest], session=None):
         try:
@@ -26,35 +36,58 @@ class TopologiesBL:
                 self.logger.error("No suitable topologies to simulate")
                 return []
 
-            exist_topologies, new_requests = await self._split_requests_to_existing_and_new(simulations_requests, session)
-            new_topologies = self._validate_and_enrich_new_topologies(new_requests)
-            if not new_topologies and not exist_topologies:
+            topologies = await self._get_or_store_topologies(simulations_requests)
+            if not topologies:
                 self.logger.error("No suitable topologies to simulate")
                 return []
 
-            if new_topologies:
-                await self.topologies_db.store_topologies(new_topologies, session=session)
-                exist_topologies.extend(new_topologies)
-
-            sim_ids = await self._create_simulations(exist_topologies, session)
-            self.logger.info(f"Successfully triggered simulation for {len(exist_topologies)} topologies")
+            sim_ids = await self._create_simulations(topologies, session)
+            self.logger.info(f"Successfully triggered simulation for {len(topologies)} topologies")
             return sim_ids
         except Exception as e:
             self.logger.error(f"Error triggering simulation: {e}")
             raise TopologiesBLException(f"Error triggering simulation: {e}") from e
 
-    async def _split_requests_to_existing_and_new(self, simulations_requests: List[SimulationRequest], session=None):
-        exist_topologies = []
-        new_requests = []
-        # Parallelize DB existence checks
-        tasks = [self.topologies_db.get_exist_topology(req, session) for req in simulations_requests]
-        results = await asyncio.gather(*tasks)
-        for req, exist_topology in zip(simulations_requests, results):
-            if exist_topology:
-                exist_topologies.append(exist_topology)
-            else:
-                new_requests.append(req)
-        return exist_topologies, new_requests
+    def _fingerprint(self, simulation_request: SimulationRequest) -> str:
+        """
+        Fingerprint of the topology of a request, with the config it is stored with (see SimulationMapper.enrich_topology).
+        Fingerprints are cached by a fixed-size digest of the JSON of the fields they are computed from, which is
+        serialized without building Python objects and is cheaper to hash than the fingerprint.
+        """
+        topology = simulation_request.topology
+        topology.config = topology.config or simulation_request.config or Config()
+        key = hashlib.blake2b(
+            topology.model_dump_json(include=FINGERPRINT_FIELDS).encode(), digest_size=16
+        ).digest()
+        fingerprint = self.fingerprints_cache.get(key)
+        if fingerprint is None:
+            fingerprint = get_fingerprint(topology.model_dump())
+            self.fingerprints_cache.set(key, fingerprint)
+        return fingerprint
+
+    async def _get_or_store_topologies(self, simulations_requests: List[SimulationRequest]) -> List[Topology]:
+        """
+        Resolve the topology of every request: existing topologies are found by fingerprint with one
+        query, and the new ones (once per fingerprint) are validated and stored with one bulk upsert.
+        Topologies are immutable and shared by the requests, so they are read and stored outside of the
+        request transaction, which only creates the simulations.
+
+        Returns:
+            The topology of each request, in request order (requests with invalid topologies are skipped)
+        """
+        fingerprints = [self._fingerprint(request) for request in simulations_requests]
+        topologies_by_fingerprint = await self.topologies_db.get_topologies_by_fingerprints(fingerprints)
+        self.logger.info(f"Found {len(topologies_by_fingerprint)} existing topologies")
+
+        new_requests = {}
+        for fingerprint, request in zip(fingerprints, simulations_requests):
+            if fingerprint not in topologies_by_fingerprint:
+                new_requests.setdefault(fingerprint, request)
+        new_topologies = self._validate_and_enrich_new_topologies(list(new_requests.values()))
+        if new_topologies:
+            topologies_by_fingerprint.update(await self.topologies_db.upsert_topologies(new_topologies))
+
+        return [topologies_by_fingerprint[fingerprint] for fingerprint in fingerprints if fingerprint in topologies_by_fingerprint]
 
     def _validate_and_enrich_new_topologies(self, new_requests: List[SimulationRequest]):
         new_topologies = []
@@ -67,9 +100,18 @@ class TopologiesBL:
 
     async def _create_simulations(self, topologies, session=None):
         simulations = []
+        # Chunked topologies read from the database come without their links; they are read with one query,
+        # outside of the transaction like the topologies (its snapshot may predate chunks stored concurrently)
+        unloaded_ids = list({topology.id for topology in topologies if topology.links_storage == "chunked" and not topology.links})
+        chunked_links = await self.topologies_db.get_topologies_links(unloaded_ids) if unloaded_ids else {}
         for topology in topologies:
-            simulation = TopologySimulation(topology=topology)
-            simulation.links_execution_state.not_processed_links = deepcopy(simulation.topology.links)
+            links = topology.links
+            if topology.links_storage == "chunked":
+                # The links are kept once, in the chunks; the simulation only carries their execution state
+                links = links or chunked_links.get(topology.id, [])
+                topology = topology.model_copy(update={"links": []})
+            simulation = TopologySimulation(topology=topology, total_links=len(links))
+            simulation.links_execution_state.not_processed_links = deepcopy(links)
             simulation.sim_id = str(ObjectId())
             simulations.append(simulation)
         return await self.topologies_simulations_bl.create_topologies_simulations(simulations, session=session)
@@ -6,12 +6,12 @@ from app.db.events_db import EventsDB
 from app.models.mapper import SimulationMapper
 from datetime import datetime
 from app.models.statuses_enums import TopologyStatusEnum, LinkStatusEnum
-from app.models.events_models import SimulationEvent
+from app.models.events_models import SimulationEvent, DELTA_SCHEMA_VERSION
 from app.models.statuses_enums import EventType
 from app.business_logic.validators.simulation_validators import SimulationValidators
-from app.models.pageination_models import CursorPaginationRequest
 from app.business_logic.validators.links_validators import LinksValidators
 from app.utils.logger import LoguruLogger
+from app.business_logic.simulation_engines import SIMULATION_ENGINES, SimulationEngine
 
 class TopologiesSimulationsBusinessLogic:
     """
@@ -24,6 +24,11 @@ class TopologiesSimulationsBusinessLogic:
         self.events_db = EventsDB(db)
         self.validator_bl = SimulationValidators(self.logger)
         self.links_validator = LinksValidators()
+        self.engines = {name: engine(db) for name, engine in SIMULATION_ENGINES.items()}
+
+    def get_engine(self, simulation: TopologySimulation) -> SimulationEngine:
+        """Get the simulation engine selected in the simulation config."""
+        return self.engines[simulation.topology.config.engine]
 
     async def create_topologies_simulations(self, topologies_simulations: List[TopologySimulation], session=None):
         """
@@ -66,35 +71,16 @@ class TopologiesSimulationsBusinessLogic:
                 raise Exception(f"Simulation {simulation_event.after.sim_id} has been updated since the event was created")
             
             self.logger.set_level(simulation.topology.config.log_level)
-            simulation_event.after.status = TopologyStatusEnum.running
-            simulation_event.after.updated_at = datetime.now()
-            simulation_event.after.simulation_time.start_time = datetime.now()
-            await self.topologies_simulations_db.update_simulation(simulation_event.after.sim_id, simulation_event.after, session=session)
-            
-            #store links events
-            events = SimulationMapper.simulation_to_links_event(simulation_event.after)
-            await self.events_db.store_events(events, session=session)
+            engine = self.get_engine(simulation_event.after)
+            events_count = await engine.run(simulation_event.after, session=session)
             
             await self.events_db.update_events_handled([simulation_event.event_id], session=session)
 
-            self.logger.info(f"Successfully run {len(events)} links for simulation {simulation_event.after.sim_id}.")
+            self.logger.info(f"Successfully run simulation {simulation_event.after.sim_id} with {simulation.topology.config.engine} engine ({events_count} events stored).")
         except Exception as e:
             self.logger.error(f"Error during run of {simulation_event.after.sim_id}simulation: {str(e)}")
             raise e
 
-    async def find_completed_simulations(self, cursor_pagination_request: CursorPaginationRequest) -> List[TopologySimulation]:
-        link_statuses = [LinkStatusEnum.done, LinkStatusEnum.failed]
-        simulations = await self.topologies_simulations_db.get_simulations_by_statuses([TopologyStatusEnum.running], link_statuses, cursor_pagination_request)
-        
-        completed_simulations = []
-        for simulation in simulations.items:
-            if self.validator_bl.calculate_if_completed(simulation):
-                completed_simulations.append(simulation)
-                continue
-            
-        self.logger.info(f"Found {len(completed_simulations)} completed simulations")
-        return completed_simulations
-
     def calculate_pause_time(self, simulation: TopologySimulation):
         return sum(pause.duration for pause in simulation.simulation_time.pauses if pause.duration is not None)
     
@@ -113,10 +99,52 @@ class TopologiesSimulationsBusinessLogic:
     def count_failed_links(self, simulation: TopologySimulation):
         return len([link for link in simulation.links_execution_state.processed_links if link.execution_state.status == LinkStatusEnum.failed])
     
+    def set_completed_status(self, simulation: TopologySimulation):
+        """Set the final status of a simulation whose links were all processed, from its packet loss."""
+        if self.count_failed_links(simulation) > 0 and not self.links_validator.is_packet_loss_valid(simulation):
+            simulation.status = TopologyStatusEnum.failed
+        else:
+            simulation.status = TopologyStatusEnum.done
+
+    async def _apply_delta_event(self, simulation_event: SimulationEvent, complete: bool = False, session=None):
+        """
+        Handle a delta SIMULATION_UPDATED / SIMULATION_COMPLETED event: apply its delta to the stored simulation
+        and, for a completion, set the final status and times from the stored simulation.
+        """
+        sim_id = simulation_event.sim_id
+        self.logger.info(f"Applying {len(simulation_event.delta or [])} delta operations of {simulation_event.event_type} to simulation {sim_id}")
+        try:
+            # Applying the delta is idempotent, so it is not guarded by the event row_version
+            await self.topologies_simulations_db.apply_simulation_delta(sim_id, simulation_event.delta or [], session=session)
+            if complete:
+                simulation = await self.topologies_simulations_db.get_topology_simulation(sim_id, session=session)
+                self.set_completed_status(simulation)
+                await self.calculate_simulation_time(simulation)
+                await self.topologies_simulations_db.update_simulation_fields(
+                    sim_id,
+                    simulation.row_version,
+                    {"status": simulation.status, "simulation_time": simulation.simulation_time.model_dump()},
+                    session=session
+                )
+                self.logger.info(f"Simulation {sim_id} completed at: {simulation.simulation_time.end_time}")
+            await self.events_db.update_events_handled([simulation_event.event_id], session=session)
+        except Exception as e:
+            self.logger.error(f"Error during delta update of simulation {sim_id}: {str(e)}")
+            raise e
+
     async def update_simulation_with_completed_links(self, simulation_event: SimulationEvent, session=None):
+        if simulation_event.schema_version >= DELTA_SCHEMA_VERSION:
+            await self._apply_delta_event(simulation_event, session=session)
+            return
+
         self.logger.info(f"Updating simulation {simulation_event.after.sim_id} with new completedlinks")
         try:
-            await self.topologies_simulations_db.update_simulation(simulation_event.after.sim_id, simulation_event.after, session=session)
+            # Only the links are sent; moving them is idempotent, so no row_version guard is needed
+            await self.topologies_simulations_db.apply_links_execution_updates(
+                simulation_event.after.sim_id,
+                simulation_event.after.links_execution_state.processed_links,
+                session=session
+            )
             await self.events_db.update_events_handled([simulation_event.event_id], session=session)
             self.logger.info(f"Simulation {simulation_event.after.sim_id} completed at: {simulation_event.after.simulation_time.end_time}")
         except Exception as e:
@@ -131,18 +159,22 @@ class TopologiesSimulationsBusinessLogic:
             simulation_event: The simulation event to process
             session: MongoDB session for transaction support
         """
+        if simulation_event.schema_version >= DELTA_SCHEMA_VERSION:
+            await self._apply_delta_event(simulation_event, complete=True, session=session)
+            return
+
         try:
-            failed_links_count = self.count_failed_links(simulation_event.after)
-            if failed_links_count > 0:
-                if self.links_validator.is_packet_loss_valid(simulation_event.after):
-                    simulation_event.after.status = TopologyStatusEnum.done
-                else:
-                    simulation_event.after.status = TopologyStatusEnum.failed
-            else:
-                simulation_event.after.status = TopologyStatusEnum.done
-            
+            self.set_completed_status(simulation_event.after)
             await self.calculate_simulation_time(simulation_event.after)
-            await self.topologies_simulations_db.update_simulation(simulation_event.after.sim_id, simulation_event.after, session=session)
+            await self.topologies_simulations_db.apply_links_execution_updates(
+                simulation_event.after.sim_id,
+                simulation_event.after.links_execution_state.processed_links,
+                fields={
+                    "status": simulation_event.after.status,
+                    "simulation_time": simulation_event.after.simulation_time.model_dump()
+                },
+                session=session
+            )
             await self.events_db.update_events_handled([simulation_event.event_id], session=session)
             self.logger.info(f"Simulation {simulation_event.after.sim_id} completed at: {simulation_event.after.simulation_time.end_time}")
         except Exception as e:
@@ -4,6 +4,7 @@ Validators for network link operations within a simulation topology.
 This module provides validation logic for network links, including node existence, link timing, and packet loss constraints.
 A logger instance must be provided to the LinksValidators class for logging warnings and errors during validation.
 """
+from typing import Optional
 from app.models.topolgy_models import Link
 from app.models.statuses_enums import TopologyStatusEnum
 from app.models.topolgy_simulation_models import TopologySimulation
@@ -122,18 +123,10 @@ class LinksValidators:
     def get_not_processed_link(self, simulation: TopologySimulation, current_link: Link):
         if simulation.links_execution_state is None or simulation.links_execution_state.not_processed_links is None:
             return None
-        not_processed_link = next((link for link in simulation.links_execution_state.not_processed_links 
-            if link.id == current_link.id),
-            None
-        )
-        return not_processed_link
+        return simulation.links_execution_state.get_not_processed_link(current_link.id)
     
     def get_link(self, simulation: TopologySimulation, current_link: Link):
-        processed_link = next((link for link in simulation.topology.links 
-            if link.id == current_link.id),
-            None
-        )
-        return processed_link
+        return simulation.topology.get_link(current_link.id)
     
     
     def run_pre_link_validator(self, simulation: TopologySimulation, link: Link):
@@ -157,17 +150,20 @@ class LinksValidators:
     def count_failed_links(self, simulation: TopologySimulation):
         return len([link for link in simulation.links_execution_state.processed_links if link.execution_state.status == LinkStatusEnum.failed])
 
-    def is_packet_loss_valid(self, simulation: TopologySimulation):
+    def is_packet_loss_valid(self, simulation: TopologySimulation, failed_links_count: Optional[int] = None, processed_links_count: Optional[int] = None):
         """
         Validate that the current packet loss percent does not exceed the configured threshold.
 
         Args:
             simulation (TopologySimulation): The simulation object.
+            failed_links_count / processed_links_count: The link counts, counted from processed_links when not given.
         Returns:
             bool: True if packet loss percent is within the threshold, False otherwise (logs a warning).
         """
-        failed_links_count = self.count_failed_links(simulation)
-        processed_links_count = len(simulation.links_execution_state.processed_links)
+        if failed_links_count is None:
+            failed_links_count = self.count_failed_links(simulation)
+        if processed_links_count is None:
+            processed_links_count = len(simulation.links_execution_state.processed_links)
         
         if failed_links_count == 0 or processed_links_count == 0:
             return True
@@ -189,11 +185,12 @@ class LinksValidators:
     def run_post_simulation_Validator(self, simulation: TopologySimulation):
         """
         Run post-link validation checks (e.g., packet loss percent).
+        The packet loss is read from the link counters maintained by the database updates.
 
         Args:
-            simulation (TopologySimulation): The simulation object.
+            simulation (TopologySimulation): The simulation object, as stored.
         """
-        packet_loss_valid = self.is_packet_loss_valid(simulation)
+        packet_loss_valid = self.is_packet_loss_valid(simulation, simulation.failed_count, simulation.processed_count)
         simulation_running = self.is_simulation_running(simulation)
         self.logger.info(f"Post-link validation {'passed' if packet_loss_valid and simulation_running else 'failed'} for simulation {simulation.sim_id}")
         return packet_loss_valid and simulation_running
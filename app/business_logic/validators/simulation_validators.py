@@ -7,7 +7,7 @@ class SimulationValidators:
         self.links_validator = LinksValidators()
     
     def time_validator_for_simulation(self, simulation: TopologySimulation):
-        highest_latency = max(simulation.topology.links, key=lambda x: x.latency).latency
+        highest_latency = max(simulation.get_links(), key=lambda x: x.latency).latency
         
         if simulation.topology.config.duration_sec < highest_latency:
             self.logger.warning(f"Simulation duration is less than link latency: {simulation.topology.config.duration_sec} < {highest_latency}")
@@ -15,7 +15,7 @@ class SimulationValidators:
         return True
     
     def validate_all_link_nodes_exists(self, simulation: TopologySimulation):
-        for link in simulation.topology.links:
+        for link in simulation.get_links():
             self.links_validator.validate_link_nodes_exist_in_topology(simulation, link)
             
     def get_end_simulation_status(self, simulation: TopologySimulation):
@@ -27,7 +27,7 @@ class SimulationValidators:
             return TopologyStatusEnum.running
         
     def calculate_if_completed(self, simulation: TopologySimulation):
-        total_links = len(simulation.topology.links)
+        total_links = len(simulation.get_links())
         processed_links = len(simulation.links_execution_state.processed_links)
         not_processed_links = len(simulation.links_execution_state.not_processed_links)
         
@@ -1,10 +1,12 @@
 from app.models.topolgy_models import Topology
 from app.utils.logger import LoggerManager
 from app.models.requests_models import SimulationRequest
+from app.app_container import app_container
 
 class TopologiesValidators:
     def __init__(self):
         self.logger = LoggerManager.get_logger('topologies_validators')
+        self.config = app_container.config()
 
     def validate_links_is_not_empty(self, topology: Topology):
         topology_links = topology.links
@@ -44,15 +46,15 @@ class TopologiesValidators:
     
     def validate_max_nodes_is_valid(self, topology: Topology):
         topology_nodes = topology.nodes
-        if len(topology_nodes) > 100:
-            self.logger.warning(f"Topology {topology.id} has more than 100 nodes")
+        if len(topology_nodes) > self.config.TOPOLOGY_MAX_NODES:
+            self.logger.warning(f"Topology {topology.id} has more than {self.config.TOPOLOGY_MAX_NODES} nodes")
             return False
         return True
     
     def validate_max_links_is_valid(self, topology: Topology):
         topology_links = topology.links
-        if len(topology_links) > 100:
-            self.logger.warning(f"Topology {topology.id} has more than 100 links")
+        if len(topology_links) > self.config.TOPOLOGY_MAX_LINKS:
+            self.logger.warning(f"Topology {topology.id} has more than {self.config.TOPOLOGY_MAX_LINKS} links")
             return False
         return True
     
@@ -61,6 +63,8 @@ class TopologiesValidators:
         is_links_not_empty = self.validate_links_is_not_empty(simulation_request.topology)
         is_nodes_not_empty = self.validate_nodes_is_not_empty(simulation_request.topology)
         is_nodes_not_duplicate = self.validate_nodes_is_not_duplicate(simulation_request.topology)
-        result = is_links_not_empty and is_nodes_not_empty and is_nodes_not_duplicate
+        is_max_nodes_valid = self.validate_max_nodes_is_valid(simulation_request.topology)
+        is_max_links_valid = self.validate_max_links_is_valid(simulation_request.topology)
+        result = is_links_not_empty and is_nodes_not_empty and is_nodes_not_duplicate and is_max_nodes_valid and is_max_links_valid
         self.logger.info(f"New topology validation {'passed' if result else 'failed'}")
         return result
\ No newline at end of file
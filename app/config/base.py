@@ -31,6 +31,8 @@ class AppConfig:
     LINKS_COLLECTION: str = 'links'
     TOPOLOGIES_SIMULATIONS_COLLECTION: str = 'topologies_simulations'
     EVENTS_COLLECTION: str = 'events'
+    OUTBOX_RESUME_TOKENS_COLLECTION: str = 'outbox_resume_tokens'
+    TOPOLOGY_LINKS_CHUNKS_COLLECTION: str = 'topology_links_chunks'
     
     # MongoDB Connection Pool settings
     MONGODB_MAX_POOL_SIZE: int = 100
@@ -38,6 +40,10 @@ class AppConfig:
     MONGODB_MAX_IDLE_TIME_MS: int = 30000
     MONGODB_RETRY_WRITES: bool = True
     MONGODB_RETRY_READS: bool = True
+    # Attempts of a transaction failing with a TransientTransactionError (e.g. a write conflict on a simulation)
+    MONGODB_TRANSACTION_MAX_ATTEMPTS: int = 5
+    # Explain the hot queries on API startup and log the ones not served by an index (app/db/indexes.py)
+    MONGODB_VERIFY_QUERY_PLANS: bool = True
 
     # AMQP settings
     # Exchange names
@@ -70,10 +76,96 @@ class AppConfig:
     MAX_SIMULATIONS_IN_PARALLEL_PRODUCER: int = 10
     MAX_LINKS_IN_PARALLEL_PRODUCER: int = 100
     MAX_SIMULATIONS_IN_PARALLEL_COMPLETED_PRODUCER: int = 10
+    COMPLETED_PRODUCER_POLL_DELAY: int = 20
+
+    # Outbox change streams (falls back to polling when unsupported)
+    OUTBOX_CHANGE_STREAM_ENABLED: bool = False
+    OUTBOX_CHANGE_STREAM_MAX_AWAIT_MS: int = 500
+    OUTBOX_FALLBACK_POLL_INTERVAL: int = 30
+
+    # Outbox leases (lets several producer replicas split the outbox)
+    OUTBOX_LEASE_ENABLED: bool = False
+    OUTBOX_LEASE_TTL_SEC: int = 60
 
     # Consumers
     PREFETCH_COUNT: int = 100
 
+    # Message body format published by the producers: 'application/json' or 'application/msgpack'
+    # (needs msgpack). Consumers decode by each message's content_type.
+    MESSAGE_CONTENT_TYPE: str = "application/json"
+
+    # Links batch executor (runs the links consumer messages in vectorized batches)
+    LINKS_BATCH_EXECUTOR_ENABLED: bool = False
+    LINKS_BATCH_SIZE: int = 100
+    LINKS_BATCH_WINDOW_MS: int = 50
+
+    # Link completion writes (groups LINK_COMPLETED writes of concurrent links in one transaction)
+    LINK_COMPLETION_BATCH_ENABLED: bool = False
+    LINK_COMPLETION_BATCH_MAX_SIZE: int = 100
+    LINK_COMPLETION_BATCH_WINDOW_MS: int = 20
+
+    # Completion detection in the link completion transaction (SIMULATION_COMPLETED is stored by the
+    # link that completes the simulation, instead of by the SimulationCompletedProducer loop)
+    INLINE_COMPLETION_DETECTION_ENABLED: bool = False
+
+    # Topology limits and storage (topologies with more links than the threshold keep their links
+    # once, in chunk documents, and simulations of them do not copy the topology links)
+    # A simulation document (and its snapshot events) still embeds every link with its execution state,
+    # ~210 BSON bytes a link: 50000 links and 100000 nodes stay well under the 16MB document limit
+    TOPOLOGY_MAX_NODES: int = 100000
+    TOPOLOGY_MAX_LINKS: int = 50000
+    TOPOLOGY_LINKS_CHUNKING_THRESHOLD: int = 1000
+    TOPOLOGY_LINKS_CHUNK_SIZE: int = 5000
+    # 'documents' (a link document per link) or 'columnar' (one LinksColumns binary per chunk)
+    TOPOLOGY_LINKS_CHUNK_ENCODING: str = "documents"
+
+    # In-process caches of the API (0 disables): stored topologies by fingerprint, and fingerprints
+    # by submitted topology, so resubmitted topologies skip the hashing and the database lookup
+    TOPOLOGIES_CACHE_MAX_SIZE: int = 1024
+    FINGERPRINTS_CACHE_MAX_SIZE: int = 4096
+    TOPOLOGIES_CACHE_TTL_SEC: int = 600
+    # Read-through cache of the JSON of simulation snapshots by sim id, served while their row_version
+    # and updated_at match the stored ones (checked with a projected read per request). Snapshots larger
+    # than SIMULATIONS_CACHE_MAX_ENTRY_BYTES are not cached, so the cache holds at most ~128MB.
+    SIMULATIONS_CACHE_MAX_SIZE: int = 2048
+    SIMULATIONS_CACHE_TTL_SEC: int = 300
+    SIMULATIONS_CACHE_MAX_ENTRY_BYTES: int = 65536
+
+    # Delta events: SIMULATION_UPDATED / SIMULATION_COMPLETED carry only the changes of the simulation and
+    # LINK_COMPLETED only the completed link, instead of full snapshots (consumers handle both)
+    EVENT_DELTAS_ENABLED: bool = False
+
+    # Events retention: handled and published events expire EVENTS_TTL_SEC after their last update
+    # (TTL index), and the archiver optionally copies them to compressed files first
+    EVENTS_RETENTION_ENABLED: bool = False
+    EVENTS_TTL_SEC: int = 604800
+    EVENTS_ARCHIVE_ENABLED: bool = False
+    # Must be lower than EVENTS_TTL_SEC, so events are archived before the TTL index removes them
+    EVENTS_ARCHIVE_AFTER_SEC: int = 86400
+    EVENTS_ARCHIVE_DIR: str = "archive/events"
+    # 'ndjson' (gzip compressed) or 'parquet' (needs pyarrow)
+    EVENTS_ARCHIVE_FORMAT: str = "ndjson"
+    EVENTS_ARCHIVE_BATCH_SIZE: int = 5000
+    EVENTS_ARCHIVE_INTERVAL_SEC: int = 3600
+
+    # Streaming simulation creation (POST /simulate/stream): requests committed per transaction, and
+    # the longest accepted NDJSON line
+    SIMULATION_STREAM_CHUNK_SIZE: int = 500
+    SIMULATION_STREAM_MAX_LINE_BYTES: int = 16 * 1024 * 1024
+
+    # Push of simulation events to SSE / WebSocket subscribers: one reader per API process tails the
+    # events collection while there are subscribers, with a change stream (or polling by _id where
+    # change streams are unsupported), and fans the events out in memory
+    EVENTS_PUSH_CHANGE_STREAM_ENABLED: bool = True
+    EVENTS_PUSH_BATCH_SIZE: int = 500
+    EVENTS_PUSH_MAX_AWAIT_MS: int = 500
+    EVENTS_PUSH_POLL_INTERVAL_SEC: float = 1.0
+    # Events buffered per subscriber, the oldest are dropped (and the subscriber told) beyond it
+    EVENTS_PUSH_QUEUE_SIZE: int = 1000
+    EVENTS_PUSH_HEARTBEAT_SEC: int = 15
+    # Most simulation IDs per subscription (they are passed in the query string)
+    EVENTS_PUSH_MAX_SIM_IDS: int = 500
+
     # Retry settings
     QUEUE_TTL: int = 600000
     DLX_TTL: int = 86400000
@@ -86,6 +178,8 @@ class AppConfig:
 
     # page query 
     PAGE_LIMIT = 1000
+    # Most simulation IDs accepted by POST /simulation-data/statuses
+    SIMULATION_STATUSES_MAX_IDS: int = 5000
 
 
     def to_env(self):
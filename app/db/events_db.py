@@ -1,18 +1,27 @@
 from app.utils.logger import LoggerManager
-from app.business_logic.exceptions import DatabaseError, ValidationError
+from app.business_logic.exceptions import DatabaseError, ValidationError, ChangeStreamUnavailableError
 from datetime import UTC
 import os
-from pymongo.errors import PyMongoError
+from pymongo.errors import PyMongoError, OperationFailure
 from app.models.events_models import BaseEvent
-from typing import List, Optional, Type
+from typing import List, Optional, Type, AsyncIterator
 from bson.objectid import ObjectId
-from datetime import datetime
+from datetime import datetime, timedelta
 import pymongo
+from pymongo import InsertOne, UpdateMany
 from pymongo import MongoClient
 from app.app_container import app_container
 from motor.motor_asyncio import AsyncIOMotorClient
 from pymongo.collection import Collection
 
+# Server error codes meaning change streams cannot be used on this deployment
+# (standalone server / no replica set, or $changeStream not supported).
+CHANGE_STREAM_UNSUPPORTED_CODES = {40573, 40324, 20}
+CHANGE_STREAM_HISTORY_LOST_CODE = 286
+
+# Fields of an outbox lease, cleared when an event is published or released
+LEASE_FIELDS = {"lease_owner": "", "lease_id": "", "lease_expires_at": ""}
+
 class EventsDB:
     """
     Repository for CRUD operations on Events documents in MongoDB.
@@ -23,6 +32,7 @@ class EventsDB:
         self.config = app_container.config()
         self.db = db
         self.collection = self.db[self.config.EVENTS_COLLECTION]
+        self.resume_tokens_collection = self.db[self.config.OUTBOX_RESUME_TOKENS_COLLECTION]
         self.logger = LoggerManager.get_logger('events_db')
 
     async def store_events(self, events: List[BaseEvent], session=None) -> str:
@@ -120,7 +130,27 @@ class EventsDB:
         except Exception as e:
             self.logger.error(f"Unexpected error while finding Events: {str(e)}")
             raise ValidationError(f"Error processing Events data: {str(e)}") from e
-        
+
+    async def find_events_by_ids(self, event_ids: list[str], filter: dict = None, session=None) -> list[dict]:
+        """
+        Re-read events by their IDs, keeping only the ones that still match a filter.
+        Used to refresh event snapshots (e.g. from a change stream) before acting on them.
+
+        Args:
+            event_ids: IDs of the events to read
+            filter: Optional filter the events must still match
+            session: MongoDB session for transaction support
+
+        Returns:
+            list[dict]: List of matching events
+        """
+        if not event_ids:
+            return []
+        query = {"_id": {"$in": event_ids}}
+        if filter:
+            query = {"$and": [query, filter]}
+        return await self.find_events_by_filter(query, limit=len(event_ids), session=session)
+
     async def update_events_published(self, event_ids: list[str], is_published: bool = True, session=None) -> int:
         """
         Set published=True for all events with IDs in event_ids.
@@ -137,7 +167,10 @@ class EventsDB:
         try:
             result = await self.collection.update_many(
                 {"_id": {"$in": event_ids}},
-                {"$set": {"published": is_published, "published_at": datetime.now(UTC), "updated_at": datetime.now(UTC)}},
+                {
+                    "$set": {"published": is_published, "published_at": datetime.now(UTC), "updated_at": datetime.now(UTC)},
+                    "$unset": LEASE_FIELDS
+                },
                 session=session
             )
             self.logger.info(f"Marked {result.modified_count} events as published.")
@@ -152,6 +185,123 @@ class EventsDB:
             self.logger.error(f"Unexpected error while updating published Events: {str(e)}")
             raise ValidationError(f"Error processing published Events: {str(e)}") from e
 
+    async def claim_events(self, filter: dict, owner: str, lease_ttl: int, limit: int = 100, session=None) -> list[dict]:
+        """
+        Atomically claim up to 'limit' events matching a filter for a producer.
+        An event can be claimed when it has no lease or its lease has expired, so events
+        of a producer that died mid-batch are picked up again after lease_ttl seconds.
+        Oldest events are claimed first.
+
+        Args:
+            filter: The filter the claimed events must match
+            owner: Unique name of the claiming producer (e.g. host:pid:class)
+            lease_ttl: Lease duration in seconds
+            limit: Maximum number of events to claim
+            session: MongoDB session for transaction support
+
+        Returns:
+            list[dict]: The events claimed by this call
+        """
+        try:
+            now = datetime.now(UTC)
+            claimable = {"$and": [filter, {"$or": [{"lease_expires_at": None}, {"lease_expires_at": {"$lte": now}}]}]}
+            cursor = self.collection.find(claimable, {"_id": 1}, session=session).sort("created_at", pymongo.ASCENDING).limit(limit)
+            candidate_ids = [doc["_id"] for doc in await cursor.to_list(length=limit)]
+            if not candidate_ids:
+                return []
+
+            # The claimable condition is re-checked per document, so concurrent producers
+            # never hold the same event; the unique lease_id identifies this claim.
+            lease_id = str(ObjectId())
+            result = await self.collection.update_many(
+                {"$and": [{"_id": {"$in": candidate_ids}}, claimable]},
+                {"$set": {
+                    "lease_owner": owner,
+                    "lease_id": lease_id,
+                    "lease_expires_at": now + timedelta(seconds=lease_ttl),
+                    "updated_at": now
+                }},
+                session=session
+            )
+            if result.modified_count == 0:
+                return []
+
+            cursor = self.collection.find({"lease_id": lease_id}, session=session).sort("created_at", pymongo.ASCENDING)
+            docs = await cursor.to_list(length=limit)
+            self.logger.info(f"{owner} claimed {len(docs)} of {len(candidate_ids)} candidate events")
+            return docs
+        except PyMongoError as e:
+            self.logger.error(f"Database error while claiming Events: {str(e)}")
+            raise DatabaseError(f"Failed to claim Events: {str(e)}") from e
+        except Exception as e:
+            self.logger.error(f"Unexpected error while claiming Events: {str(e)}")
+            raise ValidationError(f"Error processing claimed Events: {str(e)}") from e
+
+    async def release_events(self, event_ids: list[str], owner: str, session=None) -> int:
+        """
+        Release the leases held by 'owner' on the given events, so they can be claimed again
+        without waiting for the leases to expire.
+
+        Args:
+            event_ids: IDs of the events to release
+            owner: Name of the producer holding the leases
+            session: MongoDB session for transaction support
+
+        Returns:
+            int: Number of released events
+        """
+        if not event_ids:
+            return 0
+        try:
+            result = await self.collection.update_many(
+                {"_id": {"$in": event_ids}, "lease_owner": owner},
+                {"$unset": LEASE_FIELDS, "$set": {"updated_at": datetime.now(UTC)}},
+                session=session
+            )
+            self.logger.info(f"{owner} released {result.modified_count} events")
+            return result.modified_count
+        except PyMongoError as e:
+            self.logger.error(f"Database error while releasing Events: {str(e)}")
+            raise DatabaseError(f"Failed to release Events: {str(e)}") from e
+
+    async def bulk_complete_link_events(self, handled_event_ids: list[str], completed_events: List[BaseEvent], session=None) -> int:
+        """
+        Mark link events as handled and store their LINK_COMPLETED events in a single bulk write.
+
+        Args:
+            handled_event_ids: IDs of the LINK_RUN events to mark as handled
+            completed_events: LINK_COMPLETED events to store
+            session: MongoDB session for transaction support
+
+        Returns:
+            int: Number of events marked as handled
+        """
+        self.logger.info(f"bulk_complete_link_events {len(handled_event_ids)} handled, {len(completed_events)} completed")
+        try:
+            now = datetime.now(UTC)
+            requests = []
+            if handled_event_ids:
+                requests.append(UpdateMany(
+                    {"_id": {"$in": handled_event_ids}},
+                    {"$set": {"is_handled": True, "updated_at": now}}
+                ))
+            for event in completed_events:
+                doc = event.model_dump(by_alias=True)
+                doc["created_at"] = now
+                doc["updated_at"] = now
+                requests.append(InsertOne(doc))
+            if not requests:
+                return 0
+            result = await self.collection.bulk_write(requests, ordered=True, session=session)
+            self.logger.info(f"Marked {result.modified_count} events as handled and stored {result.inserted_count} completed events. ✅")
+            return result.modified_count
+        except PyMongoError as e:
+            self.logger.error(f"Database error while completing link Events: {str(e)}")
+            raise DatabaseError(f"Failed to complete link Events: {str(e)}") from e
+        except Exception as e:
+            self.logger.error(f"Unexpected error while completing link Events: {str(e)}")
+            raise ValidationError(f"Error processing completed link Events: {str(e)}") from e
+
     async def update_events_handled(self, event_ids: list[str], session=None) -> int:
         """
         Set is_handled=True for all events with IDs in event_ids.
@@ -180,4 +330,220 @@ class EventsDB:
             raise DatabaseError(f"Failed to update handled Events: {str(e)}") from e
         except Exception as e:
             self.logger.error(f"Unexpected error while updating handled Events: {str(e)}")
-            raise ValidationError(f"Error processing handled Events: {str(e)}") from e
\ No newline at end of file
+            raise ValidationError(f"Error processing handled Events: {str(e)}") from e
+
+    async def find_archivable_events(self, older_than: datetime, limit: int = 1000, session=None) -> list[dict]:
+        """
+        Find handled and published events last updated before 'older_than', oldest first.
+        Served by the retention TTL index (updated_at, partial on published and is_handled), or without
+        retention by the events_archivable_updated_idx index with the same partial filter.
+
+        Args:
+            older_than: Only events last updated before this time are returned
+            limit: Maximum number of events to return
+            session: MongoDB session for transaction support
+
+        Returns:
+            list[dict]: The raw event documents
+        """
+        try:
+            cursor = self.collection.find(
+                {"published": True, "is_handled": True, "updated_at": {"$lt": older_than}},
+                session=session
+            ).sort("updated_at", pymongo.ASCENDING).limit(limit)
+            return await cursor.to_list(length=limit)
+        except PyMongoError as e:
+            self.logger.error(f"Database error while finding archivable Events: {str(e)}")
+            raise DatabaseError(f"Failed to find archivable Events: {str(e)}") from e
+        except Exception as e:
+            self.logger.error(f"Unexpected error while finding archivable Events: {str(e)}")
+            raise ValidationError(f"Error processing archivable Events: {str(e)}") from e
+
+    async def find_events_after_id(self, after_id: str, filter: dict, projection: Optional[dict] = None,
+                                   limit: int = 100, session=None) -> list[dict]:
+        """
+        Find events matching a filter whose _id sorts after 'after_id', in _id (creation) order.
+        Event IDs are ObjectId strings, so this tails the collection on the _id index.
+
+        Args:
+            after_id: Only events with a greater _id are returned
+            filter: The filter events must match
+            projection: Optional projection of the returned documents
+            limit: Maximum number of events to return
+            session: MongoDB session for transaction support
+
+        Returns:
+            list[dict]: The (projected) event documents
+        """
+        try:
+            cursor = self.collection.find(
+                {"$and": [{"_id": {"$gt": after_id}}, filter]}, projection, session=session
+            ).sort("_id", pymongo.ASCENDING).limit(limit)
+            return await cursor.to_list(length=limit)
+        except PyMongoError as e:
+            self.logger.error(f"Database error while tailing Events: {str(e)}")
+            raise DatabaseError(f"Failed to tail Events: {str(e)}") from e
+        except Exception as e:
+            self.logger.error(f"Unexpected error while tailing Events: {str(e)}")
+            raise ValidationError(f"Error processing tailed Events: {str(e)}") from e
+
+    async def delete_events(self, event_ids: list[str], session=None) -> int:
+        """
+        Delete events by their IDs.
+
+        Returns:
+            int: The number of deleted events
+        """
+        if not event_ids:
+            return 0
+        try:
+            result = await self.collection.delete_many({"_id": {"$in": event_ids}}, session=session)
+            self.logger.info(f"Deleted {result.deleted_count} events")
+            return result.deleted_count
+        except PyMongoError as e:
+            self.logger.error(f"Database error while deleting Events: {str(e)}")
+            raise DatabaseError(f"Failed to delete Events: {str(e)}") from e
+        except Exception as e:
+            self.logger.error(f"Unexpected error while deleting Events: {str(e)}")
+            raise ValidationError(f"Error deleting Events: {str(e)}") from e
+
+    @staticmethod
+    def _to_change_stream_match(filter: dict) -> dict:
+        """
+        Translate an events query filter to a change stream $match on the inserted document.
+        """
+        match = {}
+        for key, value in filter.items():
+            if key in ("$and", "$or", "$nor"):
+                match[key] = [EventsDB._to_change_stream_match(sub_filter) for sub_filter in value]
+            else:
+                match[f"fullDocument.{key}"] = value
+        return match
+
+    async def get_resume_token(self, key: str) -> Optional[dict]:
+        """
+        Get the last saved change stream resume token for a watcher.
+
+        Args:
+            key: Unique name of the watcher (e.g. the producer class name)
+
+        Returns:
+            Optional[dict]: The resume token if one was saved, None otherwise
+        """
+        try:
+            doc = await self.resume_tokens_collection.find_one({"_id": key})
+            return doc.get("token") if doc else None
+        except PyMongoError as e:
+            self.logger.error(f"Database error while fetching resume token {key}: {str(e)}")
+            raise DatabaseError(f"Failed to fetch resume token: {str(e)}") from e
+
+    async def save_resume_token(self, key: str, token: dict) -> None:
+        """
+        Save the change stream resume token of a watcher.
+
+        Args:
+            key: Unique name of the watcher (e.g. the producer class name)
+            token: The resume token to save
+        """
+        try:
+            await self.resume_tokens_collection.update_one(
+                {"_id": key},
+                {"$set": {"token": token, "updated_at": datetime.now(UTC)}},
+                upsert=True
+            )
+        except PyMongoError as e:
+            self.logger.error(f"Database error while saving resume token {key}: {str(e)}")
+            raise DatabaseError(f"Failed to save resume token: {str(e)}") from e
+
+    async def _open_change_stream(self, filter: dict, resume_token: Optional[dict], batch_size: int, max_await_time_ms: int,
+                                  projection: Optional[dict] = None):
+        """
+        Open a change stream on inserted events and wait for its first change.
+        Change streams are opened lazily, so errors only surface on the first read.
+
+        Returns:
+            tuple: The open change stream and its first change (None if none arrived yet)
+        """
+        pipeline = [{"$match": {"operationType": "insert", **self._to_change_stream_match(filter)}}]
+        if projection:
+            pipeline.append({"$project": {f"fullDocument.{key}": value for key, value in projection.items()}})
+        stream = self.collection.watch(
+            pipeline,
+            resume_after=resume_token,
+            batch_size=batch_size,
+            max_await_time_ms=max_await_time_ms
+        )
+        try:
+            return stream, await stream.try_next()
+        except Exception:
+            await stream.close()
+            raise
+
+    async def watch_events(
+        self,
+        filter: dict,
+        resume_token_key: Optional[str] = None,
+        batch_size: int = 100,
+        max_await_time_ms: int = 500,
+        projection: Optional[dict] = None
+    ) -> AsyncIterator[list[dict]]:
+        """
+        Watch the events collection for newly inserted events matching a filter.
+        Yields batches of inserted documents, and an empty batch whenever no event
+        arrived within max_await_time_ms so callers can run periodic work.
+
+        When resume_token_key is given, the resume token of a batch is saved once the
+        caller asks for the next batch, so a restarted watcher continues after the
+        last processed event instead of the last received one.
+
+        Args:
+            filter: The filter inserted events must match
+            resume_token_key: Optional key to persist the resume token under
+            batch_size: Maximum number of events per yielded batch
+            max_await_time_ms: Maximum time the server waits for new events per round trip
+            projection: Optional inclusion projection of the yielded documents, applied by the server
+
+        Raises:
+            ChangeStreamUnavailableError: If the deployment does not support change streams
+            DatabaseError: If a database operation fails
+        """
+        resume_token = await self.get_resume_token(resume_token_key) if resume_token_key else None
+        try:
+            try:
+                stream, change = await self._open_change_stream(filter, resume_token, batch_size, max_await_time_ms, projection)
+            except OperationFailure as e:
+                if e.code != CHANGE_STREAM_HISTORY_LOST_CODE or resume_token is None:
+                    raise
+                self.logger.warning(f"Resume token for {resume_token_key} is no longer in the oplog, watching from now")
+                stream, change = await self._open_change_stream(filter, None, batch_size, max_await_time_ms, projection)
+
+            self.logger.info(f"Watching events collection for inserts (resume_token_key={resume_token_key})")
+            async with stream:
+                pending_token = None
+                while True:
+                    if pending_token is not None:
+                        await self.save_resume_token(resume_token_key, pending_token)
+                        pending_token = None
+
+                    batch = []
+                    if change is None:
+                        change = await stream.try_next()
+                    while change is not None:
+                        batch.append(change["fullDocument"])
+                        if len(batch) >= batch_size:
+                            break
+                        change = await stream.try_next()
+                    change = None
+
+                    if batch and resume_token_key:
+                        pending_token = stream.resume_token
+                    yield batch
+        except OperationFailure as e:
+            if e.code in CHANGE_STREAM_UNSUPPORTED_CODES:
+                self.logger.warning(f"Change streams are not supported by this deployment: {str(e)}")
+                raise ChangeStreamUnavailableError(f"Change streams unavailable: {str(e)}") from e
+            self.logger.error(f"Database error while watching Events: {str(e)}")
+            raise DatabaseError(f"Failed to watch Events: {str(e)}") from e
+        except PyMongoError as e:
+            self.logger.error(f"Database error while watching Events: {str(e)}")
+            raise DatabaseError(f"Failed to watch Events: {str(e)}") from e
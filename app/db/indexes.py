@@ -0,0 +1,238 @@
+"""
+Index declarations and query plan verification.
+
+Every index is declared next to the query shapes it serves, with partial filters where the queries
+only read a subset of the collection (e.g. the outbox only reads unpublished events), so the indexes
+stay as small as the working set. `ensure_indexes` creates the declared indexes, updates the ones
+whose options changed and drops the ones they replaced. `verify_query_plans` explains the hot
+queries (`hot_queries`) and reports those that scan the collection or sort in memory.
+"""
+from dataclasses import dataclass, field
+from datetime import UTC, datetime
+from typing import Dict, List, Optional, Tuple
+from pymongo import ASCENDING, DESCENDING, IndexModel
+from pymongo.errors import OperationFailure
+from app.config import AppConfig
+from app.models.statuses_enums import EventType, LinkStatusEnum, TopologyStatusEnum
+
+# Server error codes of create_index when an index exists with other options / another name,
+# and when a unique index cannot be built over the existing documents
+INDEX_OPTIONS_CONFLICT_CODE = 85
+INDEX_KEY_SPECS_CONFLICT_CODE = 86
+DUPLICATE_KEY_CODE = 11000
+
+# Indexes replaced by the declared ones, dropped when found
+OBSOLETE_INDEXES = {
+    "EVENTS_COLLECTION": ["events_published_created_idx", "events_type_after_id_idx"],
+    "TOPOLOGIES_SIMULATIONS_COLLECTION": ["simulations_status_updated_idx", "simulations_status_counters_idx"],
+    "TOPOLOGIES_COLLECTION": ["topologies_fingerprint_idx"],
+}
+
+# Events read by the archiver, when the retention TTL index (which serves its query) is not declared
+ARCHIVABLE_EVENTS_INDEX = "events_archivable_updated_idx"
+ARCHIVABLE_EVENTS_FILTER = {"published": True, "is_handled": True}
+
+SIMULATION_EVENT_TYPES = [
+    EventType.SIMULATION_CREATED.value,
+    EventType.SIMULATION_UPDATED.value,
+    EventType.SIMULATION_STOPPED.value,
+    EventType.SIMULATION_COMPLETED.value
+]
+
+
+@dataclass(frozen=True)
+class QueryShape:
+    """A query as issued by the application, with representative values."""
+    name: str
+    collection: str
+    filter: dict
+    sort: List[Tuple[str, int]] = field(default_factory=list)
+
+
+def obsolete_indexes(config: AppConfig) -> Dict[str, List[str]]:
+    """The obsolete indexes of each collection (OBSOLETE_INDEXES, and the ones the config no longer needs)."""
+    obsolete = {collection_key: list(names) for collection_key, names in OBSOLETE_INDEXES.items()}
+    if config.EVENTS_RETENTION_ENABLED:
+        obsolete.setdefault("EVENTS_COLLECTION", []).append(ARCHIVABLE_EVENTS_INDEX)
+    return obsolete
+
+
+def declared_indexes(config: AppConfig) -> Dict[str, List[IndexModel]]:
+    """The indexes of each collection (keyed by the config attribute of its name)."""
+    events = [
+        # Outbox polling and claiming: published=False + event_type, oldest / newest first
+        IndexModel(
+            [("event_type", ASCENDING), ("created_at", ASCENDING)],
+            name="events_unpublished_type_created_idx",
+            partialFilterExpression={"published": False}
+        ),
+        IndexModel([("published", ASCENDING), ("lease_expires_at", ASCENDING)], name="events_published_lease_idx"),
+        IndexModel([("lease_id", ASCENDING)], name="events_lease_id_idx", sparse=True),
+    ]
+    if config.EVENTS_RETENTION_ENABLED:
+        # Retention: expires handled and published events; also serves the archiver query
+        events.append(IndexModel(
+            [("updated_at", ASCENDING)],
+            name="events_retention_ttl_idx",
+            expireAfterSeconds=config.EVENTS_TTL_SEC,
+            partialFilterExpression=ARCHIVABLE_EVENTS_FILTER
+        ))
+    elif config.EVENTS_ARCHIVE_ENABLED:
+        # Archiver without retention: the same partial index, without TTL. Its key differs from the TTL
+        # index key, so both can exist while retention is switched on (this one is then dropped)
+        events.append(IndexModel(
+            [("updated_at", ASCENDING), ("_id", ASCENDING)],
+            name=ARCHIVABLE_EVENTS_INDEX,
+            partialFilterExpression=ARCHIVABLE_EVENTS_FILTER
+        ))
+    return {
+        "EVENTS_COLLECTION": events,
+        "TOPOLOGIES_COLLECTION": [
+            # Deduplication of submitted topologies (upserts by fingerprint)
+            IndexModel([("fingerprint", ASCENDING)], name="topologies_fingerprint_unique_idx", unique=True),
+            IndexModel([("sim_id", ASCENDING)], name="topologies_sim_id_idx", sparse=True),
+        ],
+        "TOPOLOGY_LINKS_CHUNKS_COLLECTION": [
+            IndexModel([("topology_id", ASCENDING), ("chunk", ASCENDING)], name="topology_links_chunks_idx", unique=True),
+        ],
+        "TOPOLOGIES_SIMULATIONS_COLLECTION": [
+            # Status listings are paginated by _id
+            IndexModel([("status", ASCENDING), ("_id", ASCENDING)], name="simulations_status_id_idx"),
+            IndexModel([("topology._id", ASCENDING), ("_id", ASCENDING)], name="simulations_topology_id_idx"),
+        ],
+    }
+
+
+def hot_queries(config: AppConfig) -> List[QueryShape]:
+    """The queries run on every producer / consumer iteration or API page."""
+    now = datetime.now(UTC)
+    unleased = {"$or": [{"lease_expires_at": None}, {"lease_expires_at": {"$lte": now}}]}
+    link_run = {"published": False, "event_type": EventType.LINK_RUN.value}
+    queries = [
+        QueryShape("outbox_links", "EVENTS_COLLECTION", link_run, [("created_at", DESCENDING)]),
+        QueryShape(
+            "outbox_simulations", "EVENTS_COLLECTION",
+            {"published": False, "event_type": {"$in": SIMULATION_EVENT_TYPES}}, [("created_at", DESCENDING)]
+        ),
+        QueryShape("outbox_claim", "EVENTS_COLLECTION", {"$and": [link_run, unleased]}, [("created_at", ASCENDING)]),
+        QueryShape("outbox_lease", "EVENTS_COLLECTION", {"lease_id": ""}, [("created_at", ASCENDING)]),
+        QueryShape(
+            "simulations_by_statuses", "TOPOLOGIES_SIMULATIONS_COLLECTION",
+            {"$and": [{"status": {"$in": [TopologyStatusEnum.running.value]}},
+                      {"links_execution_state.processed_links.status": {"$in": [LinkStatusEnum.failed.value]}}]},
+            [("_id", ASCENDING)]
+        ),
+        QueryShape("simulations_of_topology", "TOPOLOGIES_SIMULATIONS_COLLECTION", {"topology._id": ""}, [("_id", ASCENDING)]),
+        QueryShape(
+            "simulations_page_by_status", "TOPOLOGIES_SIMULATIONS_COLLECTION",
+            {"status": {"$in": [TopologyStatusEnum.running.value, TopologyStatusEnum.done.value]}, "_id": {"$gt": ""}},
+            [("_id", ASCENDING)]
+        ),
+        QueryShape(
+            "simulations_page_created_after", "TOPOLOGIES_SIMULATIONS_COLLECTION",
+            {"created_at": {"$gt": now}, "_id": {"$gte": ""}}, [("_id", ASCENDING)]
+        ),
+        QueryShape(
+            "pushed_events_after_id", "EVENTS_COLLECTION",
+            {"$and": [{"_id": {"$gt": ""}}, {"event_type": {"$in": SIMULATION_EVENT_TYPES}}]}, [("_id", ASCENDING)]
+        ),
+        QueryShape("topology_by_fingerprint", "TOPOLOGIES_COLLECTION", {"fingerprint": ""}),
+        QueryShape("topology_links_chunks", "TOPOLOGY_LINKS_CHUNKS_COLLECTION", {"topology_id": ""}, [("chunk", ASCENDING)]),
+    ]
+    if config.EVENTS_RETENTION_ENABLED or config.EVENTS_ARCHIVE_ENABLED:
+        queries.append(QueryShape(
+            "archivable_events", "EVENTS_COLLECTION",
+            {"published": True, "is_handled": True, "updated_at": {"$lt": now}}, [("updated_at", ASCENDING)]
+        ))
+    return queries
+
+
+async def _create_index(collection, index: IndexModel, logger) -> None:
+    """
+    Create an index. An index of the same name with other options is updated in place when only
+    its TTL changed, and dropped and recreated otherwise.
+    """
+    try:
+        await collection.create_indexes([index])
+    except OperationFailure as e:
+        if e.code == DUPLICATE_KEY_CODE:
+            logger.error(f"Index {index.document['name']} on '{collection.name}' was not created, "
+                         f"the collection has duplicate keys: {str(e)}")
+            return
+        if e.code not in (INDEX_OPTIONS_CONFLICT_CODE, INDEX_KEY_SPECS_CONFLICT_CODE):
+            raise
+        document = index.document
+        existing = (await collection.index_information()).get(document["name"], {})
+        if "expireAfterSeconds" in document and existing.get("key") == list(document["key"].items()):
+            await collection.database.command(
+                "collMod", collection.name,
+                index={"name": document["name"], "expireAfterSeconds": document["expireAfterSeconds"]}
+            )
+            logger.info(f"Updated the TTL of index {document['name']} on '{collection.name}'")
+            return
+        logger.warning(f"Recreating index {document['name']} on '{collection.name}' with its declared options")
+        await collection.drop_index(document["name"])
+        await collection.create_indexes([index])
+
+
+async def ensure_indexes(db, config: AppConfig, logger) -> None:
+    """Create the declared indexes of every collection and drop the obsolete ones."""
+    obsolete = obsolete_indexes(config)
+    for collection_key, indexes in declared_indexes(config).items():
+        collection = db[getattr(config, collection_key)]
+        for index in indexes:
+            await _create_index(collection, index, logger)
+        # Dropped only once all the declared indexes exist (e.g. not if a unique one failed on duplicates)
+        existing = await collection.index_information()
+        replaced = all(index.document["name"] in existing for index in indexes)
+        for name in obsolete.get(collection_key, []):
+            if replaced and name in existing:
+                await collection.drop_index(name)
+                logger.info(f"Dropped obsolete index {name} on '{collection.name}'")
+        logger.info(f"Ensured indexes for '{collection.name}' collection.")
+
+
+def _plan_stages(plan: dict) -> List[str]:
+    """All the stage names of a winning plan (classic and slot-based engine explain formats)."""
+    stages = []
+    pending = [plan]
+    while pending:
+        stage = pending.pop()
+        if not isinstance(stage, dict):
+            continue
+        if "stage" in stage:
+            stages.append(stage["stage"])
+        pending.extend(stage[key] for key in ("inputStage", "queryPlan") if key in stage)
+        pending.extend(stage.get("inputStages", []))
+    return stages
+
+
+def plan_issues(explain: dict) -> Optional[str]:
+    """Why a query plan is not index-covered (None when it is)."""
+    stages = _plan_stages(explain.get("queryPlanner", {}).get("winningPlan", {}))
+    if "COLLSCAN" in stages:
+        return "collection scan"
+    if "SORT" in stages:
+        return "in-memory sort"
+    return None
+
+
+async def verify_query_plans(db, config: AppConfig, logger) -> List[Tuple[str, str]]:
+    """
+    Explain the hot queries and report those not served by an index.
+
+    Returns:
+        List of (query name, issue) of the queries that are not index-covered
+    """
+    uncovered = []
+    for query in hot_queries(config):
+        cursor = db[getattr(config, query.collection)].find(query.filter).limit(1)
+        if query.sort:
+            cursor = cursor.sort(query.sort)
+        issue = plan_issues(await cursor.explain())
+        if issue:
+            uncovered.append((query.name, issue))
+            logger.warning(f"Query '{query.name}' on '{getattr(config, query.collection)}' is not index-covered: {issue}")
+    if not uncovered:
+        logger.info(f"All {len(hot_queries(config))} hot queries are index-covered ✅")
+    return uncovered
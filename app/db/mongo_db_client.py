@@ -2,6 +2,7 @@ from motor.motor_asyncio import AsyncIOMotorClient
 from app.business_logic.exceptions import DatabaseError
 from app.utils.logger import LoggerManager
 from app.config import AppConfig
+from app.db import indexes
 
 COLLECTION_NAME = "simulations"
 
@@ -38,36 +39,24 @@ class MongoDBConnectionManager:
             raise DatabaseError(f"Could not connect to MongoDB: {str(e)}") from e
         
     async def ensure_indexes(self):
+        """Create the indexes declared in app/db/indexes.py."""
         try:
-            # Ensure unique index on sim_id for simulations collection
-            await self.db["events"].create_index(
-                [("_id", 1)], 
-                name="event_id_unique_idx"
-            )
-            await self.db["events"].create_index(
-                [("published", 1), ("created_at", 1)],
-                name="events_published_created_idx"
-            )
-            self.db_logger.info("Ensured indexes for 'events' collection.")
-
-            await self.db["topologies"].create_index(
-                [("_id", 1)], name="topolgy_id_unique_idx"
-            )
-            self.db_logger.info("Ensured index on 'topolgy_id' for 'topologies' collection.")
-
-            await self.db["topologies_simulations"].create_index(
-                [("_id", 1)], name="topolgy_simulation_id_unique_idx"
-            )
-            await self.db["topologies_simulations"].create_index(
-                [("status", 1), ("updated_at", 1)],
-                name="simulations_status_updated_idx"
-            )
-            self.db_logger.info("Ensured indexes for 'topologies_simulations' collection.")
-
+            await indexes.ensure_indexes(self.db, self.config, self.db_logger)
         except Exception as e:
             self.db_logger.error(f"Error ensuring indexes: {str(e)}")
             raise DatabaseError(f"Could not ensure indexes: {str(e)}") from e
 
+    async def verify_indexes(self) -> list:
+        """
+        Check with explain() that the hot queries are index-covered. Never fails startup:
+        the queries that are not covered (or could not be explained) are logged and returned.
+        """
+        try:
+            return await indexes.verify_query_plans(self.db, self.config, self.db_logger)
+        except Exception as e:
+            self.db_logger.warning(f"Could not verify query plans: {str(e)}")
+            return []
+
     async def close(self):
         try:
             if self.client:
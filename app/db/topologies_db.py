@@ -3,16 +3,20 @@ from app.utils.logger import LoggerManager
 from app.business_logic.error_handlers import DatabaseError, ValidationError
 from datetime import datetime, UTC
 from bson.objectid import ObjectId
-from app.models.topolgy_models import Topology
-from typing import List, Optional
+from app.models.topolgy_models import Topology, Link
+from app.models.adapters import LINKS_ADAPTER
+from app.models.links_columns import LinksColumns
+from typing import Dict, List, Optional
 from pymongo.errors import PyMongoError
 from pymongo import UpdateOne
 from pymongo.errors import BulkWriteError
 from app.utils.object_utils import get_fingerprint
-from app.models.requests_models import SimulationRequest
+from app.utils.cache import get_cache
 from app.app_container import app_container
 from pymongo.collection import Collection
 
+DUPLICATE_KEY_CODE = 11000
+
 class TopologiesDB:
     """
     Repository for CRUD operations on Topologies documents in MongoDB.
@@ -22,26 +26,111 @@ class TopologiesDB:
         self.config = app_container.config()
         self.db = db
         self.collection = db[self.config.TOPOLOGIES_COLLECTION]
+        self.links_chunks_collection = db[self.config.TOPOLOGY_LINKS_CHUNKS_COLLECTION]
         self.logger = LoggerManager.get_logger('topologies_db')
+        # Shared by the instances of the process; the cached models must not be modified
+        self.topologies_cache = get_cache("topologies_by_fingerprint", self.config.TOPOLOGIES_CACHE_MAX_SIZE,
+                                          self.config.TOPOLOGIES_CACHE_TTL_SEC)
 
     def _convert_doc_to_topology(self, doc):
         return Topology.model_validate({k: v for k, v in doc.items() if k != 'fingerprint'})
 
-    async def store_topologies(self, topologies: List[Topology], session=None) -> List[Topology]:
+    async def get_topologies_by_fingerprints(self, fingerprints: List[str], session=None) -> Dict[str, Topology]:
+        """
+        Read the topologies with the given fingerprints, from the topologies cache or with one query.
+        Stored topologies never change, so the ones read are cached (for TOPOLOGIES_CACHE_TTL_SEC).
+
+        Returns:
+            Dict of fingerprint to Topology, for the fingerprints found
+        """
+        topologies = {}
+        missing = []
+        for fingerprint in set(fingerprints):
+            topology = self.topologies_cache.get(fingerprint)
+            if topology is None:
+                missing.append(fingerprint)
+            else:
+                topologies[fingerprint] = topology
+        if not missing:
+            return topologies
         try:
-            docs = []
+            async for doc in self.collection.find({"fingerprint": {"$in": missing}}, session=session):
+                topology = self._convert_doc_to_topology(doc)
+                self.topologies_cache.set(doc["fingerprint"], topology)
+                topologies[doc["fingerprint"]] = topology
+            return topologies
+        except PyMongoError as e:
+            self.logger.error(f"Database error while fetching Topologies by fingerprints: {str(e)}")
+            raise DatabaseError(f"Failed to retrieve topologies: {str(e)}") from e
+        except Exception as e:
+            self.logger.error(f"Unexpected error while fetching Topologies by fingerprints: {str(e)}")
+            raise ValidationError(f"Error processing topologies data: {str(e)}") from e
+
+    async def upsert_topologies(self, topologies: List[Topology]) -> Dict[str, Topology]:
+        """
+        Store topologies unless a topology with the same fingerprint exists, with one bulk write of
+        upserts on the unique fingerprint index. Stored topologies never change and are shared by the
+        requests, so this runs outside of the request transactions: an upsert racing with another request
+        on the same fingerprint fails on the unique index instead of aborting the transaction, and the
+        topology stored by the other request is read back instead, with one query.
+
+        Topologies with more links than TOPOLOGY_LINKS_CHUNKING_THRESHOLD are stored chunked. Their chunks
+        are written before the upserts, so a topology is never read without its links, and the chunks of
+        the topologies stored by another request are deleted. The returned models of the topologies stored
+        by this call keep their links in memory.
+
+        Returns:
+            Dict of fingerprint to the stored Topology
+        """
+        if not topologies:
+            return {}
+        try:
+            now = datetime.now(UTC)
+            operations, fingerprints, stored, chunk_docs = [], [], [], {}
             for topology in topologies:
                 topology_dict = topology.model_dump(by_alias=True)
-                topology_dict["created_at"] = datetime.now(UTC)
-                topology_dict["updated_at"] = datetime.now(UTC)
+                topology_dict["created_at"] = now
+                topology_dict["updated_at"] = now
                 topology_dict["fingerprint"] = get_fingerprint(topology_dict)
-                docs.append(topology_dict)
-            result = await self.collection.insert_many(docs, session=session)
-            self.logger.info(f"Created Topologies with ids {result.inserted_ids}")
+                if len(topology.links) > self.config.TOPOLOGY_LINKS_CHUNKING_THRESHOLD:
+                    chunk_docs[len(operations)] = self._build_links_chunks(topology_dict["_id"], topology.links)
+                    topology_dict["links"] = []
+                    topology_dict["links_storage"] = "chunked"
+                fingerprints.append(topology_dict["fingerprint"])
+                stored.append(topology.model_copy(update={
+                    "links_storage": topology_dict["links_storage"], "created_at": now, "updated_at": now
+                }))
+                operations.append(UpdateOne(
+                    {"fingerprint": topology_dict["fingerprint"]}, {"$setOnInsert": topology_dict}, upsert=True
+                ))
+
+            chunks = [chunk for index_chunks in chunk_docs.values() for chunk in index_chunks]
+            if chunks:
+                await self.links_chunks_collection.insert_many(chunks)
+                self.logger.info(f"Stored {len(chunks)} links chunks")
+
+            try:
+                result = await self.collection.bulk_write(operations, ordered=False)
+                upserted = result.upserted_ids
+            except BulkWriteError as e:
+                # Upserts racing with another request on the same fingerprint: the other topology is kept
+                if any(error.get("code") != DUPLICATE_KEY_CODE for error in e.details.get("writeErrors", [])):
+                    raise
+                upserted = {item["index"]: item["_id"] for item in e.details.get("upserted", [])}
+            self.logger.info(f"Created Topologies with ids {list(upserted.values())}")
 
-            cursor = self.collection.find({"_id": {"$in": result.inserted_ids}}, session=session)
-            docs = await cursor.to_list(length=len(result.inserted_ids))
-            return [self._convert_doc_to_topology(doc) for doc in docs]
+            unused_topology_ids = [chunk_docs[index][0]["topology_id"] for index in chunk_docs if index not in upserted]
+            if unused_topology_ids:
+                await self.links_chunks_collection.delete_many({"topology_id": {"$in": unused_topology_ids}})
+
+            topologies_by_fingerprint = {fingerprints[index]: stored[index] for index in upserted}
+            existing = [fingerprint for fingerprint in fingerprints if fingerprint not in topologies_by_fingerprint]
+            if existing:
+                self.logger.info(f"{len(existing)} Topologies were already stored")
+                topologies_by_fingerprint.update(await self.get_topologies_by_fingerprints(existing))
+            return topologies_by_fingerprint
+        except (DatabaseError, ValidationError):
+            raise
         except PyMongoError as e:
             self.logger.error(f"Database error while creating Topologies: {str(e)}")
             raise DatabaseError(f"Failed to create Topologies: {str(e)}") from e
@@ -49,6 +138,82 @@ class TopologiesDB:
             self.logger.error(f"Unexpected error while creating Topologies: {str(e)}")
             raise ValidationError(f"Failed to create Topologies: {str(e)}") from e
 
+    def _build_links_chunks(self, topology_id: str, links: List[Link]) -> List[dict]:
+        """
+        Split links into chunk documents, holding either the link documents or, with
+        TOPOLOGY_LINKS_CHUNK_ENCODING 'columnar', a single LinksColumns binary.
+        """
+        chunk_size = self.config.TOPOLOGY_LINKS_CHUNK_SIZE
+        chunks = []
+        for index, start in enumerate(range(0, len(links), chunk_size)):
+            chunk_links = links[start:start + chunk_size]
+            chunk = {
+                "_id": f"{topology_id}:{index}",
+                "topology_id": topology_id,
+                "chunk": index,
+                "created_at": datetime.now(UTC)
+            }
+            if self.config.TOPOLOGY_LINKS_CHUNK_ENCODING == "columnar":
+                chunk["links_columns"] = LinksColumns.from_links(chunk_links).to_bson()
+            else:
+                chunk["links"] = [link.model_dump(by_alias=True) for link in chunk_links]
+            chunks.append(chunk)
+        return chunks
+
+    @staticmethod
+    def _chunk_links(chunk: dict) -> List[Link]:
+        if "links_columns" in chunk:
+            return LinksColumns.from_bson(chunk["links_columns"]).to_links()
+        return LINKS_ADAPTER.validate_python(chunk["links"])
+
+    async def get_topologies_links(self, topology_ids: List[str], session=None) -> Dict[str, List[Link]]:
+        """
+        Read the links of many chunked topologies with one query, each in their original order.
+
+        Returns:
+            Dict of topology ID to its links
+        """
+        try:
+            cursor = self.links_chunks_collection.find(
+                {"topology_id": {"$in": topology_ids}}, session=session
+            ).sort([("topology_id", 1), ("chunk", 1)])
+            links_by_topology = {topology_id: [] for topology_id in topology_ids}
+            async for chunk in cursor:
+                links_by_topology[chunk["topology_id"]].extend(self._chunk_links(chunk))
+            self.logger.info(f"Fetched the links of {len(topology_ids)} topologies")
+            return links_by_topology
+        except PyMongoError as e:
+            self.logger.error(f"Database error while fetching links of topologies: {str(e)}")
+            raise DatabaseError(f"Failed to retrieve topology links: {str(e)}") from e
+        except Exception as e:
+            self.logger.error(f"Unexpected error while fetching links of topologies: {str(e)}")
+            raise ValidationError(f"Error processing topology links data: {str(e)}") from e
+
+    async def get_topology_links(self, topology_id: str, session=None) -> List[Link]:
+        """
+        Read the links of a chunked topology, in their original order.
+
+        Args:
+            topology_id: The ID of the topology
+            session: MongoDB session for transaction support
+
+        Returns:
+            List of Link objects
+        """
+        try:
+            cursor = self.links_chunks_collection.find({"topology_id": topology_id}, session=session).sort("chunk", 1)
+            links = []
+            async for chunk in cursor:
+                links.extend(self._chunk_links(chunk))
+            self.logger.info(f"Fetched {len(links)} links of topology {topology_id}")
+            return links
+        except PyMongoError as e:
+            self.logger.error(f"Database error while fetching links of topology {topology_id}: {str(e)}")
+            raise DatabaseError(f"Failed to retrieve topology links: {str(e)}") from e
+        except Exception as e:
+            self.logger.error(f"Unexpected error while fetching links of topology {topology_id}: {str(e)}")
+            raise ValidationError(f"Error processing topology links data: {str(e)}") from e
+
     async def get_topology(self, sim_id: str) -> Optional[Topology]:
         try:
             doc = await self.collection.find_one({"sim_id": sim_id})
@@ -64,27 +229,6 @@ class TopologiesDB:
             self.logger.error(f"Unexpected error while fetching topologies {sim_id}: {str(e)}")
             raise ValidationError(f"Error processing topologies data: {str(e)}") from e
         
-    async def get_exist_topology(self, simulation_request: SimulationRequest, session=None):
-        """
-        Checks if a topology with the same nodes (order and content), links (order and content), and config exists in the DB.
-        Returns True if topology is new (not found in DB), False otherwise.
-        """
-        simulation_request.topology.config = simulation_request.config
-        query = {
-            "fingerprint": get_fingerprint(simulation_request.topology.model_dump())
-        }
-        try:
-            cursor = await self.collection.find_one(query, session=session)
-            if cursor:
-                self.logger.info(f"Topology found in DB (id={cursor.get('_id')})")
-                return self._convert_doc_to_topology(cursor)
-            self.logger.info("Topology is new (no duplicate found in DB)")
-            return None
-        except Exception as e:
-            self.logger.error(f"Error checking topology uniqueness: {e}")
-            raise e
-        
-
     async def update_many(self, updates: list[tuple[str, Topology]]) -> int:
         """
         Update multiple Topologies by their sim_id using MongoDB bulk_write.
@@ -1,19 +1,25 @@
 from app.utils.logger import LoggerManager
 from app.business_logic.exceptions import DatabaseError, ValidationError
-from datetime import datetime, UTC
+from datetime import datetime, timedelta, UTC
 import os
 from pymongo.errors import PyMongoError
 from app.models.topolgy_simulation_models import TopologySimulation
-from typing import List, Optional
+from app.models.topolgy_models import Link
+from typing import List, Optional, Tuple
 from bson.objectid import ObjectId
-from pymongo import UpdateOne
+from pymongo import UpdateOne, ReturnDocument
 from pymongo.bulk import BulkWriteError
 from app.models.pageination_models import CursorPaginationRequest, CursorPaginationResponse
-from pydantic import TypeAdapter
+from app.models.adapters import TOPOLOGY_SIMULATION_ADAPTER, TOPOLOGY_SIMULATIONS_ADAPTER, LINKS_ADAPTER
+from app.models.events_models import DeltaOperation, PROCESSED_LINKS_PATH
 from app.models.statuses_enums import TopologyStatusEnum, LinkStatusEnum
 from app.app_container import app_container
 from pymongo.collection import Collection
 
+# Sim ids are ObjectIds generated shortly before the simulation is stored (at most this long before its
+# created_at), so a created_at lower bound also bounds the _id range
+SIM_ID_CREATION_SLACK = timedelta(minutes=10)
+
 class TopologiesSimulationsDB:
     """
     Repository for CRUD operations on TopologiesSimulation documents in MongoDB.
@@ -42,9 +48,8 @@ class TopologiesSimulationsDB:
                 simulation["updated_at"] = datetime.now(UTC)
             result = await self.collection.insert_many(docs, session=session)
             self.logger.info(f"Created simulation metadata with ids {result.inserted_ids}")
-            cursor = self.collection.find({"_id": {"$in": result.inserted_ids}}, session=session)
-            new_docs = await cursor.to_list(length=len(result.inserted_ids))
-            return [TopologySimulation.model_validate(doc) for doc in new_docs]
+            # The inserted documents are returned as stored, without reading them back
+            return TOPOLOGY_SIMULATIONS_ADAPTER.validate_python(docs)
         except PyMongoError as e:
             self.logger.error(f"Database error while creating simulation metadata: {str(e)}")
             raise DatabaseError(f"Failed to create simulation metadata: {str(e)}") from e
@@ -72,7 +77,7 @@ class TopologiesSimulationsDB:
             if simulation is None:
                 self.logger.error(f"Simulation {simulation_id} not found")
                 return None
-            return TypeAdapter(TopologySimulation).validate_python(simulation)
+            return TOPOLOGY_SIMULATION_ADAPTER.validate_python(simulation)
         except PyMongoError as e:
             self.logger.error(f"Database error while fetching topologies simulations: {str(e)}")
             raise DatabaseError(f"Failed to fetch topologies simulations: {str(e)}") from e
@@ -80,21 +85,65 @@ class TopologiesSimulationsDB:
             self.logger.error(f"Unexpected error while fetching topologies simulations: {str(e)}")
             raise ValidationError(f"Invalid topologies simulations: {str(e)}") from e
         
+    async def _cursor_page_docs(self, query: dict, cursor_pagination_request: CursorPaginationRequest, projection: Optional[dict] = None, session=None) -> Tuple[List[dict], Optional[str], Optional[int]]:
+        """
+        Read a page of raw simulation documents, in _id order after the request cursor.
+
+        Returns:
+            tuple: The (projected) documents, the next cursor and the total (when requested)
+        """
+        if cursor_pagination_request.cursor:
+            try:
+                query['_id'] = {**query.get('_id', {}), '$gt': cursor_pagination_request.cursor}
+            except Exception:
+                raise ValidationError('Invalid cursor value')
+        cursor = self.collection.find(query, projection, session=session).sort('_id', 1).limit(cursor_pagination_request.page_size)
+        docs = await cursor.to_list(length=cursor_pagination_request.page_size)
+        total = await self.collection.count_documents(query, session=session) if cursor_pagination_request.with_total else None
+        if docs:
+            next_cursor = str(docs[-1]['_id']) if len(docs) == cursor_pagination_request.page_size else None
+        else:
+            next_cursor = None
+        return docs, next_cursor, total
+
+    @staticmethod
+    def simulations_filter(statuses: Optional[List[TopologyStatusEnum]] = None, created_after: Optional[datetime] = None) -> dict:
+        """
+        The query of the simulations with one of 'statuses' created after 'created_after' (both optional).
+        Pages of it keep the _id order without an in-memory sort: statuses are served by the status/_id
+        index, and created_after also bounds the _id range (see SIM_ID_CREATION_SLACK).
+        """
+        query = {}
+        if statuses:
+            query["status"] = {"$in": [TopologyStatusEnum(status).value for status in statuses]}
+        if created_after is not None:
+            if created_after.tzinfo is None:
+                created_after = created_after.replace(tzinfo=UTC)
+            query["created_at"] = {"$gt": created_after}
+            query["_id"] = {"$gte": str(ObjectId.from_datetime(created_after - SIM_ID_CREATION_SLACK))}
+        return query
+
+    async def list_simulations_docs(self, cursor_pagination_request: CursorPaginationRequest, projection: Optional[dict] = None, query: Optional[dict] = None, session=None) -> Tuple[List[dict], Optional[str], Optional[int]]:
+        """
+        Read a page of the simulations matching a query (all by default, see simulations_filter) as raw
+        documents, optionally projected (e.g. to their versions or to summary fields).
+
+        Returns:
+            tuple: The documents, the next cursor and the total (when requested)
+
+        Raises:
+            DatabaseError: If a database operation fails
+        """
+        try:
+            return await self._cursor_page_docs(dict(query or {}), cursor_pagination_request, projection, session=session)
+        except PyMongoError as e:
+            self.logger.error(f"Database error while listing simulations documents: {str(e)}")
+            raise DatabaseError(f"Failed to list simulations: {str(e)}") from e
+
     async def _cursor_paginate(self, query: dict, cursor_pagination_request: CursorPaginationRequest, session=None) -> CursorPaginationResponse[TopologySimulation]:
         try:
-            if cursor_pagination_request.cursor:
-                try:
-                    query['_id'] = {'$gt': cursor_pagination_request.cursor}
-                except Exception:
-                    raise ValidationError('Invalid cursor value')
-            cursor = self.collection.find(query, session=session).sort('_id', 1).limit(cursor_pagination_request.page_size)
-            docs = await cursor.to_list(length=cursor_pagination_request.page_size)
-            total = await self.collection.count_documents(query, session=session) if cursor_pagination_request.with_total else None
-            if docs:
-                next_cursor = str(docs[-1]['_id']) if len(docs) == cursor_pagination_request.page_size else None
-            else:
-                next_cursor = None
-            items = TypeAdapter(List[TopologySimulation]).validate_python(docs)
+            docs, next_cursor, total = await self._cursor_page_docs(query, cursor_pagination_request, session=session)
+            items = TOPOLOGY_SIMULATIONS_ADAPTER.validate_python(docs)
             return CursorPaginationResponse(
                 items=items,
                 next_cursor=next_cursor,
@@ -150,6 +199,206 @@ class TopologiesSimulationsDB:
             self.logger.error(f"Unexpected error during update: {str(e)}")
             raise ValidationError(f"Update failed: {str(e)}") from e
 
+    async def update_simulation_fields(self, simulation_id: str, row_version: int, fields: dict, push: Optional[dict] = None, session=None) -> int:
+        """
+        Update only the given fields of a simulation, using optimistic concurrency control (row_version).
+        Unlike update_simulation, the rest of the document (topology, links) is not rewritten.
+
+        Args:
+            simulation_id: The ID of the simulation to update
+            row_version: The expected current row_version
+            fields: Dotted field paths to $set (e.g. {"status": ..., "simulation_time.start_time": ...})
+            push: Optional dotted array paths to $push a value to
+            session: MongoDB session for transaction support
+
+        Returns:
+            int: Number of updated documents (1)
+
+        Raises:
+            ValidationError: If the row_version does not match or the simulation is not found
+            DatabaseError: If a database operation fails
+        """
+        update = {
+            "$set": {**fields, "updated_at": datetime.now(UTC)},
+            "$inc": {"row_version": 1}
+        }
+        if push:
+            update["$push"] = push
+        try:
+            result = await self.collection.update_one(
+                {"_id": simulation_id, "row_version": row_version},
+                update,
+                session=session
+            )
+        except PyMongoError as e:
+            self.logger.error(f"Database error during fields update of simulation {simulation_id}: {str(e)}")
+            raise DatabaseError(f"Update failed: {str(e)}") from e
+        if result.modified_count == 0:
+            self.logger.error(f"Row version mismatch or simulation {simulation_id} not found for update.")
+            raise ValidationError("Update failed: row_version mismatch or simulation not found.")
+        self.logger.info(f"Updated fields {list(fields)} of simulation {simulation_id} (row_version {row_version} -> {row_version + 1})")
+        return result.modified_count
+
+    async def apply_links_execution_updates(self, simulation_id: str, completed_links: List[Link], fields: Optional[dict] = None, row_version: Optional[int] = None, session=None) -> int:
+        """
+        Move completed links from not_processed_links to processed_links on the server.
+        Only links that are still in not_processed_links are moved, so applying the same
+        links twice is a no-op and concurrent updates for different links do not conflict.
+        Only the completed links are sent, not the whole simulation.
+
+        Args:
+            simulation_id: The ID of the simulation to update
+            completed_links: The links to move, with their final execution state
+            fields: Optional dotted field paths to $set in the same update
+            row_version: Optional expected current row_version (no guard when None)
+            session: MongoDB session for transaction support
+
+        Returns:
+            int: Number of updated documents
+
+        Raises:
+            ValidationError: If a row_version is given and does not match, or the simulation is not found
+            DatabaseError: If a database operation fails
+        """
+        pipeline = self._links_execution_pipeline(completed_links, fields)
+        query = {"_id": simulation_id}
+        if row_version is not None:
+            query["row_version"] = row_version
+        try:
+            result = await self.collection.update_one(query, pipeline, session=session)
+        except PyMongoError as e:
+            self.logger.error(f"Database error during links update of simulation {simulation_id}: {str(e)}")
+            raise DatabaseError(f"Update failed: {str(e)}") from e
+        if result.matched_count == 0:
+            self.logger.error(f"Row version mismatch or simulation {simulation_id} not found for links update.")
+            raise ValidationError("Update failed: row_version mismatch or simulation not found.")
+        self.logger.info(f"Applied {len(completed_links)} completed links to simulation {simulation_id}")
+        return result.modified_count
+
+    async def apply_simulation_delta(self, simulation_id: str, delta: List[DeltaOperation], row_version: Optional[int] = None, session=None) -> int:
+        """
+        Apply the delta of a delta event to the stored simulation with a single update.
+        'replace' operations are $set, and links added to processed_links are moved like in
+        apply_links_execution_updates, so applying a delta twice is a no-op.
+
+        Args:
+            simulation_id: The ID of the simulation to update
+            delta: The delta operations
+            row_version: Optional expected current row_version (no guard when None)
+            session: MongoDB session for transaction support
+
+        Returns:
+            int: Number of updated documents
+
+        Raises:
+            ValidationError: If an operation is not supported, the row_version does not match, or the simulation is not found
+            DatabaseError: If a database operation fails
+        """
+        fields = {}
+        completed_links = []
+        for operation in delta:
+            if operation.op == "replace":
+                fields[operation.path] = operation.value
+            elif operation.op == "add" and operation.path == PROCESSED_LINKS_PATH:
+                completed_links.extend(LINKS_ADAPTER.validate_python(operation.value))
+            else:
+                raise ValidationError(f"Unsupported delta operation: {operation.op} {operation.path}")
+        return await self.apply_links_execution_updates(simulation_id, completed_links, fields=fields, row_version=row_version, session=session)
+
+    async def complete_links(self, simulation_id: str, completed_links: List[Link], session=None) -> Optional[dict]:
+        """
+        Move completed links to processed_links like apply_links_execution_updates, and return the
+        link counters after the update, so the caller can tell if the simulation just completed.
+
+        Args:
+            simulation_id: The ID of the simulation to update
+            completed_links: The links to move, with their final execution state
+            session: MongoDB session for transaction support
+
+        Returns:
+            Optional[dict]: The processed_count, total_links and row_version of the simulation after the update,
+                or None if none of the links was still not processed (or the simulation does not exist)
+
+        Raises:
+            DatabaseError: If a database operation fails
+        """
+        query = {
+            "_id": simulation_id,
+            "links_execution_state.not_processed_links._id": {"$in": [link.id for link in completed_links]}
+        }
+        try:
+            return await self.collection.find_one_and_update(
+                query,
+                self._links_execution_pipeline(completed_links),
+                projection={"processed_count": 1, "total_links": 1, "row_version": 1},
+                return_document=ReturnDocument.AFTER,
+                session=session
+            )
+        except PyMongoError as e:
+            self.logger.error(f"Database error during links completion of simulation {simulation_id}: {str(e)}")
+            raise DatabaseError(f"Update failed: {str(e)}") from e
+
+    @staticmethod
+    def _links_execution_pipeline(completed_links: List[Link], fields: Optional[dict] = None) -> List[dict]:
+        """
+        Build the update pipeline moving 'completed_links' to processed_links and maintaining the link counters.
+        """
+        link_ids = [link.id for link in completed_links]
+        completed_docs = [link.model_dump(by_alias=True) for link in completed_links]
+        not_processed_path = "$links_execution_state.not_processed_links"
+        return [
+            # Links that are still not processed, i.e. the ones this update actually moves
+            {"$set": {"_moved_links": {"$filter": {
+                "input": {"$literal": completed_docs},
+                "cond": {"$in": ["$$this._id", f"{not_processed_path}._id"]}
+            }}}},
+            {"$set": {
+                **{path: {"$literal": value} for path, value in (fields or {}).items()},
+                "links_execution_state.processed_links": {"$concatArrays": ["$links_execution_state.processed_links", "$_moved_links"]},
+                "links_execution_state.not_processed_links": {"$filter": {
+                    "input": not_processed_path,
+                    "cond": {"$not": [{"$in": ["$$this._id", {"$literal": link_ids}]}]}
+                }},
+                # Counters are incremented by the moved links only
+                "processed_count": {"$add": [{"$ifNull": ["$processed_count", 0]}, {"$size": "$_moved_links"}]},
+                "failed_count": {"$add": [{"$ifNull": ["$failed_count", 0]}, {"$size": {"$filter": {
+                    "input": "$_moved_links",
+                    "cond": {"$eq": ["$$this.execution_state.status", LinkStatusEnum.failed.value]}
+                }}}]},
+                "row_version": {"$add": ["$row_version", 1]},
+                "updated_at": datetime.now(UTC)
+            }},
+            {"$unset": "_moved_links"}
+        ]
+
+    async def backfill_link_counters(self) -> int:
+        """
+        Set the link counters (total_links, processed_count, failed_count) on simulations
+        stored before the counters existed. Runs on startup; a no-op once all are set.
+
+        Returns:
+            int: Number of backfilled simulations
+        """
+        processed_path = {"$ifNull": ["$links_execution_state.processed_links", []]}
+        try:
+            result = await self.collection.update_many(
+                {"total_links": {"$exists": False}},
+                [{"$set": {
+                    "total_links": {"$size": {"$ifNull": ["$topology.links", []]}},
+                    "processed_count": {"$size": processed_path},
+                    "failed_count": {"$size": {"$filter": {
+                        "input": processed_path,
+                        "cond": {"$eq": ["$$this.execution_state.status", LinkStatusEnum.failed.value]}
+                    }}}
+                }}]
+            )
+            if result.modified_count:
+                self.logger.info(f"Backfilled link counters of {result.modified_count} simulations")
+            return result.modified_count
+        except PyMongoError as e:
+            self.logger.error(f"Database error while backfilling link counters: {str(e)}")
+            raise DatabaseError(f"Failed to backfill link counters: {str(e)}") from e
+
     async def get_simulations_by_statuses(self, simulation_statuses: List[TopologyStatusEnum], link_statuses: List[LinkStatusEnum], cursor_pagination_request: CursorPaginationRequest, session=None) -> CursorPaginationResponse[TopologySimulation]:
         """
         Retrieve simulations filtered by their simulation status.
@@ -171,6 +420,60 @@ class TopologiesSimulationsDB:
         }   
         return await self._cursor_paginate(query, cursor_pagination_request, session=session)
     
+    async def get_simulations_docs_by_ids(self, simulation_ids: List[str], projection: Optional[dict] = None, session=None) -> List[dict]:
+        """
+        Retrieve raw simulation documents by their IDs, optionally projected to a subset of fields.
+        Used by batch code paths that only need a few fields and skip model validation.
+
+        Args:
+            simulation_ids: List of simulation IDs to retrieve
+            projection: Optional MongoDB projection
+            session: MongoDB session for transaction support
+
+        Returns:
+            List of simulation documents (missing IDs are skipped)
+
+        Raises:
+            DatabaseError: If a database operation fails
+        """
+        if not simulation_ids:
+            return []
+        try:
+            cursor = self.collection.find({"_id": {"$in": simulation_ids}}, projection, session=session)
+            return await cursor.to_list(length=len(simulation_ids))
+        except PyMongoError as e:
+            self.logger.error(f"Database error while fetching simulations documents by ids: {str(e)}")
+            raise DatabaseError(f"Failed to fetch simulations: {str(e)}") from e
+
+    async def get_topology_simulations_by_ids(self, simulation_ids: List[str], projection: Optional[dict] = None, session=None) -> List[TopologySimulation]:
+        """
+        Retrieve multiple TopologySimulation objects by their IDs with one query.
+
+        Args:
+            simulation_ids: List of simulation IDs to retrieve
+            projection: Optional MongoDB projection; it must keep the fields TopologySimulation requires
+            session: MongoDB session for transaction support
+
+        Returns:
+            List of TopologySimulation objects (missing IDs are skipped)
+
+        Raises:
+            DatabaseError: If a database operation fails
+            ValidationError: If the data is invalid
+        """
+        if not simulation_ids:
+            return []
+        try:
+            cursor = self.collection.find({"_id": {"$in": simulation_ids}}, projection, session=session)
+            docs = await cursor.to_list(length=len(simulation_ids))
+            return TOPOLOGY_SIMULATIONS_ADAPTER.validate_python(docs)
+        except PyMongoError as e:
+            self.logger.error(f"Database error while fetching simulations by ids: {str(e)}")
+            raise DatabaseError(f"Failed to fetch simulations: {str(e)}") from e
+        except Exception as e:
+            self.logger.error(f"Unexpected error while fetching simulations by ids: {str(e)}")
+            raise ValidationError(f"Invalid simulation data: {str(e)}") from e
+
     async def get_simulations_by_ids_and_status(self, simulation_ids: List[str], simulation_statuses: List[TopologyStatusEnum], limit: int = 100, session=None) -> List[TopologySimulation]:
         """
         Retrieve multiple TopologySimulation objects from the database based on their IDs and status.
@@ -200,7 +503,7 @@ class TopologiesSimulationsDB:
             if not docs:
                 self.logger.warning(f"No simulations found for ids: {simulation_ids} and statuses: {simulation_statuses}")
                 return []
-            return TypeAdapter(List[TopologySimulation]).validate_python(docs)
+            return TOPOLOGY_SIMULATIONS_ADAPTER.validate_python(docs)
         except PyMongoError as e:
             self.logger.error(f"Database error while fetching simulations by ids and status: {str(e)}")
             raise DatabaseError(f"Failed to fetch simulations: {str(e)}") from e
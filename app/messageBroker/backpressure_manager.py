@@ -138,12 +138,13 @@ class BackpressureManager:
             
         return min(delay, self.MAX_DELAY)
 
-    async def apply_backpressure(self) -> None:
+    async def apply_backpressure(self, skip_base_delay: bool = False) -> None:
         """
         Apply backpressure by calculating and waiting for the appropriate delay.
         
         Args:
-            queue_name: Name of the queue to monitor for backpressure
+            skip_base_delay: Only wait when the queue is loaded (delay above BASE_DELAY).
+                Used by event-driven producers that do not need a polling interval.
         """
         delay = await self.calculate_delay(self.consumer_queue_name)
         
@@ -152,6 +153,8 @@ class BackpressureManager:
             self.total_delays += 1
             self.total_delay_time += delay
             self.last_backpressure_time = datetime.utcnow()
+        elif skip_base_delay:
+            return
             
         await asyncio.sleep(delay)
 
@@ -0,0 +1,106 @@
+"""
+Message body codecs, selected by the AMQP content_type.
+
+Producers encode with the codec of `MESSAGE_CONTENT_TYPE`; consumers decode with the codec of each
+message's content_type, so messages of either format are consumed while producers are switched over.
+
+- application/json: orjson when installed, the standard library json module otherwise
+- application/msgpack: msgpack, which must be installed to be used
+"""
+import datetime
+import json
+from abc import ABC, abstractmethod
+from typing import Any, Dict, Optional
+from pydantic import BaseModel
+
+try:
+    import orjson
+except ImportError:  # optional, falls back to json
+    orjson = None
+
+try:
+    import msgpack
+except ImportError:  # optional, only needed for application/msgpack
+    msgpack = None
+
+JSON_CONTENT_TYPE = "application/json"
+MSGPACK_CONTENT_TYPE = "application/msgpack"
+
+
+def _default(obj: Any) -> Any:
+    """Fallback for values the encoders do not support natively (e.g. ObjectId)."""
+    if isinstance(obj, (datetime.datetime, datetime.date)):
+        return obj.isoformat()
+    return str(obj)
+
+
+def _to_primitive(obj: Any) -> Any:
+    if isinstance(obj, BaseModel):
+        return obj.model_dump(mode="json", by_alias=True)
+    return obj
+
+
+class MessageCodec(ABC):
+    content_type: str
+
+    @abstractmethod
+    def encode(self, obj: Any) -> bytes:
+        """Encode a model or a plain object (dicts, lists, scalars) to a message body."""
+        pass
+
+    @abstractmethod
+    def decode(self, body: bytes) -> Any:
+        """Decode a message body to plain objects."""
+        pass
+
+
+class JsonCodec(MessageCodec):
+    content_type = JSON_CONTENT_TYPE
+
+    def encode(self, obj: Any) -> bytes:
+        if isinstance(obj, BaseModel):
+            return obj.model_dump_json(by_alias=True).encode()
+        if orjson is not None:
+            return orjson.dumps(obj, default=_default, option=orjson.OPT_NON_STR_KEYS)
+        return json.dumps(obj, default=_default).encode()
+
+    def decode(self, body: bytes) -> Any:
+        if orjson is not None:
+            return orjson.loads(body)
+        return json.loads(body.decode())
+
+
+class MsgpackCodec(MessageCodec):
+    content_type = MSGPACK_CONTENT_TYPE
+
+    def __init__(self):
+        if msgpack is None:
+            raise ImportError("msgpack is required for the application/msgpack content type")
+
+    def encode(self, obj: Any) -> bytes:
+        return msgpack.packb(_to_primitive(obj), default=_default, use_bin_type=True)
+
+    def decode(self, body: bytes) -> Any:
+        return msgpack.unpackb(body, raw=False)
+
+
+CODECS = {
+    JSON_CONTENT_TYPE: JsonCodec,
+    MSGPACK_CONTENT_TYPE: MsgpackCodec,
+}
+_instances: Dict[str, MessageCodec] = {}
+
+
+def get_codec(content_type: Optional[str] = None) -> MessageCodec:
+    """
+    Get the codec of a content type; messages without one are JSON.
+
+    Raises:
+        ValueError: If the content type is not supported
+    """
+    content_type = (content_type or JSON_CONTENT_TYPE).split(";")[0].strip().lower()
+    if content_type not in _instances:
+        if content_type not in CODECS:
+            raise ValueError(f"Unsupported message content type: {content_type}")
+        _instances[content_type] = CODECS[content_type]()
+    return _instances[content_type]
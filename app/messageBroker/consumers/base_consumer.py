@@ -1,5 +1,4 @@
 import aio_pika
-import json
 from aiormq.exceptions import ChannelInvalidStateError
 import traceback
 import asyncio
@@ -10,6 +9,7 @@ from app.app_container import app_container
 from app.db.mongo_db_client import MongoDBConnectionManager
 from motor.motor_asyncio import AsyncIOMotorClient
 import random
+from app.messageBroker.codecs import get_codec
 
 class BaseConsumer:
     def __init__(
@@ -73,9 +73,11 @@ class BaseConsumer:
             raise e
 
     def _parse_message_body(self, message: aio_pika.IncomingMessage) -> Dict[str, Any]:
+        """Decode the message body with the codec of its content_type (JSON when it has none)."""
         try:
-            return json.loads(message.body.decode())
-        except json.JSONDecodeError as e:
+            return get_codec(message.content_type).decode(message.body)
+        except ValueError as e:
+            # json / orjson decode errors are ValueErrors, like unsupported content types
             self.logger.error(f"Failed to parse message body: {e}")
             raise ValueError(f"Invalid message format: {e}")
 
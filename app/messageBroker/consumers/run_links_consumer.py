@@ -1,8 +1,9 @@
 from app.messageBroker.consumers.base_consumer import BaseConsumer
 from app.business_logic.link_bl import LinkBusinessLogic  
+from app.business_logic.link_batch_bl import LinkBatchBusinessLogic
 from app.models.events_models import LinkEvent
+from app.utils.micro_batcher import MicroBatcher
 import aio_pika
-import json
 from app.app_container import app_container
 
 class LinksConsumer(BaseConsumer):
@@ -17,10 +18,22 @@ class LinksConsumer(BaseConsumer):
                          max_concurrent_tasks=self.config.LINKS_CONSUMER_MAX_CONCURRENT_TASKS,
                          message_timeout=self.config.MESSAGE_TIMEOUT)
         self.link_bl = LinkBusinessLogic(db)
+        self.links_batcher = None
+        if self.config.LINKS_BATCH_EXECUTOR_ENABLED:
+            # Messages wait in the batcher and are acked once their batch is written
+            self.links_batcher = MicroBatcher(
+                LinkBatchBusinessLogic(db).run_links,
+                max_size=self.config.LINKS_BATCH_SIZE,
+                window_ms=self.config.LINKS_BATCH_WINDOW_MS,
+                name='links_batcher'
+            )
 
     async def process_message(self, message: aio_pika.IncomingMessage):
         is_last_retry =  self._get_retry_count(message) >= self.max_retries
-        data = json.loads(message.body.decode())
+        data = self._parse_message_body(message)
         link_event = LinkEvent(**data)
         self.logger.info(f"Processing event: {link_event.event_id}")
-        await self.link_bl.run_link(link_event,is_last_retry)
\ No newline at end of file
+        if self.links_batcher:
+            await self.links_batcher.submit((link_event, is_last_retry))
+        else:
+            await self.link_bl.run_link(link_event,is_last_retry)
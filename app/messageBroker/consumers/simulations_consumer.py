@@ -1,12 +1,10 @@
 from app.messageBroker.consumers.base_consumer import BaseConsumer
 from app.business_logic.topologies_simulation_bl import TopologiesSimulationsBusinessLogic
-from app.models.events_models import SimulationEvent
 import aio_pika
-import json
 from app.models.statuses_enums import EventType
 from app.app_container import app_container
 from app.db.events_db import EventsDB
-from pydantic import TypeAdapter
+from app.models.adapters import SIMULATION_EVENT_ADAPTER
 class SimulationConsumer(BaseConsumer):
     def __init__(self, 
                  db, 
@@ -23,8 +21,8 @@ class SimulationConsumer(BaseConsumer):
         self.events_db = EventsDB(db)
 
     async def process_message(self, message: aio_pika.IncomingMessage):
-        data = json.loads(message.body.decode())
-        simulation_event = TypeAdapter(SimulationEvent).validate_python(data)
+        data = self._parse_message_body(message)
+        simulation_event = SIMULATION_EVENT_ADAPTER.validate_python(data)
         self.logger.info(f"Got new simulation event: {simulation_event.event_id}")
         async with await self.db.client.start_session() as session:
             async with session.start_transaction():
@@ -1,5 +1,6 @@
 import asyncio
-import json
+import os
+import socket
 import traceback
 from abc import ABC, abstractmethod
 from aio_pika import Message
@@ -7,21 +8,28 @@ from aiormq.exceptions import ChannelInvalidStateError
 from app.utils.logger import LoggerManager
 from app.db.events_db import EventsDB
 from app.messageBroker.rabbit_mq_manager import RabbitMQManager
+from app.messageBroker.codecs import get_codec
 from app.models.message_bus_models import OutboxPublisher
 from app.messageBroker.backpressure_manager import BackpressureManager
 from app.db.mongo_db_client import MongoDBConnectionManager
+from app.business_logic.exceptions import ChangeStreamUnavailableError
+from app.app_container import app_container
 from motor.motor_asyncio import AsyncIOMotorClient
 from typing import List, Dict, Any, Optional
 
 class BaseProducer(ABC):
     def __init__(self, rabbitmq_manager: RabbitMQManager, exchange_name: str, db: MongoDBConnectionManager, routing_queue: str):
         self.logger = LoggerManager.get_logger(self.__class__.__name__)
+        self.config = app_container.config()
         self.rabbitmq_manager = rabbitmq_manager
         self.exchange_name = exchange_name
         self.db: AsyncIOMotorClient = db
         self.outbox_publisher: OutboxPublisher = None
         self.events_db = EventsDB(db)
         self.routing_queue = routing_queue
+        self.codec = get_codec(self.config.MESSAGE_CONTENT_TYPE)
+        # Unique per replica, used as the outbox lease owner
+        self.lease_owner = f"{socket.gethostname()}:{os.getpid()}:{self.__class__.__name__}"
         # Initialize backpressure manager
         self.backpressure_manager = BackpressureManager(
             rabbitmq_manager=self.rabbitmq_manager,
@@ -38,19 +46,12 @@ class BaseProducer(ABC):
         """Returns the filter for finding unhandled and unpublished events."""
         pass
 
-    def _serialize(self, obj):
-        """Serialize an object to JSON format."""
-        import datetime
-        def default(o):
-            if isinstance(o, (datetime.datetime, datetime.date)):
-                return o.isoformat()
-            return str(o)
+    def _serialize(self, obj) -> bytes:
+        """Serialize an object with the codec of MESSAGE_CONTENT_TYPE."""
         try:
-            if hasattr(obj, 'model_dump'):
-                obj = obj.model_dump()
-            return json.dumps(obj, default=default)
+            return self.codec.encode(obj)
         except Exception as e:
-            self.logger.error(f"Error serializing object to JSON: {e}\n{traceback.format_exc()}")
+            self.logger.error(f"Error serializing object to {self.codec.content_type}: {e}\n{traceback.format_exc()}")
             raise e
     
     def _create_message(self, event):
@@ -58,8 +59,8 @@ class BaseProducer(ABC):
         try:
             body = self._serialize(event)
             message = Message(
-                body=body.encode(),
-                content_type="application/json",
+                body=body,
+                content_type=self.codec.content_type,
                 delivery_mode=2,  # PERSISTENT
             )
             return message
@@ -110,7 +111,10 @@ class BaseProducer(ABC):
             return 0
 
         self.logger.info(f"Publishing {len(events)} events.")
-        
+
+        if self.config.OUTBOX_LEASE_ENABLED:
+            return await self._publish_and_update_claimed_events(events, routing_key)
+
         try:
             # First update the events as published in MongoDB
             event_ids = [event['_id'] for event in events if event.get('_id')]
@@ -130,26 +134,94 @@ class BaseProducer(ABC):
             self.logger.error(f"Failed to publish and update events: {e}")
             raise e
 
+    async def _publish_and_update_claimed_events(self, events: List[dict], routing_key: str) -> int:
+        """
+        Publish events claimed by this producer, then mark them as published.
+        The lease keeps other replicas away meanwhile; if the publish fails the leases are
+        released, and if this producer dies they expire, so events are never left stuck
+        (at-least-once delivery).
+        """
+        event_ids = [event['_id'] for event in events if event.get('_id')]
+        try:
+            await self._publish_messages(events, routing_key=routing_key)
+        except Exception as e:
+            await self.events_db.release_events(event_ids, self.lease_owner)
+            self.logger.error(f"Failed to publish events to RabbitMQ: {e}")
+            raise e
+
+        updated_count = await self.events_db.update_events_published(event_ids)
+        self.logger.info(f"Published and marked {updated_count} events as handled.")
+        return updated_count
+
+    async def _claim_events(self, filter: dict, limit: int) -> List[dict]:
+        """
+        Claim events matching a filter and run them through _filter_events.
+        Claimed events that are filtered out are released right away.
+        """
+        events = await self.events_db.claim_events(
+            filter,
+            owner=self.lease_owner,
+            lease_ttl=self.config.OUTBOX_LEASE_TTL_SEC,
+            limit=limit
+        )
+        if not events:
+            return []
+        filtered_events = await self._filter_events(events)
+        kept_ids = {event['_id'] for event in filtered_events}
+        await self.events_db.release_events(
+            [event['_id'] for event in events if event['_id'] not in kept_ids],
+            self.lease_owner
+        )
+        return filtered_events
+
     async def _log_backpressure_stats(self, updated_count: int):
         """Log backpressure statistics if events were published."""
         if updated_count > 0:
             stats = self.backpressure_manager.get_statistics()
             self.logger.info(f"Backpressure statistics: {stats}")
 
+    async def _filter_events(self, events: List[dict]) -> List[dict]:
+        """
+        Hook to filter fetched events before publishing.
+        Both the polling and the change stream paths go through it.
+        """
+        return events
+
     async def _fetch_events(self) -> List[dict]:
-        """Fetch events based on the producer's filter."""
-        return await self.events_db.find_events_by_filter(
+        """Fetch events based on the producer's filter (claimed ones when leases are enabled)."""
+        if self.config.OUTBOX_LEASE_ENABLED:
+            return await self._claim_events(self._get_event_filter(), self.outbox_publisher.batch_size_events_query)
+        events = await self.events_db.find_events_by_filter(
             self._get_event_filter(),
             limit=self.outbox_publisher.batch_size_events_query
         )
+        if not events:
+            return []
+        return await self._filter_events(events)
 
-    async def run_outbox_producer(self):
+    async def _refresh_events(self, inserted_events: List[dict]) -> List[dict]:
         """
-        Base implementation of the outbox producer loop.
-        Handles fetching, publishing, and updating events with backpressure.
+        Re-read events received from the change stream, keeping only the ones that still
+        match the producer's filter (e.g. not published meanwhile, or replayed after a resume).
+        """
+        event_ids = [event['_id'] for event in inserted_events if event.get('_id')]
+        if self.config.OUTBOX_LEASE_ENABLED:
+            return await self._claim_events({"$and": [{"_id": {"$in": event_ids}}, self._get_event_filter()]}, len(event_ids))
+        events = await self.events_db.find_events_by_ids(event_ids, self._get_event_filter())
+        if not events:
+            return []
+        return await self._filter_events(events)
+
+    async def _publish_batch(self, events: List[dict]) -> int:
+        """Publish a batch of fetched events and log backpressure statistics."""
+        updated_count = await self._publish_and_update_events(events, self.routing_queue)
+        await self._log_backpressure_stats(updated_count)
+        return updated_count
+
+    async def _run_polling_producer(self):
+        """
+        Polling outbox loop: query the outbox every retry_delay seconds.
         """
-        await asyncio.sleep(self.outbox_publisher.initial_delay)
-        
         while True:
             try:
                 # Apply backpressure
@@ -159,11 +231,61 @@ class BaseProducer(ABC):
                 events = await self._fetch_events()
                 
                 # Publish and update events
-                updated_count = await self._publish_and_update_events(events, self.routing_queue)
-                await self._log_backpressure_stats(updated_count)
+                await self._publish_batch(events)
 
                 await asyncio.sleep(self.outbox_publisher.retry_delay)
 
             except Exception as e:
                 self.logger.error(f"Error in publish_new_events_batch: {e}\n{traceback.format_exc()}")
-                raise e
\ No newline at end of file
+                raise e
+
+    async def _run_change_stream_producer(self):
+        """
+        Change stream outbox loop: publish events as soon as they are inserted.
+        A polling pass still runs on start and every OUTBOX_FALLBACK_POLL_INTERVAL seconds,
+        to pick up events that were skipped by _filter_events (e.g. links of a paused
+        simulation) or inserted before the stream was opened.
+        """
+        loop = asyncio.get_running_loop()
+        last_poll_time = None
+        async for inserted_events in self.events_db.watch_events(
+            self._get_event_filter(),
+            resume_token_key=self.__class__.__name__,
+            batch_size=self.outbox_publisher.batch_size_events_query,
+            max_await_time_ms=self.config.OUTBOX_CHANGE_STREAM_MAX_AWAIT_MS
+        ):
+            try:
+                poll_due = last_poll_time is None or loop.time() - last_poll_time >= self.config.OUTBOX_FALLBACK_POLL_INTERVAL
+                if not inserted_events and not poll_due:
+                    continue
+
+                await self.backpressure_manager.apply_backpressure(skip_base_delay=True)
+                events = await self._refresh_events(inserted_events) if inserted_events else []
+                if poll_due:
+                    known_ids = {event['_id'] for event in events}
+                    events.extend(event for event in await self._fetch_events() if event['_id'] not in known_ids)
+                    last_poll_time = loop.time()
+
+                await self._publish_batch(events)
+
+            except Exception as e:
+                self.logger.error(f"Error in publish_new_events_batch: {e}\n{traceback.format_exc()}")
+                raise e
+
+    async def run_outbox_producer(self):
+        """
+        Base implementation of the outbox producer loop.
+        Handles fetching, publishing, and updating events with backpressure.
+        Uses a change stream on the outbox when OUTBOX_CHANGE_STREAM_ENABLED is set,
+        and falls back to polling when the deployment does not support change streams.
+        """
+        await asyncio.sleep(self.outbox_publisher.initial_delay)
+
+        if self.config.OUTBOX_CHANGE_STREAM_ENABLED:
+            try:
+                await self._run_change_stream_producer()
+                return
+            except ChangeStreamUnavailableError as e:
+                self.logger.warning(f"Falling back to polling outbox producer: {e}")
+
+        await self._run_polling_producer()
@@ -63,16 +63,11 @@ class LinksProducer(BaseProducer):
             if sim_id in running_sim_ids
         ]
 
-    async def _fetch_events(self) -> List[dict]:
+    async def _filter_events(self, events: List[dict]) -> List[dict]:
         """
-        Fetches events and filters them to only include those from running simulations.
+        Filters fetched events to only include those from running simulations.
         Returns an empty list if no valid events are found.
         """
-        # Get new events
-        events = await super()._fetch_events()
-        if not events:
-            return []
-
         # Group events by simulation
         events_by_simulation = await self._group_events_by_simulation(events)
 
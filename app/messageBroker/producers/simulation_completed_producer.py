@@ -2,17 +2,40 @@ from app.messageBroker.producers.base_producer import BaseProducer
 from app.models.events_models import LinkEvent
 from app.models.statuses_enums import EventType
 from app.business_logic.topologies_simulation_bl import TopologiesSimulationsBusinessLogic
-from app.models.pageination_models import CursorPaginationRequest
 from app.models.mapper import SimulationMapper
-import asyncio
-from app.models.topolgy_simulation_models import TopologySimulation
-from typing import List, Set, Dict
+from typing import List, Dict
 from app.app_container import app_container
-import traceback
 from app.models.message_bus_models import OutboxPublisher
 from app.db.topologies_simulations_db import TopologiesSimulationsDB
 from app.models.events_models import SimulationEvent
-
+from app.models.adapters import LINKS_ADAPTER
+
+# The simulation fields of the SIMULATION_UPDATED / SIMULATION_COMPLETED snapshots: all but the topology
+# links, which are not read by the consumers (the links and their execution state are all in
+# links_execution_state), so the snapshot topology has no links.
+SIMULATION_LINKS_PROJECTION = {
+    "row_version": 1,
+    "status": 1,
+    "total_links": 1,
+    "processed_count": 1,
+    "failed_count": 1,
+    "simulation_time": 1,
+    "links_execution_state": 1,
+    "created_at": 1,
+    "updated_at": 1,
+    "topology._id": 1,
+    "topology.nodes": 1,
+    "topology.config": 1,
+    "topology.links_storage": 1,
+    "topology.created_at": 1,
+    "topology.updated_at": 1,
+    "topology.links": {"$literal": []},
+}
+# With EVENT_DELTAS_ENABLED only the ids of the not processed links are read
+SIMULATION_DELTA_PROJECTION = {
+    "row_version": 1,
+    "links_execution_state.not_processed_links._id": 1,
+}
 class SimulationCompletedProducer(BaseProducer):
     def __init__(self, db, rabbitmq_manager, exchange_name):
         super().__init__(rabbitmq_manager, exchange_name, db, app_container.config().SIMULATION_QUEUE)
@@ -27,81 +50,18 @@ class SimulationCompletedProducer(BaseProducer):
         self.outbox_publisher = OutboxPublisher(
             initial_delay=self.config.INITIAL_DELAY,
             max_retries=self.config.MAX_RETRIES,
-            retry_delay=self.config.RETRY_DELAY,
+            retry_delay=self.config.COMPLETED_PRODUCER_POLL_DELAY,
             batch_size_events_query=self.config.PAGE_SIZE,
             max_messages_to_publish=self.config.MAX_SIMULATIONS_IN_PARALLEL_COMPLETED_PRODUCER
         )
 
     def _get_event_filter(self) -> dict:
-        """Returns the filter for finding unhandled and unpublished simulation completion events."""
+        """Returns the filter for finding unpublished link completion events."""
         return {
-            "is_handled": True,
-            "published": False,
-            "event_type": EventType.LINK_RUN.value
+            "event_type": EventType.LINK_COMPLETED.value,
+            "published": False
         }
 
-    async def _get_completed_simulations(self) -> List[TopologySimulation]:
-        """Fetch completed simulations from the database."""
-        return await self.topologies_simulations_bl.find_completed_simulations(
-            CursorPaginationRequest(page=1, page_size=self.outbox_publisher.batch_size_events_query)
-        )
-
-    async def _get_existing_completed_sim_ids(self, sim_ids: List[str]) -> Set[str]:
-        """Get set of simulation IDs that already have completed events."""
-        existing_events = await self.events_db.find_events_by_filter({
-            "event_type": EventType.SIMULATION_COMPLETED,
-            "after._id": {"$in": sim_ids}
-        }, limit=100)
-
-        return {
-            event["after"]["_id"]
-            for event in existing_events
-            if event.get("after") and event["after"].get("_id")
-        }
-
-    async def filter_published_simulations(self, simulations: List[TopologySimulation]) -> List[TopologySimulation]:
-        """
-        Filter out simulations that already have completed events.
-        Returns a list of simulations that need completion events.
-        """
-        if not simulations:
-            return []
-
-        sim_ids = [sim.sim_id for sim in simulations]
-        existing_sim_ids = await self._get_existing_completed_sim_ids(sim_ids)
-        
-        return [sim for sim in simulations if sim.sim_id not in existing_sim_ids]
-
-    async def _process_completed_simulations(self, simulations: List[TopologySimulation]) -> int:
-        """
-        Process completed simulations by converting them to events and storing them.
-        Returns the number of events processed.
-        """
-        if not simulations:
-            return 0
-
-        self.logger.info(f"Processing {len(simulations)} completed simulations.")
-        completed_simulations = SimulationMapper.simulations_to_events(
-            simulations, 
-            EventType.SIMULATION_COMPLETED
-        )
-        await self.events_db.store_events(completed_simulations)
-        return len(completed_simulations)
-
-
-    async def _fetch_events(self) -> List[dict]:
-        """
-        Override base class method to handle simulation completion specific logic.
-        Instead of fetching events, it processes completed simulations.
-        """
-        # Return the newly created events
-        return await self.events_db.find_events_by_filter({
-            "$and": [
-                {"event_type": EventType.LINK_COMPLETED.value},
-                {"published": False}
-            ]
-        }, limit=self.outbox_publisher.batch_size_events_query)
-
     def _group_events_by_simulation(self, events: List[dict]) -> Dict[str, List[dict]]:
         """
         Groups events by their simulation ID.
@@ -147,9 +107,8 @@ class SimulationCompletedProducer(BaseProducer):
                         event.published = True
                     await self.events_db.store_events(simulations_to_publish, session=session)
                     
-                    # Publish the messages
-                    publish_events = [event.model_dump(by_alias=True) for event in simulations_to_publish]
-                    await self._publish_messages(publish_events, routing_key=routing_key)
+                    # Publish the models, serialized by the codec (model_dump_json for JSON)
+                    await self._publish_messages(simulations_to_publish, routing_key=routing_key)
                     
                     self.logger.info(f"Published and marked {updated_count} events as handled.")
                     return updated_count
@@ -158,60 +117,85 @@ class SimulationCompletedProducer(BaseProducer):
             self.logger.error(f"Failed to publish events to RabbitMQ: {e}")
             raise e
 
-    async def run_outbox_producer(self):
+    async def _build_delta_events(self, events_by_simulation: Dict[str, List[dict]]) -> List[SimulationEvent]:
         """
-        Base implementation of the outbox producer loop.
-        Handles fetching, publishing, and updating events with backpressure.
+        Build a delta SIMULATION_UPDATED / SIMULATION_COMPLETED event per simulation, carrying only its newly
+        completed links. A simulation is completed when no other link is left in its not processed links.
         """
-        await asyncio.sleep(self.outbox_publisher.initial_delay)
-        
-        while True:
-            try:
-                # Apply backpressure
-                await self.backpressure_manager.apply_backpressure()
-                
-                # Fetch events
-                events = await self._fetch_events()
-                if not events:
-                    self.logger.info("No events to publish.")
-                    await asyncio.sleep(20)
-                    continue
-
-                events_by_simulation = self._group_events_by_simulation(events)
-
-                updated_simulations = []
-                completed_simulations = []
-                for simulation_id in events_by_simulation.keys():
-                    simulation = await self.topologies_simulations_db.get_topology_simulation(simulation_id)
-                    if simulation is None:
-                        self.logger.error(f"Simulation {simulation_id} not found")
-                        continue
-                    new_completed_links = [event['after'] for event in events_by_simulation[simulation_id] if event.get('after')]
-                    simulation.links_execution_state.move_links_to_processed(new_completed_links)      
-                    if len(simulation.links_execution_state.not_processed_links) == 0:
-                        completed_simulations.append(simulation)
-                    else:
-                        updated_simulations.append(simulation)
-                completed_simulations_events = []
-                updated_simulations_events = []
-                
-                if completed_simulations:
-                    completed_simulations_events = SimulationMapper.simulations_to_events(
-                        completed_simulations, 
-                        EventType.SIMULATION_COMPLETED
-                    )
-                if updated_simulations:
-                    updated_simulations_events = SimulationMapper.simulations_to_events(
-                        updated_simulations, 
-                        EventType.SIMULATION_UPDATED
-                    )
-                simulations_to_publish = completed_simulations_events + updated_simulations_events
-                # Publish and update events
-                updated_count = await self._publish_and_update_events(events, simulations_to_publish, self.routing_queue)
-                await self._log_backpressure_stats(updated_count)
+        docs = await self.topologies_simulations_db.get_simulations_docs_by_ids(
+            list(events_by_simulation.keys()),
+            projection=SIMULATION_DELTA_PROJECTION
+        )
+        docs_by_id = {doc["_id"]: doc for doc in docs}
+
+        simulation_events = []
+        for simulation_id, link_events in events_by_simulation.items():
+            doc = docs_by_id.get(simulation_id)
+            if doc is None:
+                self.logger.error(f"Simulation {simulation_id} not found")
+                continue
+            completed_links = LINKS_ADAPTER.validate_python([event['after'] for event in link_events if event.get('after')])
+            completed_ids = {link.id for link in completed_links}
+            not_processed_links = doc.get("links_execution_state", {}).get("not_processed_links", [])
+            is_completed = all(link.get("_id") in completed_ids for link in not_processed_links)
+            simulation_events.append(SimulationMapper.simulation_to_delta_event(
+                simulation_id,
+                doc.get("row_version"),
+                EventType.SIMULATION_COMPLETED if is_completed else EventType.SIMULATION_UPDATED,
+                completed_links
+            ))
+        return simulation_events
+
+    async def _publish_batch(self, events: List[dict]) -> int:
+        """
+        Move the completed links of each simulation to processed and publish
+        SIMULATION_UPDATED / SIMULATION_COMPLETED events for them.
+        """
+        if not events:
+            self.logger.info("No events to publish.")
+            return 0
 
-                await asyncio.sleep(20)
+        events_by_simulation = self._group_events_by_simulation(events)
+        if self.config.EVENT_DELTAS_ENABLED:
+            simulations_to_publish = await self._build_delta_events(events_by_simulation)
+            updated_count = await self._publish_and_update_events(events, simulations_to_publish, self.routing_queue)
+            await self._log_backpressure_stats(updated_count)
+            return updated_count
 
-            except Exception as e:
-                self.logger.error(f"Error in publish_new_events_batch: {e}\n{traceback.format_exc()}")
-                raise e
\ No newline at end of file
+        simulations = await self.topologies_simulations_db.get_topology_simulations_by_ids(
+            list(events_by_simulation.keys()),
+            projection=SIMULATION_LINKS_PROJECTION
+        )
+        simulations_by_id = {simulation.sim_id: simulation for simulation in simulations}
+
+        updated_simulations = []
+        completed_simulations = []
+        for simulation_id, simulation_events in events_by_simulation.items():
+            simulation = simulations_by_id.get(simulation_id)
+            if simulation is None:
+                self.logger.error(f"Simulation {simulation_id} not found")
+                continue
+            new_completed_links = [event['after'] for event in simulation_events if event.get('after')]
+            simulation.links_execution_state.move_links_to_processed(new_completed_links)
+            if len(simulation.links_execution_state.not_processed_links) == 0:
+                completed_simulations.append(simulation)
+            else:
+                updated_simulations.append(simulation)
+        completed_simulations_events = []
+        updated_simulations_events = []
+        
+        if completed_simulations:
+            completed_simulations_events = SimulationMapper.simulations_to_events(
+                completed_simulations, 
+                EventType.SIMULATION_COMPLETED
+            )
+        if updated_simulations:
+            updated_simulations_events = SimulationMapper.simulations_to_events(
+                updated_simulations, 
+                EventType.SIMULATION_UPDATED
+            )
+        simulations_to_publish = completed_simulations_events + updated_simulations_events
+        # Publish and update events
+        updated_count = await self._publish_and_update_events(events, simulations_to_publish, self.routing_queue)
+        await self._log_backpressure_stats(updated_count)
+        return updated_count
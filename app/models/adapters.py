@@ -0,0 +1,16 @@
+"""
+Prebuilt pydantic TypeAdapters for the models decoded on hot paths.
+
+Building a TypeAdapter builds its validation schema (about 0.1ms for List[TopologySimulation]),
+so adapters are created once here and reused instead of per call.
+"""
+from typing import List
+from pydantic import TypeAdapter
+from app.models.events_models import SimulationEvent
+from app.models.topolgy_models import Link
+from app.models.topolgy_simulation_models import TopologySimulation
+
+TOPOLOGY_SIMULATION_ADAPTER = TypeAdapter(TopologySimulation)
+TOPOLOGY_SIMULATIONS_ADAPTER = TypeAdapter(List[TopologySimulation])
+SIMULATION_EVENT_ADAPTER = TypeAdapter(SimulationEvent)
+LINKS_ADAPTER = TypeAdapter(List[Link])
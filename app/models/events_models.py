@@ -1,16 +1,36 @@
-from pydantic import BaseModel, Field
+from pydantic import BaseModel, Field, model_validator
 from datetime import datetime
 from app.models.statuses_enums import EventType
-from typing import TypeVar, Generic, Optional
+from typing import TypeVar, Generic, Optional, Any, List, Literal
 from app.models.topolgy_simulation_models import TopologySimulation
 from app.models.topolgy_models import Link
 T = TypeVar('T', bound=BaseModel)
 
+# Schema versions of events:
+#   1: 'before' / 'after' snapshots of the whole entity
+#   2: delta events, carrying only the changes ('delta') and the row_version they were built from
+SNAPSHOT_SCHEMA_VERSION = 1
+DELTA_SCHEMA_VERSION = 2
+PROCESSED_LINKS_PATH = "links_execution_state.processed_links"
+
+class DeltaOperation(BaseModel):
+    """
+    A JSON-patch-like change of a simulation document.
+    Operations:
+        - replace: set the dotted field 'path' to 'value'
+        - add: append the links in 'value' to 'links_execution_state.processed_links'
+          (PROCESSED_LINKS_PATH, moving them out of not_processed_links); the only supported 'add' path
+    """
+    op: Literal["replace", "add"]
+    path: str
+    value: Any = None
+
 class BaseEvent(BaseModel, Generic[T]):
     """
     Represents an event in the simulation.
     """
     event_id: Optional[str] = Field(None, alias="_id")
+    schema_version: int = SNAPSHOT_SCHEMA_VERSION
     event_type: EventType
     before: Optional[T] = None
     after: T
@@ -22,7 +42,20 @@ class BaseEvent(BaseModel, Generic[T]):
     updated_at: datetime = Field(default_factory=datetime.now)
     
 class SimulationEvent(BaseEvent[TopologySimulation]):
-    pass
+    """
+    Simulation event. Snapshot events carry the simulation in 'after' (required); delta events
+    (DELTA_SCHEMA_VERSION) carry only 'sim_id', 'row_version' and 'delta'.
+    """
+    after: Optional[TopologySimulation] = None
+    sim_id: Optional[str] = None
+    row_version: Optional[int] = None
+    delta: Optional[List[DeltaOperation]] = None
+
+    @model_validator(mode="after")
+    def check_snapshot_after(self) -> "SimulationEvent":
+        if self.schema_version == SNAPSHOT_SCHEMA_VERSION and self.after is None:
+            raise ValueError("'after' is required for snapshot simulation events")
+        return self
 
 class LinkEvent(BaseEvent[Link]):
     sim_id: str
\ No newline at end of file
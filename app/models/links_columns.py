@@ -0,0 +1,146 @@
+"""
+Columnar representation of links.
+
+`LinksColumns` holds a list of links as interned node ids plus parallel NumPy columns
+(from, to, latency, status, retry count) instead of one `Link` model per link, and converts
+to and from a single BSON binary value. Decoding does not copy the columns: they are NumPy
+views over the binary.
+
+Binary layout (little endian):
+    header:  magic b"LNKC", version, nodes count, links count, nodes blob size, ids blob size (uint32 each)
+    columns: from_node, to_node, latency (int32), retry_count (int16), status (int8)
+    strings: node names and link ids, NUL-separated UTF-8
+
+Execution start/end times are not part of the columnar form; links decoded from it carry
+their status and retry count only.
+
+It is a storage encoding: chunked topology links are stored in it (TOPOLOGY_LINKS_CHUNK_ENCODING
+'columnar') and decoded back to `Link` models by `TopologiesDB`, so the simulations and the
+link consumers still hold one `Link` per link in memory.
+"""
+import struct
+import numpy as np
+from typing import Dict, List, Optional, Sequence
+from bson.binary import Binary
+from app.models.statuses_enums import LinkStatusEnum
+from app.models.topolgy_models import Link, LinkExecutionState
+
+MAGIC = b"LNKC"
+VERSION = 1
+HEADER = struct.Struct("<4s5I")
+
+# Status column codes; NO_EXECUTION_STATE marks links without an execution state
+STATUSES: List[LinkStatusEnum] = list(LinkStatusEnum)
+STATUS_CODES: Dict[LinkStatusEnum, int] = {status: code for code, status in enumerate(STATUSES)}
+NO_EXECUTION_STATE = -1
+
+
+class LinksColumns:
+    """
+    Links stored as columns.
+
+    Attributes:
+        nodes: Interned node names; from_node / to_node hold indexes into it
+        ids: Link ids
+        from_node, to_node, latency: int32 columns
+        retry_count: int16 column
+        status: int8 column of STATUS_CODES (NO_EXECUTION_STATE when the link has none)
+    """
+    def __init__(self, nodes: List[str], ids: List[str], from_node: np.ndarray, to_node: np.ndarray,
+                 latency: np.ndarray, retry_count: np.ndarray, status: np.ndarray):
+        self.nodes = nodes
+        self.ids = ids
+        self.from_node = from_node
+        self.to_node = to_node
+        self.latency = latency
+        self.retry_count = retry_count
+        self.status = status
+
+    def __len__(self) -> int:
+        return len(self.ids)
+
+    @classmethod
+    def from_links(cls, links: Sequence[Link], nodes: Optional[Sequence[str]] = None) -> "LinksColumns":
+        """
+        Build the columns of 'links'. Node ids follow the order of 'nodes' when given
+        (e.g. the topology nodes); nodes only referenced by links are appended.
+        """
+        node_ids: Dict[str, int] = {node: index for index, node in enumerate(nodes or [])}
+        count = len(links)
+        from_node = np.fromiter((node_ids.setdefault(link.from_node, len(node_ids)) for link in links), dtype=np.int32, count=count)
+        to_node = np.fromiter((node_ids.setdefault(link.to_node, len(node_ids)) for link in links), dtype=np.int32, count=count)
+        latency = np.fromiter((link.latency for link in links), dtype=np.int32, count=count)
+        retry_count = np.fromiter(
+            (link.execution_state.retry_count if link.execution_state else 0 for link in links), dtype=np.int16, count=count
+        )
+        status = np.fromiter(
+            (STATUS_CODES[link.execution_state.status] if link.execution_state and link.execution_state.status else NO_EXECUTION_STATE
+             for link in links),
+            dtype=np.int8,
+            count=count
+        )
+        return cls(list(node_ids), [link.id or "" for link in links], from_node, to_node, latency, retry_count, status)
+
+    def to_links(self) -> List[Link]:
+        """Materialize the columns as Link models (without execution start/end times)."""
+        links = []
+        for link_id, from_node, to_node, latency, retry_count, status in zip(
+            self.ids, self.from_node.tolist(), self.to_node.tolist(), self.latency.tolist(),
+            self.retry_count.tolist(), self.status.tolist()
+        ):
+            execution_state = None
+            if status != NO_EXECUTION_STATE:
+                execution_state = LinkExecutionState.model_construct(
+                    start_time=None, end_time=None, retry_count=retry_count, status=STATUSES[status]
+                )
+            links.append(Link.model_construct(
+                id=link_id or None,
+                from_node=self.nodes[from_node],
+                to_node=self.nodes[to_node],
+                latency=latency,
+                execution_state=execution_state
+            ))
+        return links
+
+    def to_bson(self) -> Binary:
+        """Encode the columns as a BSON binary value."""
+        nodes_blob = "\0".join(self.nodes).encode()
+        ids_blob = "\0".join(self.ids).encode()
+        header = HEADER.pack(MAGIC, VERSION, len(self.nodes), len(self), len(nodes_blob), len(ids_blob))
+        return Binary(b"".join([
+            header,
+            self.from_node.astype("<i4", copy=False).tobytes(),
+            self.to_node.astype("<i4", copy=False).tobytes(),
+            self.latency.astype("<i4", copy=False).tobytes(),
+            self.retry_count.astype("<i2", copy=False).tobytes(),
+            self.status.astype("i1", copy=False).tobytes(),
+            nodes_blob,
+            ids_blob
+        ]))
+
+    @classmethod
+    def from_bson(cls, data: bytes) -> "LinksColumns":
+        """
+        Decode columns encoded by to_bson. The numeric columns are read-only views over 'data'.
+
+        Raises:
+            ValueError: If 'data' is not an encoded links columns value
+        """
+        buffer = memoryview(data)
+        if len(buffer) < HEADER.size:
+            raise ValueError("Invalid links columns: truncated header")
+        magic, version, nodes_count, count, nodes_size, ids_size = HEADER.unpack_from(buffer)
+        if magic != MAGIC or version != VERSION:
+            raise ValueError(f"Invalid links columns: magic {magic!r}, version {version}")
+
+        offset = HEADER.size
+        columns = {}
+        for name, dtype in (("from_node", "<i4"), ("to_node", "<i4"), ("latency", "<i4"), ("retry_count", "<i2"), ("status", "i1")):
+            columns[name] = np.frombuffer(buffer, dtype=dtype, count=count, offset=offset)
+            offset += columns[name].nbytes
+        nodes = bytes(buffer[offset:offset + nodes_size]).decode().split("\0") if nodes_count else []
+        offset += nodes_size
+        ids = bytes(buffer[offset:offset + ids_size]).decode().split("\0") if count else []
+        if len(nodes) != nodes_count or len(ids) != count:
+            raise ValueError("Invalid links columns: string tables do not match the header")
+        return cls(nodes, ids, **columns)
@@ -1,6 +1,6 @@
 from app.models.topolgy_simulation_models import TopologySimulation
 from app.models.requests_models import SimulationRequest
-from app.models.events_models import SimulationEvent, EventType
+from app.models.events_models import SimulationEvent, EventType, DeltaOperation, DELTA_SCHEMA_VERSION, PROCESSED_LINKS_PATH
 from typing import List
 from app.models.events_models import LinkEvent
 from bson import ObjectId
@@ -30,7 +30,8 @@ class SimulationMapper:
                 event = SimulationEvent(
                     event_type=event_type,
                     before=None,
-                    after=simulation
+                    after=simulation,
+                    sim_id=simulation.sim_id
                 )
                 event.event_id = str(ObjectId())
                 events.append(event)
@@ -38,11 +39,36 @@ class SimulationMapper:
         except Exception as e:
             raise MapperError(f"Failed to map simulations to events: {str(e)}") from e
     
+    @staticmethod
+    def simulation_to_delta_event(sim_id: str, row_version: int, event_type: EventType, completed_links: List[Link]) -> SimulationEvent:
+        """
+        Map completed links of a simulation to a delta event, which carries only the links instead of the simulation.
+        """
+        try:
+            delta = []
+            if completed_links:
+                delta.append(DeltaOperation(
+                    op="add",
+                    path=PROCESSED_LINKS_PATH,
+                    value=[link.model_dump(by_alias=True) for link in completed_links]
+                ))
+            event = SimulationEvent(
+                event_type=event_type,
+                schema_version=DELTA_SCHEMA_VERSION,
+                sim_id=sim_id,
+                row_version=row_version,
+                delta=delta
+            )
+            event.event_id = str(ObjectId())
+            return event
+        except Exception as e:
+            raise MapperError(f"Failed to map simulation delta to event: {str(e)}") from e
+
     @staticmethod
     def simulation_to_links_event(simulation: TopologySimulation) -> List[LinkEvent]:
         try:
             events = []
-            for link in simulation.topology.links:
+            for link in simulation.get_links():
                 event = LinkEvent(
                     event_type=EventType.LINK_RUN,
                     before=None,
@@ -26,6 +26,7 @@ class SimulationRequest(BaseModel):
             - duration_sec: Duration of simulation in seconds (default: 30)
             - packet_loss_percent: Packet loss percentage (default: 0.0)
             - log_level: Logging level (default: "warning")
+            - engine: "real_time" or "virtual_clock" (default: "real_time")
     
     Example:
         {
@@ -68,4 +69,13 @@ class SimulationRequest(BaseModel):
             "packet_loss_percent": 0.1,
             "log_level": "info"
         }
-    )
\ No newline at end of file
+    )
+
+class SimulationStatusesRequest(BaseModel):
+    """
+    Request model for getting the status of many simulations at once.
+
+    Fields:
+        sim_ids: IDs of the simulations (at most SIMULATION_STATUSES_MAX_IDS)
+    """
+    sim_ids: List[str] = Field(..., min_length=1, description="Simulation IDs", example=["6650c3f0a1b2c3d4e5f60718"])
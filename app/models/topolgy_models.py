@@ -26,6 +26,7 @@ class Link(BaseModel):
     latency: int
     execution_state: Optional[LinkExecutionState] = None
 
+
 class Config(BaseModel):
     """
     Configuration for a simulation run.
@@ -33,10 +34,14 @@ class Config(BaseModel):
         - duration_sec: Duration of the simulation in seconds (default: 30)
         - packet_loss_percent: Packet loss percentage (default: 0.0)
         - log_level: Logging level (default: 'warning')
+        - engine: Simulation engine (default: 'real_time')
+            - real_time: links are executed by the links consumers in wall-clock time
+            - virtual_clock: the simulation runs in-process on a virtual clock
     """
     duration_sec: int = 30
     packet_loss_percent: float = 0.0
     log_level: Literal["debug", "info", "warning", "error"] = "warning"
+    engine: Literal["real_time", "virtual_clock"] = "real_time"
 
 class Topology(BaseModel):
     """
@@ -44,11 +49,18 @@ class Topology(BaseModel):
     Fields:
         - nodes: List of node names
         - links: List of Link objects defining connections between nodes
+        - links_storage: Where the links are stored
+            - embedded: in the topology document
+            - chunked: in topology links chunk documents; 'links' is empty when read from the database
     """
     id: Optional[str] = Field(None, alias="_id")
     nodes: List[str]
     links: List[Link]
     config: Optional[Config] = None
+    links_storage: Literal["embedded", "chunked"] = "embedded"
     created_at: Optional[datetime] = None
     updated_at: Optional[datetime] = None
 
+    def get_link(self, link_id: str) -> Optional[Link]:
+        return next((link for link in self.links if link.id == link_id), None)
+
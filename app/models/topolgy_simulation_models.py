@@ -1,5 +1,5 @@
 from pydantic import BaseModel, Field
-from typing import Optional, Literal
+from typing import Optional, Literal, Union
 from app.models.topolgy_models import Topology
 from app.models.statuses_enums import TopologyStatusEnum
 from typing import List
@@ -9,24 +9,43 @@ from app.models.topolgy_models import Link
 
 
 class TopolgyLinksExecutionState(BaseModel):
+    """
+    Links of a simulation split by processing state.
+    Moves index the lists by link id once per call, so a batch of k links moves in O(n + k).
+    """
     not_processed_links: List[Link] = []
     processed_links: List[Link] = []
-    
-    def move_links_to_processed(self, links: List[Link]):
-        for link in links:
-            link_id = link.get('_id')
-            link_to_move = next((l for l in self.not_processed_links if l.id == link_id), None)
-            if link_to_move:
-                self.not_processed_links.remove(link_to_move)
-                self.processed_links.append(link)
-    
-    def move_links_to_not_processed(self, links: List[Link]):
+
+    def get_not_processed_link(self, link_id: str) -> Optional[Link]:
+        return next((link for link in self.not_processed_links if link.id == link_id), None)
+
+    def get_processed_link(self, link_id: str) -> Optional[Link]:
+        return next((link for link in self.processed_links if link.id == link_id), None)
+
+    def move_links_to_processed(self, links: List[Union[Link, dict]]):
+        self.not_processed_links, self.processed_links = self._move_links(links, self.not_processed_links, self.processed_links)
+
+    def move_links_to_not_processed(self, links: List[Union[Link, dict]]):
+        self.processed_links, self.not_processed_links = self._move_links(links, self.processed_links, self.not_processed_links)
+
+    @staticmethod
+    def _move_links(links: List[Union[Link, dict]], source: List[Link], target: List[Link]):
+        """
+        Move the given links (as Link or raw documents) that are in 'source' to the end of 'target'.
+        The given links replace the stored ones, as they carry the new execution state.
+        """
+        source_ids = {link.id for link in source}
+        moved = {}
         for link in links:
-            link_id = link.get('_id')
-            link_to_move = next((l for l in self.processed_links if l.get('_id') == link_id), None)
-            if link_to_move:
-                self.processed_links.remove(link_to_move)
-                self.not_processed_links.append(link)
+            link = link if isinstance(link, Link) else Link.model_validate(link)
+            if link.id in source_ids and link.id not in moved:
+                moved[link.id] = link
+        if not moved:
+            return source, target
+
+        remaining = [link for link in source if link.id not in moved]
+        target.extend(moved.values())
+        return remaining, target
     
 class PauseTime(BaseModel):
     start_time: Optional[datetime] = None
@@ -49,6 +68,7 @@ class TopologySimulation(BaseModel):
         - config: Config object
         - row_version: Version of the simulation
         - links_execution_state: Execution state of the links
+        - total_links / processed_count / failed_count: Link counters, maintained by the database updates
         - status: Current status of the simulation (StatusEnum)
         - retry_count: Number of retry attempts for failed operations
     """
@@ -56,8 +76,63 @@ class TopologySimulation(BaseModel):
     topology: Topology
     row_version: int = 1
     links_execution_state: TopolgyLinksExecutionState = TopolgyLinksExecutionState()
+    total_links: int = 0
+    processed_count: int = 0
+    failed_count: int = 0
     simulation_time: SimulationTime = SimulationTime()
     status: Optional[TopologyStatusEnum] = TopologyStatusEnum.pending    
     updated_at: datetime = None
     created_at: datetime = None
 
+    def get_links(self) -> List[Link]:
+        """
+        The links of the simulated topology. Simulations of chunked topologies do not copy the
+        topology links, so their links are the ones in links_execution_state.
+        """
+        if self.topology.links_storage == "chunked":
+            return self.links_execution_state.not_processed_links + self.links_execution_state.processed_links
+        return self.topology.links
+
+
+class SimulationStatus(BaseModel):
+    """
+    The status fields of a simulation, as read by status polling (STATUS_PROJECTION).
+    Fields:
+        - sim_id: Unique simulation identifier
+        - status: Current status of the simulation
+        - row_version: Version of the simulation, changes on every update
+        - updated_at: Time of the last update
+    """
+    sim_id: str = Field(None, alias="_id")
+    status: Optional[TopologyStatusEnum] = None
+    row_version: int = 1
+    updated_at: Optional[datetime] = None
+
+
+# Fields of SimulationStatus, read without the topology and links
+STATUS_PROJECTION = {"_id": 1, "status": 1, "row_version": 1, "updated_at": 1}
+
+class SimulationSummary(BaseModel):
+    """
+    A simulation without its topology and links, as listed with a 'fields' projection
+    (only the _id and the requested fields are returned).
+    Fields:
+        - sim_id: Unique simulation identifier
+        - status / row_version / link counters / simulation_time / created_at / updated_at: As in TopologySimulation
+    """
+    sim_id: str = Field(None, alias="_id")
+    status: Optional[TopologyStatusEnum] = None
+    row_version: Optional[int] = None
+    total_links: Optional[int] = None
+    processed_count: Optional[int] = None
+    failed_count: Optional[int] = None
+    simulation_time: Optional[SimulationTime] = None
+    created_at: Optional[datetime] = None
+    updated_at: Optional[datetime] = None
+
+
+# Fields a simulations listing can be projected to (SimulationSummary fields besides _id)
+SUMMARY_FIELDS = ["status", "row_version", "total_links", "processed_count", "failed_count", "simulation_time", "created_at", "updated_at"]
+
+# Fields identifying a version of a simulation: every update sets updated_at (and increments row_version)
+VERSION_PROJECTION = {"_id": 1, "row_version": 1, "updated_at": 1}
@@ -0,0 +1,92 @@
+"""
+In-process caches.
+
+`LRUCache` is a bounded least-recently-used cache whose entries also expire after a TTL, with hit, miss
+and eviction counters. Caches are per process and registered by name (`get_cache`), so a cache is shared
+by all the repository instances of a process and its metrics can be reported (`caches_stats`).
+"""
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Hashable, List, Optional
+
+_MISSING = object()
+
+
+class LRUCache:
+    """
+    Least-recently-used cache of at most 'max_size' entries, each expiring 'ttl_sec' seconds after it
+    was set (never when ttl_sec is None). A max_size of 0 disables the cache.
+    Not thread-safe: meant for a single event loop.
+    """
+    def __init__(self, name: str, max_size: int, ttl_sec: Optional[float] = None):
+        self.name = name
+        self.max_size = max_size
+        self.ttl_sec = ttl_sec
+        self._entries: "OrderedDict[Hashable, tuple]" = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def get(self, key: Hashable, default: Any = None) -> Any:
+        entry = self._entries.get(key, _MISSING)
+        if entry is _MISSING:
+            self.misses += 1
+            return default
+        value, expires_at = entry
+        if expires_at is not None and expires_at <= time.monotonic():
+            del self._entries[key]
+            self.expirations += 1
+            self.misses += 1
+            return default
+        self._entries.move_to_end(key)
+        self.hits += 1
+        return value
+
+    def set(self, key: Hashable, value: Any) -> None:
+        if self.max_size <= 0:
+            return
+        expires_at = time.monotonic() + self.ttl_sec if self.ttl_sec is not None else None
+        self._entries[key] = (value, expires_at)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_size:
+            self._entries.popitem(last=False)
+            self.evictions += 1
+
+    def invalidate(self, key: Hashable) -> None:
+        self._entries.pop(key, None)
+
+    def clear(self) -> None:
+        self._entries.clear()
+
+    def stats(self) -> dict:
+        lookups = self.hits + self.misses
+        return {
+            "name": self.name,
+            "size": len(self._entries),
+            "max_size": self.max_size,
+            "ttl_sec": self.ttl_sec,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_ratio": self.hits / lookups if lookups else 0.0,
+            "evictions": self.evictions,
+            "expirations": self.expirations,
+        }
+
+
+CACHES: Dict[str, LRUCache] = {}
+
+
+def get_cache(name: str, max_size: int, ttl_sec: Optional[float] = None) -> LRUCache:
+    """Get the process-wide cache 'name', creating it with 'max_size' and 'ttl_sec' on first use."""
+    if name not in CACHES:
+        CACHES[name] = LRUCache(name, max_size, ttl_sec)
+    return CACHES[name]
+
+
+def caches_stats() -> List[dict]:
+    """The metrics of all the caches of this process."""
+    return [cache.stats() for cache in CACHES.values()]
@@ -4,11 +4,16 @@ Provides helper functions for standardized error handling.
 """
 import functools
 import traceback
+from pymongo.errors import PyMongoError
 from app.utils.logger import LoggerManager
 from app.business_logic.exceptions import NetworkSimulationError
 
 error_logger = LoggerManager.get_logger('error_handler')
 
+# Labels of MongoDB errors after which a transaction (or its commit) can be run again
+TRANSIENT_TRANSACTION_ERROR = "TransientTransactionError"
+UNKNOWN_TRANSACTION_COMMIT_RESULT = "UnknownTransactionCommitResult"
+
 def handle_exceptions(logger=None):
     """
     A decorator to handle exceptions in a standardized way.
@@ -64,4 +69,54 @@ def with_transaction(func):
         except Exception as e:
             error_logger.error(f"Transaction failed in {func.__name__}: {str(e)}")
             raise e
-    return wrapper 
\ No newline at end of file
+    return wrapper 
+
+def has_error_label(error: BaseException, label: str) -> bool:
+    """
+    Whether 'error', or an error it was raised from, is a MongoDB error with 'label'.
+    The repositories raise DatabaseError from PyMongoError, so the label is on the cause.
+    """
+    while error is not None:
+        if isinstance(error, PyMongoError) and error.has_error_label(label):
+            return True
+        error = error.__cause__
+    return False
+
+async def run_in_transaction(client, callback, max_attempts: int):
+    """
+    Run 'await callback(session)' in a transaction and commit it, like ClientSession.with_transaction,
+    also for the labeled errors the repositories wrap:
+        - TransientTransactionError (e.g. a WriteConflict with a concurrent update): the transaction is
+          aborted and the callback run again, up to 'max_attempts' times
+        - UnknownTransactionCommitResult: the commit is retried
+
+    Returns:
+        The result of the callback
+    """
+    async with await client.start_session() as session:
+        attempt = 1
+        while True:
+            session.start_transaction()
+            try:
+                result = await callback(session)
+            except Exception as e:
+                if session.in_transaction:
+                    await session.abort_transaction()
+                if attempt < max_attempts and has_error_label(e, TRANSIENT_TRANSACTION_ERROR):
+                    error_logger.warning(f"Retrying transaction after attempt {attempt}: {str(e)}")
+                    attempt += 1
+                    continue
+                raise
+            while True:
+                try:
+                    await session.commit_transaction()
+                    return result
+                except PyMongoError as e:
+                    if attempt < max_attempts and has_error_label(e, UNKNOWN_TRANSACTION_COMMIT_RESULT):
+                        attempt += 1
+                        continue
+                    if attempt < max_attempts and has_error_label(e, TRANSIENT_TRANSACTION_ERROR):
+                        break
+                    raise
+            error_logger.warning(f"Retrying transaction after attempt {attempt}, its commit failed with a transient error")
+            attempt += 1
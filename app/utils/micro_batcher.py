@@ -0,0 +1,80 @@
+"""
+Micro-batching helper.
+Groups items submitted concurrently (e.g. by consumer tasks) into batches handled by a single call.
+"""
+import asyncio
+from typing import Any, Awaitable, Callable, List, Optional, Set, Tuple
+from app.utils.logger import LoggerManager
+from app.utils.time_utils import milliseconds_to_seconds
+
+
+class MicroBatcher:
+    """
+    Collects submitted items and hands them to 'handler' in batches of up to max_size items,
+    or whatever arrived within window_ms of the first pending item.
+
+    The handler receives the list of items and returns a list of results in the same order.
+    A result that is an Exception is raised to the matching submitter; if the handler itself
+    raises, every submitter of the batch gets the error.
+
+    Usage:
+        batcher = MicroBatcher(handle_batch, max_size=100, window_ms=50, name="links")
+        result = await batcher.submit(item)
+    """
+    def __init__(self, handler: Callable[[List[Any]], Awaitable[List[Any]]], max_size: int, window_ms: int, name: str = "micro_batcher"):
+        if max_size <= 0:
+            raise ValueError("max_size must be positive")
+        self.logger = LoggerManager.get_logger(name)
+        self.handler = handler
+        self.max_size = max_size
+        self.window = milliseconds_to_seconds(window_ms)
+        self._pending: List[Tuple[Any, asyncio.Future]] = []
+        self._window_task: Optional[asyncio.Task] = None
+        self._batch_tasks: Set[asyncio.Task] = set()
+
+    async def submit(self, item: Any) -> Any:
+        """
+        Add an item to the next batch and wait for its result.
+        """
+        future = asyncio.get_running_loop().create_future()
+        self._pending.append((item, future))
+        if len(self._pending) >= self.max_size:
+            self._flush()
+        elif self._window_task is None:
+            self._window_task = asyncio.create_task(self._flush_after_window())
+        return await future
+
+    async def _flush_after_window(self):
+        await asyncio.sleep(self.window)
+        self._window_task = None
+        self._flush()
+
+    def _flush(self):
+        if self._window_task is not None:
+            self._window_task.cancel()
+            self._window_task = None
+        batch, self._pending = self._pending, []
+        if not batch:
+            return
+        task = asyncio.create_task(self._run_batch(batch))
+        self._batch_tasks.add(task)
+        task.add_done_callback(self._batch_tasks.discard)
+
+    async def _run_batch(self, batch: List[Tuple[Any, asyncio.Future]]):
+        self.logger.debug(f"Handling batch of {len(batch)} items")
+        try:
+            results = await self.handler([item for item, _ in batch])
+            if len(results) != len(batch):
+                raise RuntimeError(f"Batch handler returned {len(results)} results for {len(batch)} items")
+        except Exception as e:
+            self.logger.error(f"Batch of {len(batch)} items failed: {e}")
+            results = [e] * len(batch)
+
+        for (_, future), result in zip(batch, results):
+            # The submitter may have been cancelled (e.g. message timeout)
+            if future.done():
+                continue
+            if isinstance(result, Exception):
+                future.set_exception(result)
+            else:
+                future.set_result(result)
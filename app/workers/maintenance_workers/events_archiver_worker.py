@@ -0,0 +1,34 @@
+import asyncio
+from app.business_logic.events_retention_bl import EventsRetentionBusinessLogic
+from app.app_container import app_container
+from app.utils.logger import LoggerManager
+
+def main():
+    async def setup_and_run():
+        logger = LoggerManager.get_logger("events_archiver_worker")
+        logger.info("Starting events archiver worker")
+
+        config = app_container.config()
+        if not config.EVENTS_ARCHIVE_ENABLED:
+            logger.warning("EVENTS_ARCHIVE_ENABLED is off, events archiver worker is not started")
+            return
+
+        # get dependencies
+        mongo_manager = app_container.mongo_manager()
+
+        # connect to mongo
+        await mongo_manager.connect()
+
+        # run the worker
+        retention_bl = EventsRetentionBusinessLogic(mongo_manager.db)
+        while True:
+            try:
+                archived = await retention_bl.archive_old_events()
+                logger.info(f"Archived {archived} events, next run in {config.EVENTS_ARCHIVE_INTERVAL_SEC}s")
+            except Exception as e:
+                logger.error(f"[!] Exception in events archiver worker: {e}", exc_info=True)
+            await asyncio.sleep(config.EVENTS_ARCHIVE_INTERVAL_SEC)
+    asyncio.run(setup_and_run())
+
+if __name__ == "__main__":
+    main()
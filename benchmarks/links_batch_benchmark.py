@@ -0,0 +1,154 @@
+"""
+Links executor benchmark: per-link validation vs. the vectorized batch executor.
+
+Builds running simulations from synthetic topologies (examples/examples_creation.py) and one
+LINK_RUN event per link, then measures the CPU cost of executing every link:
+    - per_link: as LinkBusinessLogic.run_link does, decode the simulation document, run
+      LinksValidators.run_pre_link_validator, decode it again and run run_post_simulation_Validator
+    - batch:    as LinkBatchBusinessLogic.run_links does, take the projected simulation documents of a
+      batch (no model decoding) and evaluate pre_validation_mask / post_validation_mask over the batch
+Link latencies are not waited for and no database is needed (documents come from memory, projections
+are applied up front as the server would);
+database round trips are reported from the code paths (run_link: 2 reads + 1 transaction per link,
+batch: 2 reads + 1 transaction per batch). Validators log at error level so logging does not
+dominate the timings.
+
+Usage:
+    python -m benchmarks.links_batch_benchmark --topologies 20 --batch-size 100
+"""
+import argparse
+import random
+import time
+from datetime import datetime
+import numpy as np
+from bson import ObjectId
+from examples.examples_creation import generate_multiple_topologies
+from app.business_logic.link_batch_bl import LinkBatchBusinessLogic, PRE_VALIDATION_PROJECTION, POST_VALIDATION_PROJECTION
+from app.business_logic.validators.links_validators import LinksValidators
+from app.models.events_models import LinkEvent
+from app.models.requests_models import SimulationRequest
+from app.models.mapper import SimulationMapper
+from app.models.statuses_enums import EventType, TopologyStatusEnum
+from app.models.topolgy_simulation_models import TopologySimulation
+from app.utils.logger import LoggerManager
+
+
+def build_simulations(count: int, nodes_range: tuple, links_range: tuple, valid_nodes: bool) -> list:
+    simulations = []
+    for raw in generate_multiple_topologies(count, nodes_range, links_range, ensure_valid_nodes=valid_nodes):
+        raw["config"]["log_level"] = "error"
+        topology = SimulationMapper.enrich_topology(SimulationRequest.model_validate(raw))
+        simulation = TopologySimulation(
+            _id=str(ObjectId()),
+            topology=topology,
+            status=TopologyStatusEnum.running,
+            created_at=datetime.now(),
+            updated_at=datetime.now()
+        )
+        simulation.links_execution_state.not_processed_links = list(topology.links)
+        simulations.append(simulation)
+    return simulations
+
+
+def build_link_events(simulations: list) -> list:
+    events = []
+    for simulation in simulations:
+        for event in SimulationMapper.simulation_to_links_event(simulation):
+            events.append(event)
+    random.shuffle(events)  # links of many simulations arrive interleaved
+    return events
+
+
+def read_simulation(docs_by_id: dict, sim_id: str) -> TopologySimulation:
+    """Stands in for a simulation read: the document decoding done by TopologiesSimulationsDB."""
+    return TopologySimulation.model_validate(docs_by_id[sim_id])
+
+
+def run_per_link(docs_by_id: dict, events: list) -> int:
+    validators = LinksValidators()
+    passed = 0
+    for event in events:
+        simulation = read_simulation(docs_by_id, event.sim_id)
+        if not validators.run_pre_link_validator(simulation, event.after):
+            continue
+        simulation = read_simulation(docs_by_id, event.sim_id)
+        if validators.run_post_simulation_Validator(simulation):
+            passed += 1
+    return passed
+
+
+def project(doc, paths, top_level: bool = True):
+    """Apply a MongoDB inclusion projection (dotted paths) to a document, as the server does for the batch reads."""
+    if isinstance(doc, list):
+        return [project(item, paths, top_level=False) for item in doc]
+    if not isinstance(doc, dict):
+        return doc
+    nested = {}
+    for path in paths:
+        field, _, rest = path.partition(".")
+        nested.setdefault(field, []).append(rest)
+    projected = {"_id": doc["_id"]} if top_level and "_id" in doc else {}
+    for field, rests in nested.items():
+        if field in doc:
+            projected[field] = doc[field] if "" in rests else project(doc[field], rests, top_level=False)
+    return projected
+
+
+def run_batches(projected_docs: tuple, events: list, batch_size: int) -> int:
+    pre_docs, post_docs = projected_docs
+    passed = 0
+    for start in range(0, len(events), batch_size):
+        batch = events[start:start + batch_size]
+        sim_ids = list(dict.fromkeys(event.sim_id for event in batch))
+        position = {sim_id: index for index, sim_id in enumerate(sim_ids)}
+        sim_index = np.array([position[event.sim_id] for event in batch], dtype=int)
+        simulations = [pre_docs[sim_id] for sim_id in sim_ids]
+        pre_valid = LinkBatchBusinessLogic.pre_validation_mask(batch, simulations, sim_index)
+        simulations = [post_docs[sim_id] for sim_id in sim_ids]
+        post_valid = LinkBatchBusinessLogic.post_validation_mask(simulations, sim_index)
+        passed += int((pre_valid & post_valid).sum())
+    return passed
+
+
+def timed(fn, *args):
+    start = time.perf_counter()
+    result = fn(*args)
+    return result, time.perf_counter() - start
+
+
+def main(topologies: int, nodes_range: tuple, links_range: tuple, batch_size: int, seed: int, valid_nodes: bool):
+    random.seed(seed)
+    LoggerManager.get_logger('links_validators').set_level('error')
+
+    simulations = build_simulations(topologies, nodes_range, links_range, valid_nodes)
+    docs_by_id = {simulation.sim_id: simulation.model_dump(by_alias=True) for simulation in simulations}
+    events = build_link_events(simulations)
+    assert all(isinstance(event, LinkEvent) and event.event_type == EventType.LINK_RUN for event in events)
+
+    per_link_passed, per_link_time = timed(run_per_link, docs_by_id, events)
+    projected_docs = (
+        {sim_id: project(doc, PRE_VALIDATION_PROJECTION) for sim_id, doc in docs_by_id.items()},
+        {sim_id: project(doc, POST_VALIDATION_PROJECTION) for sim_id, doc in docs_by_id.items()},
+    )
+    batch_passed, batch_time = timed(run_batches, projected_docs, events, batch_size)
+    if per_link_passed != batch_passed:
+        raise AssertionError(f"Validation results differ: per_link={per_link_passed}, batch={batch_passed}")
+
+    batches = -(-len(events) // batch_size)
+    print(f"\n{len(simulations)} simulations, {len(events)} links, batch size {batch_size}, {batch_passed} links valid")
+    print(f"{'mode':<10}{'seconds':>10}{'links/s':>14}{'db round trips':>16}")
+    print(f"{'per_link':<10}{per_link_time:>10.3f}{len(events) / per_link_time:>14.0f}{len(events) * 3:>16}")
+    print(f"{'batch':<10}{batch_time:>10.3f}{len(events) / batch_time:>14.0f}{batches * 3:>16}")
+    print(f"speedup: {per_link_time / batch_time:.1f}x")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Per-link vs. vectorized batch link validation")
+    parser.add_argument("--topologies", type=int, default=20, help="Number of synthetic simulations")
+    parser.add_argument("--nodes", type=int, nargs=2, default=(50, 150), help="Nodes range per topology")
+    parser.add_argument("--links", type=int, nargs=2, default=(75, 300), help="Links range per topology")
+    parser.add_argument("--batch-size", type=int, default=100, help="Links per batch")
+    parser.add_argument("--seed", type=int, default=7, help="Random seed")
+    parser.add_argument("--invalid-nodes", action="store_true", help="Let links reference nodes outside the topology")
+    args = parser.parse_args()
+    main(args.topologies, tuple(args.nodes), tuple(args.links), args.batch_size, args.seed, not args.invalid_nodes)
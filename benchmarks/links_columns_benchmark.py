@@ -0,0 +1,73 @@
+"""
+Links representation benchmark: Link models vs. LinksColumns.
+
+Builds the links of a synthetic topology (examples/examples_creation.py) and compares:
+    - models:  the links as stored today, a link document each, decoded into Link models
+    - columns: the links as one LinksColumns binary (app/models/links_columns.py), decoded as
+      NumPy views over the binary
+Reports the stored size (BSON), the memory held after decoding (tracemalloc) and the decoding time
+per link, and checks the columns round trip to the same links.
+
+Usage:
+    python -m benchmarks.links_columns_benchmark --nodes 1000 --links 100000
+"""
+import argparse
+import random
+import time
+import tracemalloc
+import bson
+from typing import List
+from pydantic import TypeAdapter
+from examples.examples_creation import generate_multiple_topologies
+from app.models.links_columns import LinksColumns
+from app.models.mapper import SimulationMapper
+from app.models.requests_models import SimulationRequest
+from app.models.topolgy_models import Link
+
+
+def build_links(nodes: int, links: int) -> tuple:
+    raw = generate_multiple_topologies(1, (nodes, nodes), (links, links), ensure_valid_nodes=True)[0]
+    topology = SimulationMapper.enrich_topology(SimulationRequest.model_validate(raw))
+    return topology.nodes, topology.links
+
+
+def measure(decode, encoded) -> tuple:
+    """Decode 'encoded', returning the result, the memory it holds and the time it took."""
+    tracemalloc.start()
+    start = time.perf_counter()
+    decoded = decode(encoded)
+    elapsed = time.perf_counter() - start
+    held, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return decoded, held, elapsed
+
+
+def main(nodes: int, links: int, seed: int):
+    random.seed(seed)
+    topology_nodes, topology_links = build_links(nodes, links)
+    count = len(topology_links)
+
+    models_doc = bson.encode({"links": [link.model_dump(by_alias=True) for link in topology_links]})
+    columns_doc = bson.encode({"links_columns": LinksColumns.from_links(topology_links, topology_nodes).to_bson()})
+
+    adapter = TypeAdapter(List[Link])
+    models, models_memory, models_time = measure(lambda doc: adapter.validate_python(bson.decode(doc)["links"]), models_doc)
+    columns, columns_memory, columns_time = measure(lambda doc: LinksColumns.from_bson(bson.decode(doc)["links_columns"]), columns_doc)
+
+    round_trip = [link.model_dump(by_alias=True) for link in columns.to_links()]
+    if round_trip != [link.model_dump(by_alias=True) for link in models]:
+        raise AssertionError("Links decoded from columns differ from the stored links")
+
+    print(f"\n{count} links, {len(topology_nodes)} nodes")
+    print(f"{'format':<10}{'stored B/link':>16}{'memory B/link':>16}{'decode us/link':>16}")
+    print(f"{'models':<10}{len(models_doc) / count:>16.1f}{models_memory / count:>16.1f}{models_time / count * 1e6:>16.2f}")
+    print(f"{'columns':<10}{len(columns_doc) / count:>16.1f}{columns_memory / count:>16.1f}{columns_time / count * 1e6:>16.2f}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Link models vs. columnar links")
+    parser.add_argument("--nodes", type=int, default=1000, help="Nodes in the topology")
+    parser.add_argument("--links", type=int, default=100000, help="Links in the topology")
+    parser.add_argument("--seed", type=int, default=7, help="Random seed")
+    args = parser.parse_args()
+    main(args.nodes, args.links, args.seed)
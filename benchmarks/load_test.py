@@ -0,0 +1,77 @@
+"""
+API load test, driven by the async client (network_simulation_client).
+
+Generates synthetic topologies (examples/examples_creation.py), submits them to a running server and
+reports the creation throughput, then optionally waits for the simulations to finish:
+    - bulk:   POST /simulate, chunk-size requests per call, concurrency calls in flight
+    - stream: POST /simulate/stream, one NDJSON body for all the requests
+Use the virtual clock engine (--engine virtual_clock) to load the API and database without waiting for
+link latencies.
+
+Usage:
+    python -m benchmarks.load_test --base-url http://localhost:9090 --topologies 5000 --chunk-size 500 --wait
+"""
+import argparse
+import asyncio
+import random
+import time
+from collections import Counter
+from examples.examples_creation import generate_multiple_topologies
+from network_simulation_client import NetworkSimulationClient
+
+
+def build_requests(count: int, nodes_range: tuple, links_range: tuple, engine: str) -> list:
+    requests = generate_multiple_topologies(count, nodes_range, links_range, ensure_valid_nodes=True)
+    for request in requests:
+        request["config"]["log_level"] = "error"
+        request["config"]["engine"] = engine
+    return requests
+
+
+async def create(client: NetworkSimulationClient, requests: list, stream: bool) -> list:
+    if not stream:
+        return await client.create_simulations(requests)
+    sim_ids = []
+    async for result in client.create_simulations_stream(requests):
+        if "sim_id" in result:
+            sim_ids.append(result["sim_id"])
+        elif "error" in result:
+            print(f"  error: {result}")
+    return sim_ids
+
+
+async def main(args):
+    random.seed(args.seed)
+    requests = build_requests(args.topologies, tuple(args.nodes), tuple(args.links), args.engine)
+    async with NetworkSimulationClient(
+        args.base_url, max_connections=args.concurrency, max_concurrency=args.concurrency, chunk_size=args.chunk_size
+    ) as client:
+        await client.ping()
+        start = time.perf_counter()
+        sim_ids = await create(client, requests, args.stream)
+        elapsed = time.perf_counter() - start
+        print(f"\nCreated {len(sim_ids)}/{len(requests)} simulations in {elapsed:.2f}s "
+              f"({len(sim_ids) / elapsed:.0f}/s, {'stream' if args.stream else f'chunks of {args.chunk_size}'})")
+
+        if args.wait and sim_ids:
+            start = time.perf_counter()
+            statuses = await client.wait_for_completion(sim_ids, poll_interval=args.poll_interval, timeout=args.timeout)
+            elapsed = time.perf_counter() - start
+            print(f"Completed in {elapsed:.2f}s: {dict(Counter(statuses.values()))}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Simulation creation load test")
+    parser.add_argument("--base-url", default="http://localhost:9090", help="Server URL")
+    parser.add_argument("--topologies", type=int, default=1000, help="Number of simulations to create")
+    parser.add_argument("--nodes", type=int, nargs=2, default=(5, 20), help="Nodes range per topology")
+    parser.add_argument("--links", type=int, nargs=2, default=(5, 50), help="Links range per topology")
+    parser.add_argument("--engine", choices=["real_time", "virtual_clock"], default="virtual_clock", help="Simulation engine")
+    parser.add_argument("--chunk-size", type=int, default=500, help="Requests per POST /simulate")
+    parser.add_argument("--concurrency", type=int, default=20, help="Requests in flight")
+    parser.add_argument("--stream", action="store_true", help="Use POST /simulate/stream")
+    parser.add_argument("--wait", action="store_true", help="Wait for the simulations to finish")
+    parser.add_argument("--poll-interval", type=float, default=1.0, help="Seconds between status polls")
+    parser.add_argument("--timeout", type=float, default=600.0, help="Seconds to wait for completion")
+    parser.add_argument("--seed", type=int, default=7, help="Random seed")
+    asyncio.run(main(parser.parse_args()))
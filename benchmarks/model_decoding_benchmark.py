@@ -0,0 +1,120 @@
+"""
+Simulation decoding benchmark: TypeAdapter per call vs. cached adapter vs. unvalidated construction.
+
+Builds simulation documents from synthetic topologies (examples/examples_creation.py), with half of
+their links processed, and decodes them into TopologySimulation in pages, as the repositories read them:
+    - per_call:  TypeAdapter(List[TopologySimulation]) built for every page, as the repositories did
+    - cached:    the prebuilt TOPOLOGY_SIMULATIONS_ADAPTER (app/models/adapters.py)
+    - construct: nested model_construct without validation, the "trusted documents" alternative;
+                 with pydantic-core doing validation natively it is slower than validating
+The construct path is checked to produce the same models as validation.
+
+Usage:
+    python -m benchmarks.model_decoding_benchmark --topologies 50 --page-size 20 --rounds 5
+"""
+import argparse
+import random
+import time
+from datetime import datetime
+from typing import List
+from pydantic import TypeAdapter
+from benchmarks.links_batch_benchmark import build_simulations
+from app.models.adapters import TOPOLOGY_SIMULATIONS_ADAPTER
+from app.models.statuses_enums import LinkStatusEnum, TopologyStatusEnum
+from app.models.topolgy_models import Config, Link, LinkExecutionState, Topology
+from app.models.topolgy_simulation_models import PauseTime, SimulationTime, TopolgyLinksExecutionState, TopologySimulation
+
+
+def build_documents(count: int, nodes_range: tuple, links_range: tuple) -> list:
+    docs = []
+    for simulation in build_simulations(count, nodes_range, links_range, valid_nodes=True):
+        execution_state = simulation.links_execution_state
+        processed = execution_state.not_processed_links[::2]
+        for link in processed:
+            link.execution_state = LinkExecutionState(
+                status=random.choice([LinkStatusEnum.done, LinkStatusEnum.failed]),
+                start_time=datetime.now(),
+                end_time=datetime.now(),
+                retry_count=1
+            )
+        execution_state.move_links_to_processed(processed)
+        docs.append(simulation.model_dump(by_alias=True))
+    return docs
+
+
+def construct_link(doc: dict) -> Link:
+    execution_state = doc.get("execution_state")
+    if execution_state is not None:
+        execution_state = LinkExecutionState.model_construct(**{**execution_state, "status": LinkStatusEnum(execution_state["status"])})
+    return Link.model_construct(**{**doc, "execution_state": execution_state})
+
+
+def construct_simulation(doc: dict) -> TopologySimulation:
+    topology = doc["topology"]
+    execution_state = doc["links_execution_state"]
+    simulation_time = doc["simulation_time"]
+    return TopologySimulation.model_construct(**{
+        **doc,
+        "topology": Topology.model_construct(**{
+            **topology,
+            "links": [construct_link(link) for link in topology["links"]],
+            "config": Config.model_construct(**topology["config"])
+        }),
+        "links_execution_state": TopolgyLinksExecutionState.model_construct(
+            not_processed_links=[construct_link(link) for link in execution_state["not_processed_links"]],
+            processed_links=[construct_link(link) for link in execution_state["processed_links"]]
+        ),
+        "simulation_time": SimulationTime.model_construct(**{
+            **simulation_time, "pauses": [PauseTime.model_construct(**pause) for pause in simulation_time["pauses"]]
+        }),
+        "status": TopologyStatusEnum(doc["status"])
+    })
+
+
+def per_call(page: list) -> List[TopologySimulation]:
+    return TypeAdapter(List[TopologySimulation]).validate_python(page)
+
+
+def cached(page: list) -> List[TopologySimulation]:
+    return TOPOLOGY_SIMULATIONS_ADAPTER.validate_python(page)
+
+
+def construct(page: list) -> List[TopologySimulation]:
+    return [construct_simulation(doc) for doc in page]
+
+
+def timed(decode, pages: list, rounds: int) -> float:
+    start = time.perf_counter()
+    for _ in range(rounds):
+        for page in pages:
+            decode(page)
+    return (time.perf_counter() - start) / (rounds * sum(len(page) for page in pages))
+
+
+def main(topologies: int, nodes_range: tuple, links_range: tuple, page_size: int, rounds: int, seed: int):
+    random.seed(seed)
+    docs = build_documents(topologies, nodes_range, links_range)
+    if [simulation.model_dump() for simulation in construct(docs)] != [simulation.model_dump() for simulation in cached(docs)]:
+        raise AssertionError("Constructed simulations differ from validated ones")
+    pages = [docs[start:start + page_size] for start in range(0, len(docs), page_size)]
+
+    links = sum(len(doc["topology"]["links"]) for doc in docs) / len(docs)
+    print(f"\n{len(docs)} simulation documents, {links:.0f} links each on average, pages of {page_size}, {rounds} rounds")
+    print(f"{'mode':<10}{'us/doc':>12}{'speedup':>10}")
+    baseline = None
+    for name, decode in (("per_call", per_call), ("cached", cached), ("construct", construct)):
+        cost = timed(decode, pages, rounds)
+        baseline = baseline or cost
+        print(f"{name:<10}{cost * 1e6:>12.1f}{baseline / cost:>9.1f}x")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Simulation document decoding cost")
+    parser.add_argument("--topologies", type=int, default=50, help="Number of simulation documents")
+    parser.add_argument("--nodes", type=int, nargs=2, default=(5, 20), help="Nodes range per topology")
+    parser.add_argument("--links", type=int, nargs=2, default=(5, 50), help="Links range per topology")
+    parser.add_argument("--page-size", type=int, default=20, help="Documents decoded per call")
+    parser.add_argument("--rounds", type=int, default=5, help="Times every document is decoded")
+    parser.add_argument("--seed", type=int, default=7, help="Random seed")
+    args = parser.parse_args()
+    main(args.topologies, tuple(args.nodes), tuple(args.links), args.page_size, args.rounds, args.seed)
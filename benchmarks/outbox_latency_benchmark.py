@@ -0,0 +1,136 @@
+"""
+Outbox latency benchmark: polling vs. change stream.
+
+Measures the time between inserting an unpublished event into the outbox and the
+moment a producer loop picks it up and marks it as published, for both outbox modes.
+RabbitMQ is not involved, only the outbox detection path is measured.
+
+Requires a MongoDB replica set (change streams are not available on a standalone server)
+and the usual environment variables (ENV, MONGODB_URI, MONGODB_DB, RABBITMQ_URL).
+The benchmark uses a separate '<MONGODB_DB>_benchmark' database and drops it at the end.
+
+Usage:
+    python -m benchmarks.outbox_latency_benchmark --events 200 --interval 0.05
+"""
+import argparse
+import asyncio
+import inspect
+import random
+import statistics
+from datetime import datetime, UTC
+from bson import ObjectId
+from motor.motor_asyncio import AsyncIOMotorClient
+from app.app_container import app_container
+from app.db.events_db import EventsDB
+from app.messageBroker.backpressure_manager import BackpressureManager
+from app.models.statuses_enums import EventType
+
+EVENT_FILTER = {"published": False, "event_type": EventType.LINK_RUN.value}
+
+
+def build_event() -> dict:
+    now = datetime.now(UTC)
+    return {
+        "_id": str(ObjectId()),
+        "event_type": EventType.LINK_RUN.value,
+        "sim_id": "benchmark",
+        "after": {"_id": str(ObjectId()), "from_node": "A", "to_node": "B", "latency": 1},
+        "is_handled": False,
+        "published": False,
+        "retry_count": 0,
+        "created_at": now,
+        "updated_at": now,
+    }
+
+
+async def insert_events(events_db: EventsDB, count: int, interval: float, inserted_at: dict):
+    loop = asyncio.get_running_loop()
+    for _ in range(count):
+        event = build_event()
+        inserted_at[event["_id"]] = loop.time()
+        await events_db.collection.insert_one(event)
+        await asyncio.sleep(random.uniform(0, 2 * interval))
+
+
+async def mark_detected(events_db: EventsDB, events: list, detected_at: dict):
+    loop = asyncio.get_running_loop()
+    event_ids = [event["_id"] for event in events]
+    for event_id in event_ids:
+        detected_at.setdefault(event_id, loop.time())
+    if event_ids:
+        await events_db.update_events_published(event_ids)
+
+
+async def polling_detector(events_db: EventsDB, count: int, detected_at: dict, stats: dict):
+    """Mirrors BaseProducer._run_polling_producer: base backpressure delay, query, retry delay."""
+    config = app_container.config()
+    base_delay = inspect.signature(BackpressureManager).parameters["base_delay"].default
+    while len(detected_at) < count:
+        await asyncio.sleep(base_delay)
+        events = await events_db.find_events_by_filter(EVENT_FILTER, limit=config.PAGE_SIZE)
+        stats["queries"] += 1
+        await mark_detected(events_db, events, detected_at)
+        await asyncio.sleep(config.RETRY_DELAY)
+
+
+async def change_stream_detector(events_db: EventsDB, count: int, detected_at: dict, stats: dict):
+    """Mirrors BaseProducer._run_change_stream_producer without the fallback poll."""
+    config = app_container.config()
+    async for inserted_events in events_db.watch_events(
+        EVENT_FILTER,
+        batch_size=config.PAGE_SIZE,
+        max_await_time_ms=config.OUTBOX_CHANGE_STREAM_MAX_AWAIT_MS
+    ):
+        if inserted_events:
+            events = await events_db.find_events_by_ids([event["_id"] for event in inserted_events], EVENT_FILTER)
+            stats["queries"] += 1
+            await mark_detected(events_db, events, detected_at)
+        if len(detected_at) >= count:
+            return
+
+
+async def run_mode(db, mode: str, count: int, interval: float) -> dict:
+    events_db = EventsDB(db)
+    await events_db.collection.delete_many({})
+    inserted_at, detected_at, stats = {}, {}, {"queries": 0}
+    detector = polling_detector if mode == "polling" else change_stream_detector
+
+    detector_task = asyncio.create_task(detector(events_db, count, detected_at, stats))
+    await asyncio.sleep(0.5)  # let the detector open its cursor / change stream
+    await insert_events(events_db, count, interval, inserted_at)
+    await asyncio.wait_for(detector_task, timeout=count * interval * 2 + 60)
+
+    latencies = sorted(detected_at[event_id] - inserted_at[event_id] for event_id in inserted_at)
+    return {
+        "mode": mode,
+        "events": count,
+        "queries": stats["queries"],
+        "p50_ms": statistics.median(latencies) * 1000,
+        "p95_ms": latencies[int(len(latencies) * 0.95) - 1] * 1000,
+        "max_ms": latencies[-1] * 1000,
+    }
+
+
+async def main(count: int, interval: float, modes: list):
+    config = app_container.config()
+    client = AsyncIOMotorClient(config.MONGODB_URI)
+    db_name = f"{config.MONGODB_DB}_benchmark"
+    try:
+        results = [await run_mode(client[db_name], mode, count, interval) for mode in modes]
+    finally:
+        await client.drop_database(db_name)
+        client.close()
+
+    print(f"\n{'mode':<14}{'events':>8}{'queries':>9}{'p50 ms':>10}{'p95 ms':>10}{'max ms':>10}")
+    for result in results:
+        print(f"{result['mode']:<14}{result['events']:>8}{result['queries']:>9}"
+              f"{result['p50_ms']:>10.1f}{result['p95_ms']:>10.1f}{result['max_ms']:>10.1f}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Outbox detection latency: polling vs. change stream")
+    parser.add_argument("--events", type=int, default=200, help="Number of events to insert")
+    parser.add_argument("--interval", type=float, default=0.05, help="Mean seconds between inserts")
+    parser.add_argument("--modes", nargs="+", default=["polling", "change_stream"], choices=["polling", "change_stream"])
+    args = parser.parse_args()
+    asyncio.run(main(args.events, args.interval, args.modes))
@@ -0,0 +1,3 @@
+from network_simulation_client.client import NetworkSimulationApiError, NetworkSimulationClient, TERMINAL_STATUSES
+
+__all__ = ["NetworkSimulationClient", "NetworkSimulationApiError", "TERMINAL_STATUSES"]
@@ -0,0 +1,271 @@
+"""
+Async client of the Network Simulation Server API.
+
+`NetworkSimulationClient` wraps every router of app/api over one shared httpx connection pool:
+    - keep-alive connections (max_connections), optionally HTTP/2 (needs the h2 package), so
+      concurrent requests are multiplexed on the pooled connections instead of opening new ones
+    - bounded concurrency (max_concurrency requests in flight across all calls)
+    - automatic chunking of large SimulationRequest lists (chunk_size requests per POST /simulate)
+    - wait_for_completion, which polls only the simulations not finished yet, status_batch_size IDs per
+      POST /simulation-data/statuses
+"""
+import asyncio
+import json
+import time
+from datetime import datetime
+from typing import Any, AsyncIterator, Dict, Iterable, List, Optional, Sequence
+import httpx
+
+# Simulation statuses a simulation does not leave on its own
+TERMINAL_STATUSES = frozenset({"done", "failed", "stopped"})
+
+
+class NetworkSimulationApiError(Exception):
+    """An error response of the API."""
+    def __init__(self, status_code: int, detail: Any, method: str, path: str):
+        super().__init__(f"{method} {path} failed with {status_code}: {detail}")
+        self.status_code = status_code
+        self.detail = detail
+
+
+def _to_json(obj: Any) -> Any:
+    """Requests are accepted as dicts or as pydantic models (e.g. app.models.requests_models.SimulationRequest)."""
+    if hasattr(obj, "model_dump"):
+        return obj.model_dump(mode="json", by_alias=True, exclude_none=True)
+    return obj
+
+
+class NetworkSimulationClient:
+    """
+    Usage:
+        async with NetworkSimulationClient("http://localhost:9090") as client:
+            sim_ids = await client.create_simulations(requests)
+            statuses = await client.wait_for_completion(sim_ids)
+    """
+    def __init__(
+        self,
+        base_url: str = "http://localhost:9090",
+        api_prefix: str = "/api/v1",
+        max_connections: int = 100,
+        max_concurrency: int = 50,
+        chunk_size: int = 500,
+        status_batch_size: int = 1000,
+        timeout: float = 60.0,
+        http2: bool = False,
+        transport: Optional[httpx.AsyncBaseTransport] = None
+    ):
+        self.chunk_size = chunk_size
+        self.status_batch_size = status_batch_size
+        self._semaphore = asyncio.Semaphore(max_concurrency)
+        self._http = httpx.AsyncClient(
+            base_url=base_url.rstrip("/") + api_prefix,
+            limits=httpx.Limits(max_connections=max_connections, max_keepalive_connections=max_connections),
+            timeout=timeout,
+            http2=http2,
+            transport=transport
+        )
+
+    async def __aenter__(self) -> "NetworkSimulationClient":
+        return self
+
+    async def __aexit__(self, *exc_info) -> None:
+        await self.close()
+
+    async def close(self) -> None:
+        await self._http.aclose()
+
+    async def _request(self, method: str, path: str, **kwargs) -> Any:
+        async with self._semaphore:
+            response = await self._http.request(method, path, **kwargs)
+        if response.is_error:
+            try:
+                detail = response.json().get("detail")
+            except ValueError:
+                detail = response.text
+            raise NetworkSimulationApiError(response.status_code, detail, method, path)
+        return response.json() if response.content else None
+
+    @staticmethod
+    def _chunks(items: Sequence, size: int) -> List[Sequence]:
+        return [items[start:start + size] for start in range(0, len(items), size)]
+
+    # simulation_creator_api
+
+    async def create_simulations(self, requests: Sequence[Any]) -> List[str]:
+        """
+        Create simulations, sending chunk_size requests per POST /simulate concurrently.
+
+        Returns:
+            The sim ids of the created simulations, in the order of the chunks
+        """
+        chunks = self._chunks([_to_json(request) for request in requests], self.chunk_size)
+        results = await asyncio.gather(*(self._request("POST", "/simulate", json=chunk) for chunk in chunks))
+        return [sim_id for sim_ids in results for sim_id in sim_ids]
+
+    async def create_simulations_stream(self, requests: Iterable[Any]) -> AsyncIterator[dict]:
+        """
+        Create simulations through POST /simulate/stream, sending the requests as NDJSON while reading
+        the results: {"sim_id"} per created simulation, {"line"|"lines", "error"} per failure and a
+        final {"created", "failed"} summary.
+        """
+        async def body():
+            for request in requests:
+                yield json.dumps(_to_json(request)).encode() + b"\n"
+
+        async with self._semaphore:
+            async with self._http.stream(
+                "POST", "/simulate/stream", content=body(), headers={"Content-Type": "application/x-ndjson"}
+            ) as response:
+                if response.is_error:
+                    await response.aread()
+                    raise NetworkSimulationApiError(response.status_code, response.text, "POST", "/simulate/stream")
+                async for line in response.aiter_lines():
+                    if line:
+                        yield json.loads(line)
+
+    # simulation_management_api
+
+    async def restart_simulation(self, simulation_id: str) -> Any:
+        return await self._request("POST", f"/restart/{simulation_id}")
+
+    async def pause_simulation(self, simulation_id: str) -> Any:
+        return await self._request("POST", f"/pause/{simulation_id}")
+
+    async def resume_simulation(self, simulation_id: str) -> Any:
+        return await self._request("POST", f"/resume/{simulation_id}")
+
+    async def edit_simulation(self, simulation_id: str) -> Any:
+        return await self._request("PUT", f"/edit/{simulation_id}")
+
+    # simulation_data_api
+
+    async def get_status(self, simulation_id: str) -> str:
+        return await self._request("GET", f"/simulation-data/status/{simulation_id}")
+
+    async def get_simulation(self, simulation_id: str) -> dict:
+        return await self._request("GET", f"/simulation-data/get-simulation/{simulation_id}")
+
+    async def list_simulations(
+        self,
+        cursor: Optional[str] = None,
+        page_size: int = 10,
+        with_total: bool = False,
+        status: Sequence[str] = (),
+        created_after: Optional[datetime] = None,
+        fields: Optional[Sequence[str]] = None
+    ) -> dict:
+        """
+        Get a page of simulations, optionally with one of the statuses and created after a time.
+        With fields (e.g. ["status", "processed_count"]) the items are summaries with only _id and those fields.
+        """
+        params = {"page_size": page_size, "with_total": with_total}
+        if cursor:
+            params["cursor"] = cursor
+        if status:
+            params["status"] = list(status)
+        if created_after is not None:
+            params["created_after"] = created_after.isoformat()
+        if fields is not None:
+            params["fields"] = ",".join(fields)
+        return await self._request("GET", "/simulation-data/get-all-simulations-cursor", params=params)
+
+    async def iter_simulations(
+        self,
+        page_size: int = 100,
+        status: Sequence[str] = (),
+        created_after: Optional[datetime] = None,
+        fields: Optional[Sequence[str]] = None
+    ) -> AsyncIterator[dict]:
+        """Iterate over all the (matching) simulations, following the pagination cursor."""
+        cursor = None
+        while True:
+            page = await self.list_simulations(
+                cursor=cursor, page_size=page_size, status=status, created_after=created_after, fields=fields
+            )
+            for simulation in page["items"]:
+                yield simulation
+            cursor = page.get("next_cursor")
+            if not cursor:
+                return
+
+    async def get_status_documents(self, simulation_ids: Sequence[str]) -> List[dict]:
+        """
+        Get the _id, status, row_version and updated_at of many simulations with POST /simulation-data/statuses,
+        status_batch_size IDs per call (unknown simulations are left out).
+        """
+        batches = self._chunks(list(simulation_ids), self.status_batch_size)
+        results = await asyncio.gather(*(
+            self._request("POST", "/simulation-data/statuses", json={"sim_ids": list(batch)}) for batch in batches
+        ))
+        return [doc for docs in results for doc in docs]
+
+    async def get_statuses(self, simulation_ids: Sequence[str]) -> Dict[str, str]:
+        """Get the status of many simulations (unknown simulations are left out)."""
+        return {doc["_id"]: doc["status"] for doc in await self.get_status_documents(simulation_ids)}
+
+    async def iter_events(self, sim_ids: Sequence[str] = (), event_types: Sequence[str] = ()) -> AsyncIterator[dict]:
+        """
+        Iterate over the events pushed by GET /simulation-data/events (server-sent events) as they happen.
+        Yields the event messages, and {"event_type": "dropped", "dropped"} when events were missed;
+        returns when the server closes the stream.
+        """
+        params = {"sim_ids": ",".join(sim_ids), "event_types": ",".join(event_types)}
+        async with self._http.stream("GET", "/simulation-data/events", params=params, timeout=None) as response:
+            if response.is_error:
+                await response.aread()
+                raise NetworkSimulationApiError(response.status_code, response.text, "GET", "/simulation-data/events")
+            event = None
+            async for line in response.aiter_lines():
+                if line.startswith("event: "):
+                    event = line[len("event: "):]
+                elif line.startswith("data: ") and event == "dropped":
+                    yield {"event_type": "dropped", **json.loads(line[len("data: "):])}
+                elif line.startswith("data: ") and event == "closed":
+                    return
+                elif line.startswith("data: "):
+                    yield json.loads(line[len("data: "):])
+
+    async def wait_for_completion(
+        self,
+        simulation_ids: Sequence[str],
+        poll_interval: float = 1.0,
+        timeout: Optional[float] = None,
+        terminal_statuses: frozenset = TERMINAL_STATUSES
+    ) -> Dict[str, str]:
+        """
+        Wait until all the simulations reach a terminal status. Each round polls only the simulations
+        not finished yet.
+
+        Returns:
+            The final status of every simulation
+
+        Raises:
+            asyncio.TimeoutError: If they do not all finish within timeout seconds
+        """
+        deadline = time.monotonic() + timeout if timeout is not None else None
+        pending = list(dict.fromkeys(simulation_ids))
+        finished: Dict[str, str] = {}
+        while pending:
+            statuses = await self.get_statuses(pending)
+            finished.update({sim_id: status for sim_id, status in statuses.items() if status in terminal_statuses})
+            pending = [sim_id for sim_id in pending if sim_id not in finished]
+            if not pending:
+                break
+            if deadline is not None and time.monotonic() + poll_interval > deadline:
+                raise asyncio.TimeoutError(f"{len(pending)} simulations did not complete within {timeout}s")
+            await asyncio.sleep(poll_interval)
+        return finished
+
+    # debug_api
+
+    async def ping(self) -> dict:
+        return await self._request("GET", "/debug/debug/ping")
+
+    async def get_caches_stats(self) -> List[dict]:
+        return await self._request("GET", "/debug/debug/caches")
+
+    async def send_simulation_message(self, request: Any) -> str:
+        return await self._request("POST", "/debug/debug/send-simulation-message", json=_to_json(request))
+
+    async def send_link_message(self, link: Any) -> str:
+        return await self._request("POST", "/debug/debug/send-link-message", json=_to_json(link))
@@ -0,0 +1,176 @@
+"""
+LRUCache: eviction order, TTL expiry and the counters reported by /debug/caches, and the size bound
+of the simulations cache of SimulationsReadBusinessLogic.
+"""
+import asyncio
+from datetime import datetime
+import pytest
+from app.app_container import app_container
+from app.business_logic.simulations_read_bl import SimulationsReadBusinessLogic
+from app.utils import cache as cache_module
+from app.utils.cache import LRUCache, caches_stats, get_cache
+
+
+class Clock:
+    """A settable time.monotonic."""
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = Clock()
+    monkeypatch.setattr(cache_module.time, "monotonic", clock)
+    return clock
+
+
+@pytest.fixture
+def caches(monkeypatch):
+    """An empty process-wide cache registry, restored after the test."""
+    monkeypatch.setattr(cache_module, "CACHES", {})
+    return cache_module.CACHES
+
+
+def test_evicts_the_least_recently_used_entry():
+    cache = LRUCache("test", max_size=2)
+    cache.set("a", 1)
+    cache.set("b", 2)
+    assert cache.get("a") == 1  # 'b' is now the least recently used
+    cache.set("c", 3)
+
+    assert cache.get("b") is None
+    assert cache.get("a") == 1
+    assert cache.get("c") == 3
+    assert len(cache) == 2
+    assert cache.stats()["evictions"] == 1
+
+
+def test_setting_an_existing_key_refreshes_it_without_evicting():
+    cache = LRUCache("test", max_size=2)
+    cache.set("a", 1)
+    cache.set("b", 2)
+    cache.set("a", 10)
+    cache.set("c", 3)
+
+    assert cache.get("a") == 10
+    assert cache.get("b") is None
+    assert cache.stats()["evictions"] == 1
+
+
+def test_entries_expire_after_the_ttl(clock):
+    cache = LRUCache("test", max_size=10, ttl_sec=5)
+    cache.set("a", 1)
+    clock.now += 4.9
+    assert cache.get("a") == 1
+
+    clock.now += 0.1
+    assert cache.get("a", "default") == "default"
+    assert len(cache) == 0
+    stats = cache.stats()
+    assert (stats["hits"], stats["misses"], stats["expirations"]) == (1, 1, 1)
+
+
+def test_setting_an_entry_restarts_its_ttl(clock):
+    cache = LRUCache("test", max_size=10, ttl_sec=5)
+    cache.set("a", 1)
+    clock.now += 4
+    cache.set("a", 2)
+    clock.now += 4
+    assert cache.get("a") == 2
+
+
+def test_entries_never_expire_without_a_ttl(clock):
+    cache = LRUCache("test", max_size=10)
+    cache.set("a", 1)
+    clock.now += 10 ** 9
+    assert cache.get("a") == 1
+
+
+def test_stats_count_hits_and_misses():
+    cache = LRUCache("test", max_size=10, ttl_sec=60)
+    assert cache.stats()["hit_ratio"] == 0.0
+    cache.set("a", 1)
+    cache.get("a")
+    cache.get("a")
+    cache.get("a")
+    cache.get("b")
+
+    assert cache.stats() == {
+        "name": "test", "size": 1, "max_size": 10, "ttl_sec": 60,
+        "hits": 3, "misses": 1, "hit_ratio": 0.75, "evictions": 0, "expirations": 0,
+    }
+
+
+def test_max_size_zero_disables_the_cache():
+    cache = LRUCache("test", max_size=0)
+    cache.set("a", 1)
+    assert cache.get("a") is None
+    assert len(cache) == 0
+    assert cache.stats()["evictions"] == 0
+
+
+def test_invalidate_and_clear():
+    cache = LRUCache("test", max_size=10)
+    cache.set("a", 1)
+    cache.set("b", 2)
+    cache.invalidate("a")
+    cache.invalidate("missing")
+    assert cache.get("a") is None
+    assert cache.get("b") == 2
+
+    cache.clear()
+    assert len(cache) == 0
+
+
+def test_get_cache_shares_caches_by_name(caches):
+    cache = get_cache("shared", max_size=2, ttl_sec=1)
+    assert get_cache("shared", max_size=100) is cache
+    assert cache.max_size == 2
+    cache.set("a", 1)
+    cache.get("a")
+    get_cache("other", max_size=1).get("a")
+
+    assert [(stats["name"], stats["size"], stats["hits"], stats["misses"]) for stats in caches_stats()] == [
+        ("shared", 1, 1, 0), ("other", 0, 0, 1),
+    ]
+
+
+def simulation_doc(sim_id: str, links_count: int) -> dict:
+    return {
+        "_id": sim_id,
+        "row_version": 1,
+        "topology": {
+            "_id": f"topology-{sim_id}",
+            "nodes": ["a", "b"],
+            "links": [{"_id": f"link-{i}", "from_node": "a", "to_node": "b", "latency": 1} for i in range(links_count)],
+            "config": {"duration_sec": 10},
+        },
+        "created_at": datetime(2026, 1, 1),
+        "updated_at": datetime(2026, 1, 1),
+    }
+
+
+def test_simulations_above_the_max_entry_bytes_are_not_cached(caches, monkeypatch):
+    monkeypatch.setattr(app_container.config(), "SIMULATIONS_CACHE_MAX_SIZE", 10)
+    monkeypatch.setattr(app_container.config(), "SIMULATIONS_CACHE_MAX_ENTRY_BYTES", 2000)
+    docs = {"small": simulation_doc("small", 1), "large": simulation_doc("large", 50)}
+    reads = []
+
+    async def get_simulations_docs_by_ids(simulation_ids, projection=None):
+        reads.append(list(simulation_ids))
+        return [docs[sim_id] for sim_id in simulation_ids]
+
+    read_bl = SimulationsReadBusinessLogic({app_container.config().TOPOLOGIES_SIMULATIONS_COLLECTION: None})
+    monkeypatch.setattr(read_bl.topologies_simulations_db, "get_simulations_docs_by_ids", get_simulations_docs_by_ids)
+    versions = {"small": (1, datetime(2026, 1, 1)), "large": (1, datetime(2026, 1, 1))}
+
+    first = asyncio.run(read_bl.get_simulations(versions))
+    second = asyncio.run(read_bl.get_simulations(versions))
+
+    assert [len(cached.body) > 2000 for cached in first] == [False, True]
+    assert second == first
+    assert reads == [["small", "large"], ["large"]]
+    assert read_bl.simulations_cache.stats()["size"] == 1
@@ -0,0 +1,154 @@
+"""
+Event messages encoded by the producer codecs must decode, through BaseConsumer._parse_message_body,
+to the same SimulationEvent / LinkEvent for each content_type, and legacy messages without a
+content_type must still parse as JSON.
+"""
+import json
+from datetime import datetime
+from types import SimpleNamespace
+import pytest
+from app.messageBroker.codecs import JSON_CONTENT_TYPE, MSGPACK_CONTENT_TYPE, get_codec
+from app.messageBroker.consumers.base_consumer import BaseConsumer
+from app.models.adapters import LINKS_ADAPTER, SIMULATION_EVENT_ADAPTER
+from app.models.events_models import DELTA_SCHEMA_VERSION, PROCESSED_LINKS_PATH, LinkEvent, SimulationEvent
+from app.models.statuses_enums import EventType, LinkStatusEnum, TopologyStatusEnum
+from app.utils.logger import LoggerManager
+
+try:
+    import msgpack
+except ImportError:  # optional, the application/msgpack cases are skipped without it
+    msgpack = None
+
+CREATED_AT = datetime(2026, 1, 1, 12, 0, 0, 123456)
+UPDATED_AT = datetime(2026, 1, 1, 12, 0, 5, 654321)
+CONTENT_TYPES = [
+    JSON_CONTENT_TYPE,
+    pytest.param(MSGPACK_CONTENT_TYPE, marks=pytest.mark.skipif(msgpack is None, reason="msgpack is not installed")),
+]
+
+
+def make_link(link_id: str = "link-1", status=LinkStatusEnum.done) -> dict:
+    return {
+        "_id": link_id, "from_node": "a", "to_node": "b", "latency": 2,
+        "execution_state": {"start_time": CREATED_AT, "end_time": UPDATED_AT, "status": status},
+    }
+
+
+def snapshot_event() -> SimulationEvent:
+    return SimulationEvent.model_validate({
+        "_id": "event-1",
+        "event_type": EventType.SIMULATION_UPDATED,
+        "after": {
+            "_id": "sim-1",
+            "status": TopologyStatusEnum.running,
+            "row_version": 3,
+            "topology": {
+                "_id": "topology-1",
+                "nodes": ["a", "b"],
+                "links": [make_link()],
+                "config": {"duration_sec": 10, "packet_loss_percent": 0.0},
+            },
+            "created_at": CREATED_AT,
+            "updated_at": UPDATED_AT,
+        },
+        "published_at": UPDATED_AT,
+        "created_at": CREATED_AT,
+        "updated_at": UPDATED_AT,
+    })
+
+
+def delta_event() -> SimulationEvent:
+    return SimulationEvent.model_validate({
+        "_id": "event-2",
+        "schema_version": DELTA_SCHEMA_VERSION,
+        "event_type": EventType.SIMULATION_UPDATED,
+        "sim_id": "sim-1",
+        "row_version": 4,
+        "delta": [
+            {"op": "replace", "path": "status", "value": TopologyStatusEnum.done.value},
+            {"op": "add", "path": PROCESSED_LINKS_PATH, "value": [make_link()]},
+        ],
+        "created_at": CREATED_AT,
+        "updated_at": UPDATED_AT,
+    })
+
+
+def link_event() -> LinkEvent:
+    return LinkEvent.model_validate({
+        "_id": "event-3",
+        "event_type": EventType.LINK_COMPLETED,
+        "sim_id": "sim-1",
+        "after": make_link(status=LinkStatusEnum.failed),
+        "created_at": CREATED_AT,
+        "updated_at": UPDATED_AT,
+    })
+
+
+def parse(content_type, body: bytes):
+    """Decode a message body the way the consumers do."""
+    consumer = SimpleNamespace(logger=LoggerManager.get_logger("test_codecs"))
+    return BaseConsumer._parse_message_body(consumer, SimpleNamespace(content_type=content_type, body=body))
+
+
+def assert_same_event(decoded, event):
+    assert type(decoded) is type(event)
+    assert decoded.model_dump(mode="json") == event.model_dump(mode="json")
+    assert decoded.created_at == CREATED_AT and decoded.updated_at == UPDATED_AT
+
+
+@pytest.mark.parametrize("content_type", CONTENT_TYPES)
+def test_simulation_event_round_trip(content_type):
+    event = snapshot_event()
+    data = parse(content_type, get_codec(content_type).encode(event))
+    decoded = SIMULATION_EVENT_ADAPTER.validate_python(data)
+    assert_same_event(decoded, event)
+    assert decoded.after.status is TopologyStatusEnum.running
+    assert decoded.after.updated_at == UPDATED_AT
+    assert decoded.after.topology.links == event.after.topology.links
+
+
+@pytest.mark.parametrize("content_type", CONTENT_TYPES)
+def test_delta_simulation_event_round_trip(content_type):
+    event = delta_event()
+    data = parse(content_type, get_codec(content_type).encode(event))
+    decoded = SIMULATION_EVENT_ADAPTER.validate_python(data)
+    assert_same_event(decoded, event)
+    # Delta values are plain data on the wire; the added links validate back like apply_simulation_delta does
+    assert decoded.delta[0].value == TopologyStatusEnum.done.value
+    assert LINKS_ADAPTER.validate_python(decoded.delta[1].value) == LINKS_ADAPTER.validate_python(event.delta[1].value)
+
+
+@pytest.mark.parametrize("content_type", CONTENT_TYPES)
+def test_link_event_round_trip(content_type):
+    event = link_event()
+    data = parse(content_type, get_codec(content_type).encode(event))
+    decoded = LinkEvent(**data)
+    assert_same_event(decoded, event)
+    assert decoded.after.execution_state.status is LinkStatusEnum.failed
+    assert decoded.after.execution_state.end_time == UPDATED_AT
+
+
+@pytest.mark.parametrize("content_type", CONTENT_TYPES)
+def test_event_documents_encode_like_models(content_type):
+    # The outbox publishes event documents read from MongoDB: plain dicts holding datetimes and enums
+    event = snapshot_event()
+    data = parse(content_type, get_codec(content_type).encode(event.model_dump(by_alias=True)))
+    assert_same_event(SIMULATION_EVENT_ADAPTER.validate_python(data), event)
+
+
+@pytest.mark.parametrize("content_type", [None, "", "application/json; charset=utf-8", "Application/JSON"])
+def test_legacy_json_messages_parse(content_type):
+    # Messages published before the codecs: standard library json, datetimes as isoformat, no content_type
+    event = link_event()
+    body = json.dumps(event.model_dump(by_alias=True), default=lambda o: o.isoformat()).encode()
+    assert_same_event(LinkEvent(**parse(content_type, body)), event)
+
+
+def test_unsupported_content_type_is_invalid_message():
+    with pytest.raises(ValueError, match="Invalid message format"):
+        parse("text/plain", b"{}")
+
+
+def test_invalid_json_is_invalid_message():
+    with pytest.raises(ValueError, match="Invalid message format"):
+        parse(JSON_CONTENT_TYPE, b"{not json")
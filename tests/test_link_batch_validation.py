@@ -0,0 +1,127 @@
+"""
+The vectorized link validations of LinkBatchBusinessLogic must agree, link for link, with the
+scalar LinksValidators checks run by LinkBusinessLogic.run_link.
+"""
+import numpy as np
+import pytest
+from app.business_logic.link_batch_bl import LinkBatchBusinessLogic
+from app.business_logic.validators.links_validators import LinksValidators
+from app.models.events_models import LinkEvent
+from app.models.statuses_enums import EventType, LinkStatusEnum, TopologyStatusEnum
+from app.models.topolgy_models import Link, LinkExecutionState
+from app.models.topolgy_simulation_models import TopologySimulation
+
+
+def make_link(link_id: str, from_node: str = "a", to_node: str = "b", latency: int = 1, status=None) -> Link:
+    execution_state = LinkExecutionState(status=status) if status else None
+    return Link.model_validate({
+        "_id": link_id, "from_node": from_node, "to_node": to_node, "latency": latency, "execution_state": execution_state
+    })
+
+
+def make_simulation(sim_id: str, links, status=TopologyStatusEnum.running, duration_sec: int = 10,
+                    processed_ids=(), failed_ids=(), packet_loss_percent: float = 0.0) -> TopologySimulation:
+    simulation = TopologySimulation.model_validate({
+        "_id": sim_id,
+        "status": status,
+        "topology": {
+            "_id": f"topology-{sim_id}",
+            "nodes": ["a", "b", "c"],
+            "links": links,
+            "config": {"duration_sec": duration_sec, "packet_loss_percent": packet_loss_percent},
+        },
+    })
+    simulation.links_execution_state.not_processed_links = [link.model_copy() for link in links]
+    simulation.links_execution_state.move_links_to_processed([
+        make_link(link.id, link.from_node, link.to_node, link.latency,
+                  LinkStatusEnum.failed if link.id in failed_ids else LinkStatusEnum.done)
+        for link in links if link.id in processed_ids
+    ])
+    simulation.processed_count = len(simulation.links_execution_state.processed_links)
+    simulation.failed_count = len(failed_ids)
+    return simulation
+
+
+def link_event(simulation: TopologySimulation, link: Link) -> LinkEvent:
+    return LinkEvent(event_type=EventType.LINK_RUN, after=link, sim_id=simulation.sim_id)
+
+
+def batch_inputs(simulations, events):
+    positions = {simulation.sim_id: position for position, simulation in enumerate(simulations)}
+    docs = [simulation.model_dump(by_alias=True) for simulation in simulations]
+    return docs, np.array([positions[event.sim_id] for event in events], dtype=int)
+
+
+def assert_pre_validation_matches(simulations, events):
+    docs, sim_index = batch_inputs(simulations, events)
+    mask = LinkBatchBusinessLogic.pre_validation_mask(events, docs, sim_index)
+    by_id = {simulation.sim_id: simulation for simulation in simulations}
+    validators = LinksValidators()
+    expected = [validators.run_pre_link_validator(by_id[event.sim_id], event.after) for event in events]
+    assert mask.tolist() == expected
+    return expected
+
+
+@pytest.mark.parametrize("link, expected", [
+    (make_link("l1"), True),
+    (make_link("l1", from_node="unknown"), False),
+    (make_link("l1", to_node="unknown"), False),
+    (make_link("l1", latency=10), True),
+    (make_link("l1", latency=11), False),
+    (make_link("unknown-link"), False),
+])
+def test_pre_validation_of_a_link(link, expected):
+    simulation = make_simulation("s1", [make_link("l1"), make_link("l2")])
+    assert assert_pre_validation_matches([simulation], [link_event(simulation, link)]) == [expected]
+
+
+def test_pre_validation_of_an_already_processed_link():
+    links = [make_link("l1"), make_link("l2")]
+    simulation = make_simulation("s1", links, processed_ids={"l1"})
+    events = [link_event(simulation, link) for link in links]
+    assert assert_pre_validation_matches([simulation], events) == [False, True]
+
+
+@pytest.mark.parametrize("status, expected", [
+    (TopologyStatusEnum.running, True),
+    (TopologyStatusEnum.pending, False),
+    (TopologyStatusEnum.paused, False),
+    (TopologyStatusEnum.stopped, False),
+    (TopologyStatusEnum.done, False),
+])
+def test_pre_validation_of_a_simulation_state(status, expected):
+    simulation = make_simulation("s1", [make_link("l1")], status=status)
+    assert assert_pre_validation_matches([simulation], [link_event(simulation, make_link("l1"))]) == [expected]
+
+
+def test_pre_validation_of_a_mixed_batch():
+    # Link ids and nodes repeat across simulations, so lookups must be per simulation
+    running = make_simulation("s1", [make_link("l1"), make_link("l2", "b", "c")], processed_ids={"l2"})
+    paused = make_simulation("s2", [make_link("l1"), make_link("l3", latency=3)], status=TopologyStatusEnum.paused)
+    short = make_simulation("s3", [make_link("l1", latency=5), make_link("l2")], duration_sec=2)
+    events = [
+        link_event(running, make_link("l1")),
+        link_event(paused, make_link("l1")),
+        link_event(short, make_link("l1", latency=5)),
+        link_event(running, make_link("l2", "b", "c")),
+        link_event(short, make_link("l2")),
+        link_event(running, make_link("l3", latency=3)),
+        link_event(short, make_link("l2", to_node="d")),
+    ]
+    assert assert_pre_validation_matches([running, paused, short], events) == [True, False, False, False, True, False, False]
+
+
+@pytest.mark.parametrize("status, processed_ids, failed_ids, packet_loss_percent", [
+    (TopologyStatusEnum.running, set(), set(), 0.0),
+    (TopologyStatusEnum.running, {"l1", "l2"}, {"l1"}, 0.5),
+    (TopologyStatusEnum.running, {"l1", "l2"}, {"l1"}, 0.4),
+    (TopologyStatusEnum.running, {"l1", "l2"}, {"l1", "l2"}, 0.0),
+    (TopologyStatusEnum.stopped, {"l1"}, set(), 0.0),
+])
+def test_post_validation(status, processed_ids, failed_ids, packet_loss_percent):
+    links = [make_link("l1"), make_link("l2"), make_link("l3")]
+    simulation = make_simulation("s1", links, status=status, processed_ids=processed_ids,
+                                 failed_ids=failed_ids, packet_loss_percent=packet_loss_percent)
+    docs, sim_index = batch_inputs([simulation], [link_event(simulation, links[2])])
+    mask = LinkBatchBusinessLogic.post_validation_mask(docs, sim_index)
+    assert mask.tolist() == [LinksValidators().run_post_simulation_Validator(simulation)]
@@ -0,0 +1,98 @@
+"""
+LinksColumns: links stored in topology links chunks with TOPOLOGY_LINKS_CHUNK_ENCODING 'columnar'
+must read back as the same Link models (execution start/end times are not stored).
+"""
+from collections import defaultdict
+from datetime import datetime
+import bson
+import pytest
+from app.app_container import app_container
+from app.db.topologies_db import TopologiesDB
+from app.models.links_columns import LinksColumns
+from app.models.statuses_enums import LinkStatusEnum
+from app.models.topolgy_models import Link, LinkExecutionState
+
+
+def make_links():
+    # BSON datetimes have millisecond precision
+    now = datetime(2026, 1, 1, 12, 0, 0, 123000)
+    return [
+        Link.model_validate({"_id": "l0", "from_node": "a", "to_node": "b", "latency": 1}),
+        Link.model_validate({
+            "_id": "l1", "from_node": "b", "to_node": "c", "latency": 2,
+            "execution_state": LinkExecutionState(status=LinkStatusEnum.done, start_time=now, end_time=now, retry_count=2)
+        }),
+        Link.model_validate({
+            "_id": "l2", "from_node": "c", "to_node": "nœud-é", "latency": 0,
+            "execution_state": LinkExecutionState(status=LinkStatusEnum.failed, retry_count=3)
+        }),
+        Link.model_validate({
+            "_id": "l3", "from_node": "a", "to_node": "c", "latency": 30,
+            "execution_state": LinkExecutionState(status=LinkStatusEnum.pending)
+        }),
+        Link.model_validate({"_id": "l4", "from_node": "nœud-é", "to_node": "a", "latency": 7}),
+    ]
+
+
+def without_times(links):
+    """The links as stored by the columnar encoding: execution states without start/end times."""
+    stored = []
+    for link in links:
+        execution_state = link.execution_state
+        if execution_state is not None:
+            execution_state = execution_state.model_copy(update={"start_time": None, "end_time": None})
+        stored.append(link.model_copy(update={"execution_state": execution_state}))
+    return stored
+
+
+def dump(links):
+    return [link.model_dump(by_alias=True) for link in links]
+
+
+@pytest.fixture
+def chunking_config(monkeypatch):
+    config = app_container.config()
+    monkeypatch.setattr(config, "TOPOLOGY_LINKS_CHUNK_SIZE", 2)
+    return config
+
+
+@pytest.mark.parametrize("encoding", ["columnar", "documents"])
+def test_chunks_round_trip(chunking_config, monkeypatch, encoding):
+    monkeypatch.setattr(chunking_config, "TOPOLOGY_LINKS_CHUNK_ENCODING", encoding)
+    topologies_db = TopologiesDB(defaultdict(lambda: None))
+    links = make_links()
+
+    chunks = topologies_db._build_links_chunks("topology-1", links)
+    assert [chunk["chunk"] for chunk in chunks] == [0, 1, 2]
+    assert all(("links_columns" in chunk) == (encoding == "columnar") for chunk in chunks)
+
+    # As stored and read back by MongoDB
+    read_chunks = [bson.decode(bson.encode(chunk)) for chunk in chunks]
+    read_links = [link for chunk in read_chunks for link in TopologiesDB._chunk_links(chunk)]
+    expected = without_times(links) if encoding == "columnar" else links
+    assert dump(read_links) == dump(expected)
+
+
+def test_columns_round_trip_keeps_node_order():
+    links = make_links()
+    columns = LinksColumns.from_links(links, nodes=["c", "b", "a"])
+    assert columns.nodes[:3] == ["c", "b", "a"]
+    assert "nœud-é" in columns.nodes
+
+    decoded = LinksColumns.from_bson(bytes(columns.to_bson()))
+    assert len(decoded) == len(links)
+    assert decoded.nodes == columns.nodes
+    assert decoded.latency.tolist() == [1, 2, 0, 30, 7]
+    assert dump(decoded.to_links()) == dump(without_times(links))
+
+
+def test_empty_links_round_trip():
+    decoded = LinksColumns.from_bson(bytes(LinksColumns.from_links([]).to_bson()))
+    assert len(decoded) == 0
+    assert decoded.to_links() == []
+
+
+@pytest.mark.parametrize("data", [b"", b"LNKC", b"XXXX" + bytes(20)])
+def test_invalid_data_is_rejected(data):
+    with pytest.raises(ValueError):
+        LinksColumns.from_bson(data)
@@ -0,0 +1,103 @@
+"""
+MicroBatcher: batches flushed on max_size or window expiry, and results / errors handed to each submitter.
+"""
+import asyncio
+import pytest
+from app.utils.micro_batcher import MicroBatcher
+
+
+class Handler:
+    """Records the batches it handles and returns each item doubled."""
+    def __init__(self, error: Exception = None):
+        self.batches = []
+        self.error = error
+
+    async def __call__(self, items):
+        self.batches.append(list(items))
+        if self.error is not None:
+            raise self.error
+        return [item * 2 for item in items]
+
+
+def run(coroutine):
+    return asyncio.run(asyncio.wait_for(coroutine, timeout=5))
+
+
+def test_flushes_on_max_size_without_waiting_for_the_window():
+    handler = Handler()
+
+    async def main():
+        batcher = MicroBatcher(handler, max_size=3, window_ms=60_000)
+        return await asyncio.gather(*(batcher.submit(item) for item in range(3)))
+
+    assert run(main()) == [0, 2, 4]
+    assert handler.batches == [[0, 1, 2]]
+
+
+def test_splits_submissions_above_max_size():
+    handler = Handler()
+
+    async def main():
+        batcher = MicroBatcher(handler, max_size=2, window_ms=10)
+        return await asyncio.gather(*(batcher.submit(item) for item in range(5)))
+
+    assert run(main()) == [0, 2, 4, 6, 8]
+    assert handler.batches == [[0, 1], [2, 3], [4]]
+
+
+def test_flushes_on_window_expiry():
+    handler = Handler()
+
+    async def main():
+        batcher = MicroBatcher(handler, max_size=100, window_ms=20)
+        first = asyncio.create_task(batcher.submit(1))
+        second = asyncio.create_task(batcher.submit(2))
+        await asyncio.sleep(0)
+        assert handler.batches == []
+        results = await asyncio.gather(first, second)
+        # Items submitted after the flush go to the next window
+        return results, await batcher.submit(3)
+
+    assert run(main()) == ([2, 4], 6)
+    assert handler.batches == [[1, 2], [3]]
+
+
+def test_handler_error_is_raised_to_every_submitter():
+    handler = Handler(error=ValueError("batch failed"))
+
+    async def main():
+        batcher = MicroBatcher(handler, max_size=3, window_ms=10)
+        return await asyncio.gather(*(batcher.submit(item) for item in range(3)), return_exceptions=True)
+
+    results = run(main())
+    assert len(results) == 3
+    assert all(isinstance(result, ValueError) and str(result) == "batch failed" for result in results)
+
+
+def test_exception_result_is_raised_to_its_submitter_only():
+    async def handler(items):
+        return [ValueError(f"item {item}") if item == 1 else item for item in items]
+
+    async def main():
+        batcher = MicroBatcher(handler, max_size=3, window_ms=10)
+        return await asyncio.gather(*(batcher.submit(item) for item in range(3)), return_exceptions=True)
+
+    first, second, third = run(main())
+    assert (first, third) == (0, 2)
+    assert isinstance(second, ValueError) and str(second) == "item 1"
+
+
+def test_results_count_mismatch_fails_the_batch():
+    async def handler(items):
+        return items[:-1]
+
+    async def main():
+        batcher = MicroBatcher(handler, max_size=2, window_ms=10)
+        return await asyncio.gather(*(batcher.submit(item) for item in range(2)), return_exceptions=True)
+
+    assert all(isinstance(result, RuntimeError) for result in run(main()))
+
+
+def test_max_size_must_be_positive():
+    with pytest.raises(ValueError):
+        MicroBatcher(Handler(), max_size=0, window_ms=10)